@@ -0,0 +1,55 @@
+"""p50/p99 latency of the /predict + /explain service path under a Zipf request mix,
+with the prediction cache enabled and disabled.
+
+Usage: python benchmarks/bench_cache.py [n_rows] [zipf_a]
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+import main
+from prediction_cache import PredictionCache
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+ZIPF_A = float(sys.argv[2]) if len(sys.argv) > 2 else 1.2
+N_REQUESTS = 50_000
+CACHE_SIZE = 10_000
+
+with open(os.path.join(BACKEND_DIR, "feature_list.json"), 'r') as f:
+    feature_names = json.load(f)
+
+rng = np.random.default_rng(42)
+df = pd.DataFrame(rng.normal(size=(N_ROWS, len(feature_names))) * 10, columns=feature_names)
+df['is_churn'] = rng.integers(0, 2, N_ROWS)
+
+with tempfile.TemporaryDirectory() as tmp:
+    main.DATA_PATH = os.path.join(tmp, "serving.csv")
+    main.MODEL_PATH = os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json")
+    main.FEATURE_LIST_PATH = os.path.join(BACKEND_DIR, "feature_list.json")
+    df.to_csv(main.DATA_PATH, index=False)
+    print(f"Loading {N_ROWS} rows...")
+    main.load_artifacts()
+
+# Zipf ranks mapped onto a random permutation so hot users are spread over the table
+hot_order = rng.permutation(N_ROWS)
+user_ids = hot_order[(rng.zipf(ZIPF_A, N_REQUESTS) - 1) % N_ROWS].tolist()
+print(f"Zipf a={ZIPF_A}: {len(set(user_ids))} distinct users in {N_REQUESTS} requests")
+
+for label, size in [("cache off", 0), (f"cache {CACHE_SIZE}", CACHE_SIZE)]:
+    main.prediction_cache = PredictionCache(size)
+    timings = np.empty(N_REQUESTS)
+    for i, user_id in enumerate(user_ids):
+        start = time.perf_counter()
+        main.get_scored_user(main.serving_bundle, user_id)
+        timings[i] = time.perf_counter() - start
+    timings *= 1e6
+    stats = main.prediction_cache.stats()
+    hit_rate = stats["hits"] / max(stats["hits"] + stats["misses"], 1)
+    print(f"{label:>12}: p50 {np.percentile(timings, 50):6.2f} us | p99 {np.percentile(timings, 99):6.2f} us | hit rate {hit_rate:.1%} | evictions {stats['evictions']}")
@@ -0,0 +1,50 @@
+"""Row lookup latency: DataFrame.iloc + column reindex vs. float32 matrix slice.
+
+Usage: python benchmarks/bench_lookup.py [n_rows]
+"""
+import json
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+N_LOOKUPS = 20_000
+
+with open(os.path.join(BACKEND_DIR, "feature_list.json"), 'r') as f:
+    feature_names = json.load(f)
+
+print(f"Building synthetic table: {N_ROWS} rows x {len(feature_names) + 1} columns")
+rng = np.random.default_rng(42)
+df_db = pd.DataFrame(rng.normal(size=(N_ROWS, len(feature_names))), columns=feature_names)
+df_db['is_churn'] = rng.integers(0, 2, N_ROWS)
+
+feature_matrix = np.ascontiguousarray(df_db[feature_names].to_numpy(dtype=np.float32))
+churn_labels = df_db['is_churn'].to_numpy(dtype=np.int8)
+user_ids = rng.integers(0, N_ROWS, N_LOOKUPS).tolist()
+
+def lookup_dataframe(user_id):
+    user_row = df_db.iloc[user_id]
+    features = user_row[feature_names].values.reshape(1, -1)
+    actual_churn = int(user_row.get('is_churn', -1))
+    return features, actual_churn
+
+def lookup_matrix(user_id):
+    features = feature_matrix[user_id:user_id + 1]
+    actual_churn = int(churn_labels[user_id])
+    return features, actual_churn
+
+def measure(fn):
+    timings = np.empty(len(user_ids))
+    for i, user_id in enumerate(user_ids):
+        start = time.perf_counter()
+        fn(user_id)
+        timings[i] = time.perf_counter() - start
+    return timings * 1e6
+
+for name, fn in [("DataFrame.iloc", lookup_dataframe), ("float32 matrix slice", lookup_matrix)]:
+    t = measure(fn)
+    print(f"{name:>22}: mean {t.mean():8.2f} us | p50 {np.percentile(t, 50):8.2f} us | p99 {np.percentile(t, 99):8.2f} us")
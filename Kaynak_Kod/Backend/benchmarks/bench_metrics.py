@@ -0,0 +1,138 @@
+"""Overhead of the /metrics instrumentation (middleware + stage timers) on the
+/predict and /explain request path, driven through the ASGI app in-process so
+no network or client time dilutes the comparison.
+
+Each request is sent to the bare app and to the same app wrapped in
+MetricsMiddleware; the stage marks inside the handlers run in both (they are a
+no-op without the middleware), so the difference is the full cost. That
+difference is close to the run-to-run noise, so the instrumentation is also
+timed on its own around a no-op ASGI app and set against the request time.
+
+Usage: python benchmarks/bench_metrics.py [n_rows] [n_requests]
+"""
+import asyncio
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+os.environ["CHURN_METRICS"] = "0"
+os.environ.setdefault("CHURN_EXPLAIN_METHOD", "approx")
+import main
+from metrics import MetricsMiddleware, MetricsRegistry, mark
+
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+N_REQUESTS = int(sys.argv[2]) if len(sys.argv) > 2 else 20_000
+WARMUP_REQUESTS = 500
+
+with open(os.path.join(BACKEND_DIR, "feature_list.json"), 'r') as f:
+    feature_names = json.load(f)
+
+rng = np.random.default_rng(42)
+df = pd.DataFrame(rng.normal(size=(N_ROWS, len(feature_names))) * 10, columns=feature_names)
+df['is_churn'] = rng.integers(0, 2, N_ROWS)
+
+with tempfile.TemporaryDirectory() as tmp:
+    main.DATA_PATH = os.path.join(tmp, "serving.csv")
+    main.MODEL_PATH = os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json")
+    main.FEATURE_LIST_PATH = os.path.join(BACKEND_DIR, "feature_list.json")
+    main.STORE_PATH = os.path.join(tmp, "no_store")
+    df.to_csv(main.DATA_PATH, index=False)
+    print(f"Loading {N_ROWS} rows...")
+    main.load_artifacts()
+    # Let the background contribution pass finish so it does not compete for the CPU
+    while main.explanation_mode == "computing":
+        time.sleep(0.1)
+
+# Fewer distinct users than the prediction cache holds, so every timed request is a hit
+users = rng.choice(N_ROWS, min(N_ROWS, main.CACHE_SIZE // 2), replace=False)
+paths = [f"/{kind}/{uid}" for kind, uid in zip(rng.choice(["predict", "explain"], N_REQUESTS), rng.choice(users, N_REQUESTS))]
+
+
+async def request(app, path: str):
+    scope = {"type": "http", "asgi": {"version": "3.0", "spec_version": "2.4"}, "http_version": "1.1",
+             "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(), "root_path": "",
+             "query_string": b"", "headers": [(b"host", b"bench")], "client": ("127.0.0.1", 1), "server": ("bench", 80)}
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.start" and message["status"] != 200:
+            raise RuntimeError(f"{path}: {message['status']}")
+
+    await app(scope, receive, send)
+
+
+async def timed(app, path: str) -> float:
+    start = time.perf_counter()
+    await request(app, path)
+    return time.perf_counter() - start
+
+
+async def main_bench():
+    registry = MetricsRegistry()
+    apps = [main.app, MetricsMiddleware(main.app, registry)]
+    # Warm up both apps and put every requested user in the prediction cache, so neither
+    # side pays the misses; cache hits are the cheapest requests, i.e. the worst case here
+    for path in paths:
+        await request(main.app, path)
+    for app in apps:
+        for path in paths[:WARMUP_REQUESTS]:
+            await request(app, path)
+
+    # Each request is timed on both apps back to back (alternating which goes first),
+    # so drift on a busy machine hits both sides of every pair equally
+    timings = np.empty((len(paths), 2))
+    for i, path in enumerate(paths):
+        first = i % 2
+        timings[i, first] = await timed(apps[first], path)
+        timings[i, 1 - first] = await timed(apps[1 - first], path)
+    return timings, registry
+
+
+timings, registry = asyncio.run(main_bench())
+bare = np.median(timings[:, 0]) * 1e6
+instrumented = np.median(timings[:, 1]) * 1e6
+overhead = np.median(timings[:, 1] - timings[:, 0]) * 1e6
+print(f"{'bare':>13}: {bare:7.1f} us/request (median of {len(paths)} paired requests)")
+print(f"{'instrumented':>13}: {instrumented:7.1f} us/request")
+print(f"{'overhead':>13}: {overhead:7.1f} us ({overhead / bare:+.2%}, median paired difference)")
+
+
+class NoopRoute:
+    path = "/predict/{user_id}"
+
+
+async def noop_app(scope, receive, send):
+    # Same number of marks as a cache-miss /predict request
+    scope["route"] = NoopRoute
+    for stage in ("dispatch", "cache", "lookup", "predict", "explain"):
+        mark(stage)
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"{}"})
+
+
+async def intrinsic_cost(n: int = 100_000) -> float:
+    wrapped = MetricsMiddleware(noop_app, MetricsRegistry())
+    timings = {}
+    for label, app in (("noop", noop_app), ("wrapped", wrapped), ("noop", noop_app), ("wrapped", wrapped)):
+        start = time.perf_counter()
+        for _ in range(n):
+            await request(app, "/predict/1")
+        timings[label] = min(timings.get(label, np.inf), (time.perf_counter() - start) / n)
+    return (timings["wrapped"] - timings["noop"]) * 1e6
+
+
+cost = asyncio.run(intrinsic_cost())
+print(f"{'intrinsic':>13}: {cost:7.1f} us/request = {cost / bare:.2%} of a bare request")
+
+start = time.perf_counter()
+body = registry.render({})
+print(f"/metrics render: {(time.perf_counter() - start) * 1e3:.2f} ms, {len(body.splitlines())} lines")
@@ -0,0 +1,52 @@
+"""Throughput and p50/p99 latency of concurrent single-row scoring, one booster call
+per request (max_batch_size=1) vs. the micro-batcher.
+
+Usage: python benchmarks/bench_micro_batcher.py [concurrency] [window_ms] [max_batch]
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+from micro_batcher import MicroBatcher
+from serving import create_model, INFERENCE_ENGINE
+
+CONCURRENCY = int(sys.argv[1]) if len(sys.argv) > 1 else 256
+WINDOW_MS = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+MAX_BATCH = int(sys.argv[3]) if len(sys.argv) > 3 else 64
+N_REQUESTS = 5_000
+
+with open(os.path.join(BACKEND_DIR, "feature_list.json"), 'r') as f:
+    feature_names = json.load(f)
+
+model = create_model()
+model.load_model(os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json"))
+rows = (np.random.default_rng(42).normal(size=(N_REQUESTS, len(feature_names))) * 10).astype(np.float32)
+print(f"Engine: {INFERENCE_ENGINE} | {N_REQUESTS} requests, {CONCURRENCY} concurrent clients")
+
+
+async def run(batcher: MicroBatcher):
+    timings = np.empty(N_REQUESTS)
+    next_row = iter(range(N_REQUESTS))
+
+    async def client():
+        for i in next_row:
+            start = time.perf_counter()
+            await batcher.submit(model, rows[i])
+            timings[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*[client() for _ in range(CONCURRENCY)])
+    return time.perf_counter() - start, timings * 1e3
+
+
+for label, batcher in [("unbatched", MicroBatcher(max_wait_ms=0, max_batch_size=1)),
+                       (f"{WINDOW_MS:g}ms/{MAX_BATCH}", MicroBatcher(max_wait_ms=WINDOW_MS, max_batch_size=MAX_BATCH))]:
+    elapsed, timings = asyncio.run(run(batcher))
+    print(f"{label:>12}: {N_REQUESTS / elapsed:8.0f} req/s | p50 {np.percentile(timings, 50):6.2f} ms | "
+          f"p99 {np.percentile(timings, 99):6.2f} ms | mean batch {batcher.stats()['mean_batch_size']:.1f}")
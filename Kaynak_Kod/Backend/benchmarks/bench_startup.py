@@ -0,0 +1,73 @@
+"""Startup time and RSS of load_bundle from the CSV vs. the memory-mapped serving store.
+Each mode runs in a fresh interpreter; "store (first)" scores the table and writes the
+per-model score cache, "store" is every later start.
+
+Usage: python benchmarks/bench_startup.py [n_rows]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+MODEL_PATH = os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json")
+FEATURE_LIST_PATH = os.path.join(BACKEND_DIR, "feature_list.json")
+
+
+def rss_mb() -> float:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+def child(data_path: str, store_path: str):
+    import numpy as np
+    from serving import load_bundle
+
+    base_rss = rss_mb()
+    start = time.perf_counter()
+    bundle = load_bundle(MODEL_PATH, FEATURE_LIST_PATH, data_path, store_path=store_path or None)
+    elapsed = time.perf_counter() - start
+    # Touch one row per 4 KiB page of scores, as steady-state traffic would
+    np.sum(bundle.score_probs[::1024])
+    print(json.dumps({"seconds": elapsed, "rss_mb": rss_mb(), "load_rss_mb": rss_mb() - base_rss}))
+
+
+def run(label: str, data_path: str, store_path: str = ""):
+    out = subprocess.run([sys.executable, __file__, "--child", data_path, store_path],
+                         capture_output=True, text=True, check=True).stdout
+    r = json.loads(out.strip().splitlines()[-1])
+    print(f"{label:>14}: startup {r['seconds']:6.2f} s | RSS {r['rss_mb']:7.1f} MB (+{r['load_rss_mb']:.1f} MB for data)")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    import numpy as np
+    import pandas as pd
+    from feature_store import export_store
+
+    N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    with open(FEATURE_LIST_PATH, 'r') as f:
+        feature_names = json.load(f)
+
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame((rng.normal(size=(N_ROWS, len(feature_names))) * 10).astype(np.float32), columns=feature_names)
+    df.insert(0, 'msno', [f"user{i:010d}" for i in range(N_ROWS)])
+    df['is_churn'] = rng.integers(0, 2, N_ROWS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, "serving.csv")
+        store_path = os.path.join(tmp, "serving_store")
+        df.to_csv(data_path, index=False)
+        export_store(df, feature_names, store_path)
+        del df
+        print(f"{N_ROWS} rows | CSV {os.path.getsize(data_path) / 1e6:.0f} MB")
+
+        run("csv", data_path)
+        run("store (first)", data_path, store_path)
+        run("store", data_path, store_path)
@@ -0,0 +1,54 @@
+"""Compare tree_engine.CompiledTreeModel against xgboost: max probability error and latency.
+
+Usage: python benchmarks/bench_tree_engine.py [n_rows]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import xgboost as xgb
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+from tree_engine import CompiledTreeModel
+
+MODEL_PATH = os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json")
+N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+N_SINGLE = 2_000
+
+start = time.perf_counter()
+reference = xgb.XGBClassifier()
+reference.load_model(MODEL_PATH)
+print(f"xgboost load:  {time.perf_counter() - start:.3f} s")
+
+start = time.perf_counter()
+compiled = CompiledTreeModel().load_model(MODEL_PATH)
+print(f"compiled load: {time.perf_counter() - start:.3f} s ({compiled.n_trees} trees, depth {compiled.max_depth})")
+
+# Draw feature values around the split thresholds so every branch gets exercised
+rng = np.random.default_rng(42)
+n_features = len(compiled.feature_names)
+X = np.empty((N_ROWS, n_features), dtype=np.float32)
+for j in range(n_features):
+    thresholds = compiled.threshold[(compiled.split_feature == j) & (compiled.left != np.arange(len(compiled.left)))]
+    if thresholds.size == 0:
+        thresholds = np.zeros(1, dtype=np.float32)
+    X[:, j] = rng.choice(thresholds, N_ROWS) + rng.normal(scale=0.5, size=N_ROWS).astype(np.float32)
+X[rng.random(X.shape) < 0.02] = np.nan
+
+expected = reference.predict_proba(X)[:, 1]
+actual = compiled.predict_proba(X)[:, 1]
+print(f"max |p_compiled - p_xgboost| over {N_ROWS} rows: {np.abs(actual - expected).max():.2e}")
+
+for name, model in [("xgboost", reference), ("compiled", compiled)]:
+    timings = np.empty(N_SINGLE)
+    for i in range(N_SINGLE):
+        row = X[i:i + 1]
+        t0 = time.perf_counter()
+        model.predict_proba(row)
+        timings[i] = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    model.predict_proba(X)
+    bulk = time.perf_counter() - t0
+    print(f"{name:>9}: 1-row p50 {np.percentile(timings, 50) * 1e6:7.1f} us | p99 {np.percentile(timings, 99) * 1e6:7.1f} us | {N_ROWS} rows {bulk:.2f} s")
@@ -0,0 +1,103 @@
+"""Memory of N concurrently starting workers: each parsing the CSV vs. the shared store
+(CHURN_SHARED_STORE=1). Workers load the bundle and attach explanations
+(approx contributions, to keep the run short) like the API startup does.
+
+PSS splits shared pages between the processes that map them, so the PSS sum is
+the real footprint of the worker pool; RSS counts shared pages in every worker.
+
+Usage: python benchmarks/bench_workers.py [n_rows] [n_workers]
+"""
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+MODEL_PATH = os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json")
+FEATURE_LIST_PATH = os.path.join(BACKEND_DIR, "feature_list.json")
+
+
+def memory_mb():
+    rss = pss = 0
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            if line.startswith("Rss:"):
+                rss = int(line.split()[1]) / 1024
+            elif line.startswith("Pss:"):
+                pss = int(line.split()[1]) / 1024
+    return rss, pss
+
+
+def child(data_path: str, store_path: str, shared: bool, report_path: str):
+    from serving import load_bundle, compute_contributions
+
+    start = time.perf_counter()
+    bundle = load_bundle(MODEL_PATH, FEATURE_LIST_PATH, data_path, store_path=store_path, shared=shared)
+    bundle = compute_contributions(bundle, MODEL_PATH, FEATURE_LIST_PATH) or bundle
+    elapsed = time.perf_counter() - start
+    # Simulate traffic touching every array once
+    for arr in (bundle.feature_matrix, bundle.score_probs, bundle.contributions):
+        float(arr[::64].sum(dtype="float64"))
+
+    # Wait for the whole pool so PSS is measured while all workers map the store
+    barrier = os.environ["BENCH_BARRIER"]
+    with open(barrier, "a") as f:
+        f.write("x")
+    while os.path.getsize(barrier) < int(os.environ["BENCH_WORKERS"]):
+        time.sleep(0.05)
+    rss, pss = memory_mb()
+    with open(report_path, "w") as f:
+        json.dump({"seconds": elapsed, "rss": rss, "pss": pss}, f)
+    time.sleep(1.0)
+
+
+def run_pool(label: str, n_workers: int, data_path: str, store_path: str, shared: bool, tmp: str):
+    report = os.path.join(tmp, f"report-{label}")
+    open(report + ".ready", "w").close()
+    env = dict(os.environ, BENCH_WORKERS=str(n_workers), BENCH_BARRIER=report + ".ready", CHURN_EXPLAIN_METHOD="approx")
+    procs = [subprocess.Popen([sys.executable, __file__, "--child", data_path, store_path, str(int(shared)), f"{report}-{i}"],
+                              env=env) for i in range(n_workers)]
+    for p in procs:
+        p.wait()
+
+    results = []
+    for i in range(n_workers):
+        with open(f"{report}-{i}") as f:
+            results.append(json.load(f))
+    slowest = max(r["seconds"] for r in results)
+    rss = sum(r["rss"] for r in results)
+    pss = sum(r["pss"] for r in results)
+    print(f"{label:>13}: slowest startup {slowest:6.2f} s | RSS/worker {rss / n_workers:7.1f} MB | "
+          f"PSS/worker {pss / n_workers:7.1f} MB | pool PSS {pss:7.1f} MB")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3], sys.argv[4] == "1", sys.argv[5])
+        sys.exit(0)
+
+    import numpy as np
+    import pandas as pd
+
+    N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    N_WORKERS = int(sys.argv[2]) if len(sys.argv) > 2 else 4
+    with open(FEATURE_LIST_PATH, 'r') as f:
+        feature_names = json.load(f)
+
+    rng = np.random.default_rng(42)
+    df = pd.DataFrame((rng.normal(size=(N_ROWS, len(feature_names))) * 10).astype(np.float32), columns=feature_names)
+    df.insert(0, 'msno', [f"user{i:010d}" for i in range(N_ROWS)])
+    df['is_churn'] = rng.integers(0, 2, N_ROWS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_path = os.path.join(tmp, "serving.csv")
+        df.to_csv(data_path, index=False)
+        del df
+        print(f"{N_ROWS} rows, {N_WORKERS} workers")
+
+        run_pool("csv", N_WORKERS, data_path, os.path.join(tmp, "no_store"), False, tmp)
+        run_pool("shared", N_WORKERS, data_path, os.path.join(tmp, "serving_store"), True, tmp)
+        run_pool("shared (warm)", N_WORKERS, data_path, os.path.join(tmp, "serving_store"), True, tmp)
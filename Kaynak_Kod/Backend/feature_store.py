@@ -0,0 +1,209 @@
+import contextlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from msno_index import MsnoIndex
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+STORE_FORMAT_VERSION = 1
+MANIFEST_NAME = "manifest.json"
+SCORES_DIR = "scores"
+STATS_DEFAULTS = {"membership_days": 365, "total_transactions": 12, "days_to_expire": 30}
+
+
+def build_feature_store(df_db: pd.DataFrame, feature_names: List[str]):
+    n_rows = len(df_db)
+    if df_db.empty:
+        feature_matrix = np.empty((0, len(feature_names)), dtype=np.float32)
+    else:
+        feature_matrix = np.ascontiguousarray(df_db[feature_names].to_numpy(dtype=np.float32))
+
+    if 'is_churn' in df_db:
+        churn_labels = df_db['is_churn'].to_numpy(dtype=np.int8)
+    else:
+        churn_labels = np.full(n_rows, -1, dtype=np.int8)
+
+    stats_columns = {}
+    for col, default in STATS_DEFAULTS.items():
+        if col in df_db:
+            values = np.nan_to_num(df_db[col].to_numpy(dtype=np.float64), nan=default)
+            stats_columns[col] = values.astype(np.int32)
+        else:
+            stats_columns[col] = np.full(n_rows, default, dtype=np.int32)
+
+    if 'msno' in df_db:
+        msno_index = MsnoIndex(df_db['msno'].astype(str))
+    else:
+        msno_index = MsnoIndex([])
+
+    return feature_matrix, churn_labels, stats_columns, msno_index
+
+
+def _write_arrays(directory: str, arrays: Dict[str, np.ndarray]) -> Dict[str, Dict]:
+    entries = {}
+    for name, arr in arrays.items():
+        np.save(os.path.join(directory, f"{name}.npy"), np.ascontiguousarray(arr))
+        entries[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape)}
+    return entries
+
+
+def _replace_dir(tmp_dir: str, target_dir: str):
+    # Swap the finished directory in with renames; processes that still map the old files keep them
+    old_dir = f"{target_dir}.old.{os.getpid()}"
+    if os.path.exists(target_dir):
+        os.rename(target_dir, old_dir)
+    os.rename(tmp_dir, target_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+
+def get_source_signature(path: str) -> Optional[List[int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return [st.st_mtime_ns, st.st_size]
+
+
+@contextlib.contextmanager
+def store_lock(store_dir: str, name: str = "build"):
+    """Exclusive cross-process lock for building a store or its caches (no-op without fcntl).
+
+    Different ``name``s are independent, so a long contribution pass does not hold up
+    other workers' startup.
+    """
+    if fcntl is None:
+        yield
+        return
+    os.makedirs(os.path.dirname(os.path.abspath(store_dir)), exist_ok=True)
+    with open(f"{store_dir}.{name}.lock", 'w') as f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def export_store(df_db: pd.DataFrame, feature_names: List[str], store_dir: str,
+                 source_path: Optional[str] = None) -> Dict:
+    """Write the serving table as one ``.npy`` file per array plus a manifest.
+
+    The feature matrix is stored row-major (float32) because requests read whole
+    rows; the msno hash table is stored prebuilt, so opening the store does no
+    per-row work. Any score cache from a previous export is dropped. ``source_path``
+    records the CSV's signature so ``ensure_store`` can tell when the store is stale.
+    """
+    feature_matrix, churn_labels, stats_columns, msno_index = build_feature_store(df_db, feature_names)
+    arrays = {"features": feature_matrix, "is_churn": churn_labels, **stats_columns}
+    if len(msno_index):
+        arrays["msno_keys"] = msno_index.keys
+        arrays["msno_table"] = msno_index.table
+
+    tmp_dir = f"{store_dir}.tmp.{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    manifest = {
+        "format_version": STORE_FORMAT_VERSION,
+        "n_rows": len(feature_matrix),
+        "feature_names": list(feature_names),
+        "arrays": _write_arrays(tmp_dir, arrays),
+        "source": get_source_signature(source_path) if source_path else None,
+        "created_at": time.time(),
+    }
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2)
+
+    _replace_dir(tmp_dir, store_dir)
+    return manifest
+
+
+def store_exists(store_dir: str) -> bool:
+    return os.path.exists(os.path.join(store_dir, MANIFEST_NAME))
+
+
+def _read_manifest(store_dir: str) -> Dict:
+    with open(os.path.join(store_dir, MANIFEST_NAME), 'r') as f:
+        return json.load(f)
+
+
+def ensure_store(store_dir: str, data_path: str, feature_names: List[str]):
+    """Export ``data_path`` to ``store_dir`` unless an up-to-date store is already there.
+
+    Runs under ``store_lock``, so when several uvicorn workers start together one of
+    them parses the CSV and the others wait and then map the result.
+    """
+    source = get_source_signature(data_path)
+    with store_lock(store_dir):
+        if store_exists(store_dir) and (source is None or _read_manifest(store_dir).get("source") == source):
+            return
+        if source is None:
+            return
+
+        df_db = pd.read_csv(data_path, dtype={'msno': str})
+        missing = [name for name in feature_names if name not in df_db.columns]
+        if missing:
+            raise ValueError(f"Data is missing model features: {missing}")
+        export_store(df_db, feature_names, store_dir, source_path=data_path)
+
+
+def _map(directory: str, name: str) -> np.ndarray:
+    return np.asarray(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r'))
+
+
+def open_store(store_dir: str, feature_names: List[str]):
+    """Memory-map an exported store; returns the same tuple as ``build_feature_store``."""
+    manifest = _read_manifest(store_dir)
+    if manifest.get("format_version") != STORE_FORMAT_VERSION:
+        raise ValueError(f"Unsupported serving store format: {manifest.get('format_version')}")
+    if manifest["feature_names"] != list(feature_names):
+        raise ValueError("Serving store columns do not match feature_list.json")
+
+    arrays = manifest["arrays"]
+    feature_matrix = _map(store_dir, "features")
+    churn_labels = _map(store_dir, "is_churn")
+    stats_columns = {col: _map(store_dir, col) for col in STATS_DEFAULTS}
+    if "msno_keys" in arrays:
+        msno_index = MsnoIndex.from_arrays(_map(store_dir, "msno_keys"), _map(store_dir, "msno_table"))
+    else:
+        msno_index = MsnoIndex([])
+
+    if feature_matrix.shape != (manifest["n_rows"], len(feature_names)):
+        raise ValueError("Serving store feature matrix has an unexpected shape")
+    return feature_matrix, churn_labels, stats_columns, msno_index
+
+
+def load_score_cache(store_dir: str, key: str) -> Optional[Dict[str, np.ndarray]]:
+    """Memory-map arrays previously derived under ``key`` (e.g. a model version), or None if absent."""
+    directory = os.path.join(store_dir, SCORES_DIR, key)
+    if not os.path.exists(os.path.join(directory, MANIFEST_NAME)):
+        return None
+    with open(os.path.join(directory, MANIFEST_NAME), 'r') as f:
+        names = json.load(f)["arrays"]
+    return {name: _map(directory, name) for name in names}
+
+
+def save_score_cache(store_dir: str, key: str, arrays: Dict[str, np.ndarray]):
+    """Persist model-derived arrays (score table, sampling index, contributions) next to the store.
+
+    Best effort: on a read-only store every start recomputes.
+    """
+    directory = os.path.join(store_dir, SCORES_DIR, key)
+    tmp_dir = f"{directory}.tmp.{os.getpid()}"
+    try:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        entries = _write_arrays(tmp_dir, arrays)
+        with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w') as f:
+            json.dump({"arrays": entries, "created_at": time.time()}, f, indent=2)
+        _replace_dir(tmp_dir, directory)
+    except OSError:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
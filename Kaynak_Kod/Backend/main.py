@@ -1,22 +1,68 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Depends, Request, BackgroundTasks, Query
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import xgboost as xgb
-import pandas as pd
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
 import numpy as np
 import os
-import json
+import time
+import threading
 from typing import List, Dict, Optional
+from prediction_cache import PredictionCache
+from singleflight import SingleFlight
+from micro_batcher import MicroBatcher
+from stream_scoring import CsvRowParser, NdjsonRowParser, DuplexStreamingResponse, score_stream
+from segments import segment_dimensions, summarize_segments
+from simulation import parse_scenario, simulate_row, simulate_population
+from metrics import MetricsMiddleware, MetricsRegistry, mark
+from serving import (
+    ServingBundle, CHURN_THRESHOLD, EXPLAIN_LABELS, RISK_BANDS, RISK_LEVELS,
+    load_bundle, get_artifact_signature, sample_bucket, compute_contributions, threshold_summary
+)
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 MODEL_PATH = os.path.join(BASE_DIR, "xgboost_final_model_lite.json")
 FEATURE_LIST_PATH = os.path.join(BASE_DIR, "feature_list.json")
 DATA_PATH = os.path.join(BASE_DIR, "model_ready_lite_sample.csv")
+# Exported by Model_Egitim/27_export_serving_store.py; memory-mapped instead of DATA_PATH when present
+STORE_PATH = os.environ.get("CHURN_SERVING_STORE", os.path.join(BASE_DIR, "serving_store"))
+# Multi-worker deployments: build the store from DATA_PATH once, under a file lock, and map it in every worker
+SHARED_STORE = os.environ.get("CHURN_SHARED_STORE", "0") == "1"
+
+MAX_BATCH_SIZE = 50_000
+CACHE_SIZE = int(os.environ.get("CHURN_CACHE_SIZE", "10000"))
+MAX_RANDOM_USERS = 1000
+MAX_TOP_RISK = 5000
+MAX_SWEEP_STEPS = 1001
+MAX_SIMULATION_SCENARIOS = 256
+FILTER_OPS = {"gt": np.greater, "ge": np.greater_equal, "lt": np.less, "le": np.less_equal, "eq": np.equal, "ne": np.not_equal}
+ARTIFACT_CHECK_INTERVAL = 1.0
+RELOAD_RETRY_INTERVAL = float(os.environ.get("CHURN_RELOAD_RETRY_INTERVAL", "30"))
+WATCH_ARTIFACTS = os.environ.get("CHURN_WATCH_ARTIFACTS", "0") == "1"
+WATCH_INTERVAL = float(os.environ.get("CHURN_WATCH_INTERVAL", "5"))
+BATCH_WINDOW_MS = float(os.environ.get("CHURN_BATCH_WINDOW_MS", "2"))
+BATCH_MAX_SIZE = int(os.environ.get("CHURN_BATCH_MAX_SIZE", "64"))
+# /score/stream: rows per booster call (bounds memory per request) and rows per request
+STREAM_CHUNK_ROWS = int(os.environ.get("CHURN_STREAM_CHUNK_ROWS", "5000"))
+STREAM_MAX_ROWS = int(os.environ.get("CHURN_STREAM_MAX_ROWS", "10000000"))
+STREAM_MAX_LINE_BYTES = 1 << 20
+METRICS_ENABLED = os.environ.get("CHURN_METRICS", "1") == "1"
 
-model = xgb.XGBClassifier()
-df_db = pd.DataFrame()
-feature_names = []
-feature_importance_map = {}
+serving_bundle: Optional[ServingBundle] = None
+artifact_signature = None
+last_artifact_check = 0.0
+# Changed signature seen by the previous poll, and the last one whose reload failed (with the time)
+pending_signature = None
+failed_reload = (None, 0.0)
+prediction_cache = PredictionCache(CACHE_SIZE)
+user_flight = SingleFlight()
+score_batcher = MicroBatcher(max_wait_ms=BATCH_WINDOW_MS, max_batch_size=BATCH_MAX_SIZE)
+reload_lock = threading.Lock()
+poll_lock = threading.Lock()
+swap_lock = threading.Lock()
+explanation_mode = "rules"
+sample_rng = np.random.default_rng()
+metrics_registry = MetricsRegistry()
+reload_status = {"state": "idle", "error": None, "started_at": None, "finished_at": None}
 
 app = FastAPI(
     title="KKBox Churn Prediction API",
@@ -30,38 +76,154 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Model-Version"],
 )
 
+@app.middleware("http")
+async def add_model_version_header(request: Request, call_next):
+    response = await call_next(request)
+    version = getattr(request.state, "model_version", None)
+    if version is None and serving_bundle is not None:
+        version = serving_bundle.version
+    if version is not None:
+        response.headers["X-Model-Version"] = version
+    return response
+
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry)
+
 @app.on_event("startup")
 def load_artifacts():
-    global model, df_db, feature_names, feature_importance_map
+    global serving_bundle, artifact_signature
     
-    if os.path.exists(FEATURE_LIST_PATH):
-        with open(FEATURE_LIST_PATH, 'r') as f:
-            feature_names = json.load(f)
-    
-    if os.path.exists(MODEL_PATH):
-        model.load_model(MODEL_PATH)
-        try:
-            importances = model.feature_importances_
-            feature_importance_map = dict(zip(feature_names, importances))
-        except:
-            pass
+    signature = get_artifact_signature(MODEL_PATH, FEATURE_LIST_PATH)
+    bundle = load_bundle(MODEL_PATH, FEATURE_LIST_PATH, DATA_PATH, strict=False, store_path=STORE_PATH, shared=SHARED_STORE)
+    with swap_lock:
+        serving_bundle = bundle
+        artifact_signature = signature
+        prediction_cache.clear()
+    start_contributions(bundle)
+
+    if WATCH_ARTIFACTS:
+        threading.Thread(target=watch_artifacts, name="artifact-watcher", daemon=True).start()
+
+def reload_artifacts():
+    """Build a new bundle off the request path and swap it in; expects reload_lock held.
+
+    The artifact signature is read before loading and only recorded once the new
+    bundle is served, so a failed reload (or files changing during the load) leaves
+    the old signature in place and the artifact poll tries again.
+    """
+    global serving_bundle, artifact_signature, failed_reload
+
+    signature = get_artifact_signature(MODEL_PATH, FEATURE_LIST_PATH)
+    try:
+        reload_status.update(state="loading", error=None, started_at=time.time(), finished_at=None)
+        new_bundle = load_bundle(MODEL_PATH, FEATURE_LIST_PATH, DATA_PATH, strict=True, store_path=STORE_PATH, shared=SHARED_STORE)
+        with swap_lock:
+            serving_bundle = new_bundle
+            artifact_signature = signature
+            prediction_cache.clear()
+        reload_status.update(state="idle", finished_at=time.time())
+        start_contributions(new_bundle)
+    except Exception as e:
+        failed_reload = (signature, time.monotonic())
+        reload_status.update(state="failed", error=f"{type(e).__name__}: {e}", finished_at=time.time())
+    finally:
+        reload_lock.release()
+
+def start_contributions(bundle: ServingBundle):
+    global explanation_mode
+    explanation_mode = "computing"
+    threading.Thread(target=attach_contributions, args=(bundle,), name="contributions", daemon=True).start()
+
+def attach_contributions(bundle: ServingBundle):
+    """Compute feature contributions for a freshly served bundle; until it finishes /explain uses the rules."""
+    global serving_bundle, explanation_mode
+
+    try:
+        explained = compute_contributions(bundle, MODEL_PATH, FEATURE_LIST_PATH)
+    except Exception as e:
+        explained = None
+        error = f"{type(e).__name__}: {e}"
+    else:
+        error = None
 
-    if os.path.exists(DATA_PATH):
-        df_db = pd.read_csv(DATA_PATH)
+    with swap_lock:
+        # A reload may have swapped in a newer bundle meanwhile; its own pass owns the mode then
+        if serving_bundle is not bundle:
+            return
+        if explained is None:
+            explanation_mode = f"rules ({error})" if error else "rules"
+            return
+        serving_bundle = explained
+        explanation_mode = EXPLAIN_LABELS[explained.contribution_method]
+        prediction_cache.clear()
 
-def get_user_data(user_id: int):
-    if user_id < 0 or user_id >= len(df_db):
+def poll_artifacts():
+    """One artifact poll, shared by the request-path check and the watcher thread.
+
+    A retrain writes the files in several steps, so a changed signature only starts
+    a reload once it is seen unchanged on two consecutive polls. The reload runs in
+    a background thread (same atomic swap as /admin/reload); a signature whose
+    reload failed is retried after RELOAD_RETRY_INTERVAL.
+    """
+    global pending_signature
+
+    if not poll_lock.acquire(blocking=False):
+        return
+    try:
+        current = get_artifact_signature(MODEL_PATH, FEATURE_LIST_PATH)
+        if current == artifact_signature or current != pending_signature:
+            pending_signature = None if current == artifact_signature else current
+            return
+        failed_signature, failed_at = failed_reload
+        if current == failed_signature and time.monotonic() - failed_at < RELOAD_RETRY_INTERVAL:
+            return
+        if reload_lock.acquire(blocking=False):
+            reload_status.update(state="loading", error=None, started_at=time.time(), finished_at=None)
+            threading.Thread(target=reload_artifacts, name="artifact-reload", daemon=True).start()
+    finally:
+        poll_lock.release()
+
+def watch_artifacts():
+    # Keeps polling while no requests arrive to trigger check_artifacts
+    while True:
+        time.sleep(WATCH_INTERVAL)
+        poll_artifacts()
+
+def check_artifacts():
+    global last_artifact_check
+
+    now = time.monotonic()
+    if now - last_artifact_check < ARTIFACT_CHECK_INTERVAL:
+        return
+    last_artifact_check = now
+    poll_artifacts()
+
+async def get_serving(request: Request) -> ServingBundle:
+    serving = serving_bundle
+    if serving is None:
+        raise HTTPException(status_code=503, detail="Model is not loaded")
+    request.state.model_version = serving.version
+    return serving
+
+def get_user_data(serving: ServingBundle, user_id: int):
+    if user_id < 0 or user_id >= serving.n_users:
         return None
     
-    user_row = df_db.iloc[user_id]
-    features = user_row[feature_names].values.reshape(1, -1)
-    actual_churn = int(user_row.get('is_churn', -1))
+    features = serving.feature_matrix[user_id:user_id + 1]
+    actual_churn = int(serving.churn_labels[user_id])
     
-    return features, actual_churn, user_row
+    return features, actual_churn
+
+def resolve_msno(serving: ServingBundle, msno: str) -> int:
+    user_id = serving.msno_index.lookup(msno)
+    if user_id < 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user_id
 
-def generate_explanation(user_row: pd.Series) -> List[Dict]:
+def generate_explanation(user_row: Dict[str, float]) -> List[Dict]:
     reasons = []
     
     if 'is_cancel_sum' in user_row and user_row['is_cancel_sum'] > 0:
@@ -112,102 +274,710 @@ def generate_explanation(user_row: pd.Series) -> List[Dict]:
         
     return reasons
 
+
+class RandomUserResponse(BaseModel):
+    user_id: int
+    user_ids: List[int]
+    matched: int
+
+class TopRiskUser(BaseModel):
+    user_id: int
+    msno: Optional[str] = None
+    churn_probability: float
+    risk_level: str
+    actual_status: Optional[int] = None
+    days_to_expire: int
+
+class TopRiskResponse(BaseModel):
+    count: int
+    next_cursor: Optional[str] = None
+    results: List[TopRiskUser]
+
 class PredictionResponse(BaseModel):
     user_id: int
+    msno: Optional[str] = None
     churn_probability: float
     is_churn_prediction: bool
     risk_level: str
     actual_status: Optional[int] = None
 
+class BatchPredictionRequest(BaseModel):
+    user_ids: List[int] = []
+    msnos: List[str] = []
+    threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+class BatchPredictionItem(BaseModel):
+    user_id: Optional[int] = None
+    msno: Optional[str] = None
+    churn_probability: Optional[float] = None
+    is_churn_prediction: Optional[bool] = None
+    risk_level: Optional[str] = None
+    actual_status: Optional[int] = None
+    error: Optional[str] = None
+
+class BatchPredictionResponse(BaseModel):
+    count: int
+    errors: int
+    results: List[BatchPredictionItem]
+
 class ExplanationResponse(BaseModel):
     user_id: int
+    msno: Optional[str] = None
     risk_score: float
     reasons: List[Dict]
 
 class UserStatsResponse(BaseModel):
     user_id: int
+    msno: Optional[str] = None
     membership_days: int
     total_transactions: int
     days_to_expire: int
     last_active_date: str
 
-@app.get("/")
-def home():
-    return {"message": "Welcome to Churn Prediction API. Visit /docs for documentation."}
+class DashboardResponse(BaseModel):
+    user_id: int
+    msno: Optional[str] = None
+    prediction: PredictionResponse
+    explanation: ExplanationResponse
+    stats: UserStatsResponse
 
-@app.get("/users/random")
-def get_random_user():
-    risk_users = df_db[df_db['is_churn'] == 1].index.tolist()
-    if risk_users:
-        import random
-        return {"user_id": random.choice(risk_users)}
-    return {"user_id": 0}
+class ScoreRequest(BaseModel):
+    features: Dict[str, Optional[float]]
 
-@app.get("/user-stats/{user_id}", response_model=UserStatsResponse)
-def get_user_stats(user_id: int):
-    data = get_user_data(user_id)
-    if not data:
-        raise HTTPException(status_code=404, detail="User not found")
+class ScoreResponse(BaseModel):
+    churn_probability: float
+    is_churn_prediction: bool
+    risk_level: str
+
+class ThresholdSummary(BaseModel):
+    threshold: float
+    flagged: int
+    flagged_rate: float
+    true_positives: int
+    false_positives: int
+    false_negatives: int
+    true_negatives: int
+    precision: float
+    recall: float
+    f1: float
+
+class ThresholdSweepResponse(BaseModel):
+    n_users: int
+    labeled_users: int
+    churned_users: int
+    points: List[ThresholdSummary]
+
+class SegmentSummary(BaseModel):
+    segment: str
+    count: int
+    mean_probability: Optional[float] = None
+    share_above_threshold: Optional[float] = None
+    risk_levels: Dict[str, int]
+
+class SegmentDimensionSummary(BaseModel):
+    dimension: str
+    segments: List[SegmentSummary]
+
+class SegmentsResponse(BaseModel):
+    threshold: float
+    dimensions: List[SegmentDimensionSummary]
+
+class SimulationRequest(BaseModel):
+    # Each scenario is one variant; "a=1; b+=20" applies both overrides together
+    scenarios: List[str]
+    threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+class SimulatedScore(BaseModel):
+    scenario: str
+    churn_probability: float
+    change: float
+    is_churn_prediction: bool
+    risk_level: str
+
+class SimulationResponse(BaseModel):
+    user_id: int
+    msno: Optional[str] = None
+    baseline: SimulatedScore
+    variants: List[SimulatedScore]
+
+class PopulationSimulationRequest(BaseModel):
+    scenario: str
+    dimension: Optional[str] = None
+    segment: Optional[str] = None
+    where: List[str] = []
+    threshold: Optional[float] = Field(None, ge=0.0, le=1.0)
+
+class PopulationSimulationResponse(BaseModel):
+    scenario: str
+    threshold: float
+    n_users: int
+    expected_churners_before: float
+    expected_churners_after: float
+    expected_churners_change: float
+    mean_probability_before: Optional[float] = None
+    mean_probability_after: Optional[float] = None
+    flagged_before: int
+    flagged_after: int
+    users_risk_up: int
+    users_risk_down: int
+
+class ReloadStatusResponse(BaseModel):
+    state: str
+    error: Optional[str] = None
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    model_version: Optional[str] = None
+    loaded_at: Optional[float] = None
+    explanations: Optional[str] = None
+
+def build_prediction(serving: ServingBundle, user_id: int, prob: float, actual_churn: int) -> Dict:
+    return {
+        "user_id": user_id,
+        "msno": serving.msno_index.key(user_id),
+        "churn_probability": round(prob, 4),
+        "is_churn_prediction": bool(prob >= CHURN_THRESHOLD),
+        "risk_level": RISK_LEVELS[serving.score_risk[user_id]],
+        "actual_status": actual_churn
+    }
+
+def generate_contribution_explanation(serving: ServingBundle, user_id: int, features: np.ndarray) -> List[Dict]:
+    # Same reason shape as generate_explanation; only features that raise the churn score
+    # (positive contributions) are risk factors, features that lower it are left out
+    reasons = []
+    for idx in serving.top_features[user_id].tolist():
+        contribution = float(serving.contributions[user_id, idx])
+        if contribution <= 0:
+            continue
+        value = float(features[0, idx])
+        value = "-" if np.isnan(value) else int(value) if value.is_integer() else round(value, 2)
+
+        reasons.append({
+            "feature": serving.feature_names[idx],
+            "value": value,
+            "impact": "Critical" if contribution >= 1.0 else "High" if contribution >= 0.3 else "Medium",
+            "message": f"{serving.feature_names[idx]} ({value}) raises the churn risk."
+        })
+
+    if not reasons:
+        reasons.append({
+            "feature": "General Profile",
+            "value": "-",
+            "impact": "Uncertain",
+            "message": "User profile matches high-risk patterns."
+        })
+    return reasons
+
+def build_explanation(serving: ServingBundle, user_id: int, features: np.ndarray, prob: float) -> Dict:
+    if serving.contributions is not None:
+        reasons = generate_contribution_explanation(serving, user_id, features)
+    else:
+        reasons = generate_explanation(dict(zip(serving.feature_names, features[0].tolist())))
     
-    _, _, user_row = data
-    mem_days = int(user_row.get('membership_days', 365))
+    if prob < 0.5:
+        reasons = [{
+            "feature": "-", 
+            "value": "-", 
+            "impact": "None", 
+            "message": "User appears safe based on current activity."
+        }]
+
+    return {
+        "user_id": user_id,
+        "msno": serving.msno_index.key(user_id),
+        "risk_score": round(prob, 4),
+        "reasons": reasons
+    }
+
+def build_user_stats(serving: ServingBundle, user_id: int) -> Dict:
+    mem_days = int(serving.stats_columns['membership_days'][user_id])
     if mem_days < 0: mem_days = 0
-    total_trans = int(user_row.get('total_transactions', 12))
-    days_expire = int(user_row.get('days_to_expire', 30))
+    total_trans = int(serving.stats_columns['total_transactions'][user_id])
+    days_expire = int(serving.stats_columns['days_to_expire'][user_id])
     last_active = "2017-03-31"
 
     return {
         "user_id": user_id,
+        "msno": serving.msno_index.key(user_id),
         "membership_days": mem_days,
         "total_transactions": total_trans,
         "days_to_expire": days_expire,
         "last_active_date": last_active
     }
 
-@app.get("/predict/{user_id}", response_model=PredictionResponse)
-def predict_churn(user_id: int):
-    data = get_user_data(user_id)
+def get_scored_user(serving: ServingBundle, user_id: int) -> Optional[Dict]:
+    mark("dispatch")
+    check_artifacts()
+    key = (serving.version, serving.generation, user_id)
+    entry = prediction_cache.get(key)
+    mark("cache")
+    if entry is not None:
+        return entry
+
+    # Concurrent misses for the same user (e.g. after an alert email) share one computation
+    entry = user_flight.do(key, lambda: score_user(serving, user_id, key))
+    mark("coalesce")
+    return entry
+
+def score_user(serving: ServingBundle, user_id: int, key) -> Optional[Dict]:
+    data = get_user_data(serving, user_id)
+    mark("lookup")
+    if not data:
+        return None
+
+    features, actual_churn = data
+    prob = float(serving.score_probs[user_id])
+    prediction = build_prediction(serving, user_id, prob, actual_churn)
+    mark("predict")
+    explanation = build_explanation(serving, user_id, features, prob)
+    mark("explain")
+    entry = {"prediction": prediction, "explanation": explanation}
+    prediction_cache.put(key, entry)
+    return entry
+
+@app.get("/")
+def home():
+    return {"message": "Welcome to Churn Prediction API. Visit /docs for documentation."}
+
+@app.get("/users/random", response_model=RandomUserResponse)
+def get_random_user(
+    risk_level: Optional[str] = None,
+    actual: Optional[int] = Query(None, ge=0, le=1),
+    predicted: Optional[bool] = None,
+    n: int = Query(1, ge=1, le=MAX_RANDOM_USERS),
+    serving: ServingBundle = Depends(get_serving)
+):
+    # Without filters, sample actual churners like the original endpoint
+    if risk_level is None and actual is None and predicted is None:
+        actual = 1
+
+    risks = range(len(RISK_LEVELS))
+    if risk_level is not None:
+        levels = [level.lower() for level in RISK_LEVELS]
+        if risk_level.lower() not in levels:
+            raise HTTPException(status_code=422, detail=f"risk_level must be one of {list(RISK_LEVELS)}")
+        risks = [levels.index(risk_level.lower())]
+
+    buckets = [
+        sample_bucket(a, p, r)
+        for a in ((-1, 0, 1) if actual is None else (actual,))
+        for p in ((0, 1) if predicted is None else (int(predicted),))
+        for r in risks
+    ]
+    starts = serving.sample_offsets[buckets]
+    sizes = serving.sample_offsets[np.asarray(buckets) + 1] - starts
+    matched = int(sizes.sum())
+    if matched == 0:
+        return {"user_id": 0, "user_ids": [], "matched": 0}
+
+    # Draw positions in the concatenation of the matching bucket slices, then map back to rows
+    picks = sample_rng.choice(matched, size=min(n, matched), replace=False)
+    ends = np.cumsum(sizes)
+    which = np.searchsorted(ends, picks, side='right')
+    user_ids = serving.sample_order[starts[which] + picks - (ends[which] - sizes[which])].tolist()
+    return {"user_id": user_ids[0], "user_ids": user_ids, "matched": matched}
+
+def parse_row_filters(serving: ServingBundle, where: List[str]):
+    """``feature:op:value`` filters -> (column getter, ufunc, value), checked against precomputed arrays."""
+    filters = []
+    for clause in where:
+        parts = clause.split(":")
+        if len(parts) != 3 or parts[1] not in FILTER_OPS:
+            raise HTTPException(status_code=422, detail=f"Invalid filter '{clause}', expected feature:op:value with op in {list(FILTER_OPS)}")
+        name, op, raw_value = parts
+        try:
+            value = float(raw_value)
+        except ValueError:
+            raise HTTPException(status_code=422, detail=f"Invalid filter value in '{clause}'")
+
+        if name in serving.feature_names:
+            col = serving.feature_names.index(name)
+            filters.append((lambda rows, col=col: serving.feature_matrix[rows, col], FILTER_OPS[op], value))
+        elif name in serving.stats_columns:
+            filters.append((lambda rows, name=name: serving.stats_columns[name][rows], FILTER_OPS[op], value))
+        else:
+            raise HTTPException(status_code=422, detail=f"Unknown filter column '{name}'")
+    return filters
+
+def scan_ranked(order: np.ndarray, start: int, k: int, skip: int, filters) -> tuple:
+    """Walk ``order`` from ``start`` in growing blocks; return (matching rows, position after the last one)."""
+    found = []
+    n_found = 0
+    pos = start
+    block = max(1024, 4 * (k + skip))
+    while pos < len(order) and n_found < k + skip:
+        rows = order[pos:pos + block]
+        mask = np.ones(len(rows), dtype=bool)
+        for getter, op, value in filters:
+            mask &= op(getter(rows), value)
+        hits = np.flatnonzero(mask)
+
+        need = k + skip - n_found
+        if len(hits) >= need:
+            hits = hits[:need]
+            found.append(rows[hits])
+            return np.concatenate(found)[skip:], pos + int(hits[-1]) + 1
+        found.append(rows[hits])
+        n_found += len(hits)
+        pos += len(rows)
+        block *= 2
+
+    matched = np.concatenate(found) if found else np.empty(0, dtype=order.dtype)
+    return matched[skip:], len(order)
+
+@app.get("/users/top-risk", response_model=TopRiskResponse)
+def get_top_risk_users(
+    k: int = Query(100, ge=1, le=MAX_TOP_RISK),
+    offset: int = Query(0, ge=0),
+    cursor: Optional[str] = None,
+    min_days_to_expire: Optional[int] = None,
+    where: List[str] = Query([]),
+    serving: ServingBundle = Depends(get_serving)
+):
+    """Highest churn probability first. ``cursor`` (from ``next_cursor``) resumes a scan; ``offset`` skips matches."""
+    start = 0
+    if cursor is not None:
+        version, _, position = cursor.partition(":")
+        if version != serving.version or not position.isdigit():
+            raise HTTPException(status_code=409, detail="Cursor is invalid or belongs to another model version")
+        start = int(position)
+
+    filters = parse_row_filters(serving, where)
+    if min_days_to_expire is not None:
+        filters.append((lambda rows: serving.stats_columns['days_to_expire'][rows], np.greater_equal, min_days_to_expire))
+
+    rows, end = scan_ranked(serving.risk_order, start, k, offset, filters)
+    results = [
+        {
+            "user_id": row,
+            "msno": serving.msno_index.key(row),
+            "churn_probability": round(prob, 4),
+            "risk_level": RISK_LEVELS[risk],
+            "actual_status": actual,
+            "days_to_expire": days
+        }
+        for row, prob, risk, actual, days in zip(
+            rows.tolist(),
+            serving.score_probs[rows].tolist(),
+            serving.score_risk[rows].tolist(),
+            serving.churn_labels[rows].tolist(),
+            serving.stats_columns['days_to_expire'][rows].tolist()
+        )
+    ]
+
+    return {
+        "count": len(results),
+        "next_cursor": f"{serving.version}:{end}" if end < serving.n_users else None,
+        "results": results
+    }
+
+@app.get("/user-stats/{user_id}", response_model=UserStatsResponse)
+def get_user_stats(user_id: int, serving: ServingBundle = Depends(get_serving)):
+    data = get_user_data(serving, user_id)
     if not data:
         raise HTTPException(status_code=404, detail="User not found")
     
-    features, actual_churn, _ = data
-    prob = float(model.predict_proba(features)[:, 1][0])
-    threshold = 0.9
-    prediction = bool(prob >= threshold)
-    
-    if prob > 0.9: risk_level = "Critical"
-    elif prob > 0.7: risk_level = "High"
-    elif prob > 0.4: risk_level = "Moderate"
-    else: risk_level = "Low"
+    return build_user_stats(serving, user_id)
+
+@app.get("/user-stats/by-msno/{msno}", response_model=UserStatsResponse)
+def get_user_stats_by_msno(msno: str, serving: ServingBundle = Depends(get_serving)):
+    return get_user_stats(resolve_msno(serving, msno), serving)
+
+def apply_threshold(prediction: Dict, threshold: Optional[float]) -> Dict:
+    if threshold is None:
+        return prediction
+    return dict(prediction, is_churn_prediction=bool(prediction["churn_probability"] >= threshold))
+
+@app.get("/predict/{user_id}", response_model=PredictionResponse)
+def predict_churn(
+    user_id: int,
+    threshold: Optional[float] = Query(None, ge=0.0, le=1.0),
+    serving: ServingBundle = Depends(get_serving)
+):
+    entry = get_scored_user(serving, user_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="User not found")
     
+    return apply_threshold(entry["prediction"], threshold)
+
+@app.get("/predict/by-msno/{msno}", response_model=PredictionResponse)
+def predict_churn_by_msno(
+    msno: str,
+    threshold: Optional[float] = Query(None, ge=0.0, le=1.0),
+    serving: ServingBundle = Depends(get_serving)
+):
+    return predict_churn(resolve_msno(serving, msno), threshold, serving)
+
+@app.post("/predict/batch", response_model=BatchPredictionResponse)
+def predict_batch(request: BatchPredictionRequest, serving: ServingBundle = Depends(get_serving)):
+    user_ids = request.user_ids
+    msnos = request.msnos
+    threshold = CHURN_THRESHOLD if request.threshold is None else request.threshold
+    n_items = len(user_ids) + len(msnos)
+    if n_items > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=413, detail=f"Batch size exceeds {MAX_BATCH_SIZE} users")
+
+    # Results follow request order: all user_ids first, then all msnos
+    rows = np.full(n_items, -1, dtype=np.int64)
+    for i, uid in enumerate(user_ids):
+        if 0 <= uid < serving.n_users:
+            rows[i] = uid
+    if msnos:
+        rows[len(user_ids):] = serving.msno_index.lookup_many(msnos)
+
+    keys = [{"user_id": uid} for uid in user_ids] + [{"msno": m} for m in msnos]
+    results = [dict(key, error="User not found") for key in keys]
+    valid_pos = np.flatnonzero(rows >= 0)
+
+    if valid_pos.size:
+        valid_rows = rows[valid_pos]
+        probs = serving.score_probs[valid_rows]
+        risks = serving.score_risk[valid_rows]
+        actuals = serving.churn_labels[valid_rows]
+
+        for pos, row, prob, risk, actual in zip(valid_pos.tolist(), valid_rows.tolist(), probs.tolist(), risks.tolist(), actuals.tolist()):
+            results[pos] = {
+                "user_id": row,
+                "msno": serving.msno_index.key(row),
+                "churn_probability": round(prob, 4),
+                "is_churn_prediction": bool(prob >= threshold),
+                "risk_level": RISK_LEVELS[risk],
+                "actual_status": int(actual)
+            }
+
     return {
-        "user_id": user_id,
+        "count": n_items,
+        "errors": n_items - len(valid_pos),
+        "results": results
+    }
+
+def summary_points(serving: ServingBundle, thresholds: np.ndarray) -> List[Dict]:
+    summary = threshold_summary(serving, thresholds)
+    columns = [(name, values.tolist()) for name, values in summary.items()]
+    return [{name: values[i] for name, values in columns} for i in range(len(thresholds))]
+
+@app.get("/thresholds/summary", response_model=ThresholdSummary)
+def get_threshold_summary(t: float = Query(CHURN_THRESHOLD, ge=0.0, le=1.0), serving: ServingBundle = Depends(get_serving)):
+    """Users flagged at ``prob >= t`` and precision/recall against ``is_churn`` (labeled users only)."""
+    return summary_points(serving, np.array([t]))[0]
+
+@app.get("/thresholds/sweep", response_model=ThresholdSweepResponse)
+def get_threshold_sweep(
+    steps: int = Query(101, ge=2, le=MAX_SWEEP_STEPS),
+    start: float = Query(0.0, ge=0.0, le=1.0),
+    stop: float = Query(1.0, ge=0.0, le=1.0),
+    serving: ServingBundle = Depends(get_serving)
+):
+    if start > stop:
+        raise HTTPException(status_code=422, detail="start must not exceed stop")
+
+    return {
+        "n_users": serving.n_users,
+        "labeled_users": int(serving.cum_labeled[-1]),
+        "churned_users": int(serving.cum_churn[-1]),
+        "points": summary_points(serving, np.linspace(start, stop, steps))
+    }
+
+@app.get("/segments", response_model=SegmentsResponse)
+def get_segments(
+    by: Optional[str] = None,
+    t: float = Query(CHURN_THRESHOLD, ge=0.0, le=1.0),
+    serving: ServingBundle = Depends(get_serving)
+):
+    # Answered from the histograms built with the score table; no per-row work here
+    dimensions = [dim.name for dim in segment_dimensions(serving.feature_names)]
+    if by is not None and by not in dimensions:
+        raise HTTPException(status_code=422, detail=f"Unknown segment dimension; expected one of {dimensions}")
+
+    summaries, threshold = summarize_segments(
+        serving.feature_names, serving.segment_hist, serving.segment_prob_sum,
+        t, RISK_BANDS, RISK_LEVELS, dimension=by
+    )
+    return {"threshold": threshold, "dimensions": summaries}
+
+def parse_scenarios(serving: ServingBundle, scenarios: List[str]) -> List:
+    try:
+        return [parse_scenario(text, serving.feature_names) for text in scenarios]
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def simulated_score(scenario: str, prob: float, baseline: float, threshold: float) -> Dict:
+    return {
+        "scenario": scenario,
         "churn_probability": round(prob, 4),
-        "is_churn_prediction": prediction,
-        "risk_level": risk_level,
-        "actual_status": actual_churn
+        "change": round(prob - baseline, 4),
+        "is_churn_prediction": bool(prob >= threshold),
+        "risk_level": RISK_LEVELS[int(np.searchsorted(RISK_BANDS, prob, side='left'))]
+    }
+
+@app.post("/simulate/population", response_model=PopulationSimulationResponse)
+def simulate_segment(request: PopulationSimulationRequest, serving: ServingBundle = Depends(get_serving)):
+    overrides = parse_scenarios(serving, [request.scenario])[0]
+    filters = parse_row_filters(serving, request.where)
+    threshold = CHURN_THRESHOLD if request.threshold is None else request.threshold
+
+    segment_codes = None
+    if request.dimension is not None or request.segment is not None:
+        dims = {dim.name: dim for dim in segment_dimensions(serving.feature_names)}
+        dim = dims.get(request.dimension)
+        if dim is None or request.segment not in dim.labels:
+            raise HTTPException(status_code=422, detail=f"Unknown segment; dimensions are {list(dims)}, see /segments for labels")
+        segment_codes, segment_code = dim.codes, dim.labels.index(request.segment)
+
+    def select(start: int, stop: int) -> np.ndarray:
+        mask = np.ones(stop - start, dtype=bool)
+        if segment_codes is not None:
+            stats = {name: values[start:stop] for name, values in serving.stats_columns.items()}
+            mask &= segment_codes(serving.feature_matrix[start:stop], stats) == segment_code
+        rows = np.arange(start, stop)
+        for getter, op, value in filters:
+            mask &= op(getter(rows), value)
+        return mask
+
+    result = simulate_population(serving.model, serving.feature_matrix, serving.score_probs, select, overrides, threshold)
+    return dict(result, scenario=request.scenario, threshold=threshold)
+
+@app.post("/simulate/{user_id}", response_model=SimulationResponse)
+def simulate_user(user_id: int, request: SimulationRequest, serving: ServingBundle = Depends(get_serving)):
+    if not request.scenarios:
+        raise HTTPException(status_code=422, detail="No scenarios given")
+    if len(request.scenarios) > MAX_SIMULATION_SCENARIOS:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_SIMULATION_SCENARIOS} scenarios per request")
+    user_data = get_user_data(serving, user_id)
+    if user_data is None:
+        raise HTTPException(status_code=404, detail="User not found")
+
+    scenarios = parse_scenarios(serving, request.scenarios)
+    threshold = CHURN_THRESHOLD if request.threshold is None else request.threshold
+    baseline = float(serving.score_probs[user_id])
+    probs = simulate_row(serving.model, user_data[0], scenarios)
+
+    return {
+        "user_id": user_id,
+        "msno": serving.msno_index.key(user_id),
+        "baseline": simulated_score("baseline", baseline, baseline, threshold),
+        "variants": [simulated_score(text, prob, baseline, threshold) for text, prob in zip(request.scenarios, probs.tolist())]
     }
 
+@app.post("/simulate/by-msno/{msno}", response_model=SimulationResponse)
+def simulate_user_by_msno(msno: str, request: SimulationRequest, serving: ServingBundle = Depends(get_serving)):
+    return simulate_user(resolve_msno(serving, msno), request, serving)
+
 @app.get("/explain/{user_id}", response_model=ExplanationResponse)
-def explain_churn(user_id: int):
-    data = get_user_data(user_id)
-    if not data:
+def explain_churn(user_id: int, serving: ServingBundle = Depends(get_serving)):
+    entry = get_scored_user(serving, user_id)
+    if not entry:
         raise HTTPException(status_code=404, detail="User not found")
     
-    features, _, user_row = data
-    prob = float(model.predict_proba(features)[:, 1][0])
-    reasons = generate_explanation(user_row)
-    
-    if prob < 0.5:
-        reasons = [{
-            "feature": "-", 
-            "value": "-", 
-            "impact": "None", 
-            "message": "User appears safe based on current activity."
-        }]
+    return entry["explanation"]
+
+@app.get("/explain/by-msno/{msno}", response_model=ExplanationResponse)
+def explain_churn_by_msno(msno: str, serving: ServingBundle = Depends(get_serving)):
+    return explain_churn(resolve_msno(serving, msno), serving)
+
+@app.get("/dashboard/{user_id}", response_model=DashboardResponse)
+def get_dashboard(user_id: int, serving: ServingBundle = Depends(get_serving)):
+    entry = get_scored_user(serving, user_id)
+    if not entry:
+        raise HTTPException(status_code=404, detail="User not found")
 
     return {
         "user_id": user_id,
-        "risk_score": round(prob, 4),
-        "reasons": reasons
+        "msno": serving.msno_index.key(user_id),
+        "prediction": entry["prediction"],
+        "explanation": entry["explanation"],
+        "stats": build_user_stats(serving, user_id)
+    }
+
+@app.get("/dashboard/by-msno/{msno}", response_model=DashboardResponse)
+def get_dashboard_by_msno(msno: str, serving: ServingBundle = Depends(get_serving)):
+    return get_dashboard(resolve_msno(serving, msno), serving)
+
+@app.post("/score", response_model=ScoreResponse)
+async def score_features(request: ScoreRequest, serving: ServingBundle = Depends(get_serving)):
+    # Raw feature rows are not in the score table; concurrent calls share one booster call via the micro-batcher
+    missing = [name for name in serving.feature_names if name not in request.features]
+    if missing:
+        raise HTTPException(status_code=422, detail=f"Missing features: {missing}")
+
+    values = [request.features[name] for name in serving.feature_names]
+    row = np.array([np.nan if v is None else v for v in values], dtype=np.float32)
+    prob = await score_batcher.submit(serving.model, row)
+
+    return {
+        "churn_probability": round(prob, 4),
+        "is_churn_prediction": bool(prob >= CHURN_THRESHOLD),
+        "risk_level": RISK_LEVELS[int(np.searchsorted(RISK_BANDS, prob, side='left'))]
+    }
+
+@app.post("/score/stream")
+async def score_features_stream(request: Request, serving: ServingBundle = Depends(get_serving)):
+    """Score an NDJSON (default) or CSV (Content-Type: text/csv) body; results stream back as NDJSON."""
+    content_type = request.headers.get("content-type", "")
+    parser_factory = CsvRowParser if "csv" in content_type else NdjsonRowParser
+
+    return DuplexStreamingResponse(
+        score_stream(
+            request.stream(),
+            serving.model,
+            serving.feature_names,
+            parser_factory,
+            chunk_rows=STREAM_CHUNK_ROWS,
+            max_rows=STREAM_MAX_ROWS,
+            max_line_bytes=STREAM_MAX_LINE_BYTES,
+        ),
+        media_type="application/x-ndjson"
+    )
+
+@app.get("/score/stats")
+def get_score_stats():
+    return score_batcher.stats()
+
+@app.get("/cache/stats")
+def get_cache_stats():
+    version = serving_bundle.version if serving_bundle else None
+    return dict(prediction_cache.stats(), model_version=version, singleflight=user_flight.stats())
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    serving = serving_bundle
+    cache = prediction_cache.stats()
+    batcher = score_batcher.stats()
+    flight = user_flight.stats()
+    series = {
+        "churn_model_info": ("gauge", "Currently served model version", [({"version": serving.version if serving else "none"}, 1)]),
+        "churn_model_loaded_timestamp_seconds": ("gauge", "When the serving bundle was loaded", [({}, serving.loaded_at if serving else 0.0)]),
+        "churn_users": ("gauge", "Users in the serving table", [({}, serving.n_users if serving else 0)]),
+        "churn_explanations_info": ("gauge", "Explanation mode", [({"mode": explanation_mode}, 1)]),
+        "churn_prediction_cache_entries": ("gauge", "Prediction cache size", [({}, cache["size"])]),
+        "churn_prediction_cache_max_entries": ("gauge", "Prediction cache capacity", [({}, cache["maxsize"])]),
+        "churn_prediction_cache_events_total": ("counter", "Prediction cache hits, misses and evictions",
+                                                [({"event": name}, cache[name]) for name in ("hits", "misses", "evictions")]),
+        "churn_singleflight_calls_total": ("counter", "Prediction cache misses computed (leader) or joined in flight (shared)",
+                                           [({"role": "leader"}, flight["leaders"]), ({"role": "shared"}, flight["shared"])]),
+        "churn_singleflight_in_flight": ("gauge", "User computations currently in flight", [({}, flight["in_flight"])]),
+        "churn_score_batches_total": ("counter", "Micro-batches scored by /score", [({}, batcher["batches"])]),
+        "churn_score_rows_total": ("counter", "Rows scored by /score", [({}, batcher["rows"])]),
     }
+    return PlainTextResponse(metrics_registry.render(series), media_type="text/plain; version=0.0.4")
+
+def get_reload_status() -> Dict:
+    serving = serving_bundle
+    return dict(
+        reload_status,
+        model_version=serving.version if serving else None,
+        loaded_at=serving.loaded_at if serving else None,
+        explanations=explanation_mode
+    )
+
+@app.post("/admin/reload", response_model=ReloadStatusResponse, status_code=202)
+def trigger_reload(background_tasks: BackgroundTasks):
+    if not reload_lock.acquire(blocking=False):
+        raise HTTPException(status_code=409, detail="A reload is already in progress")
+
+    reload_status.update(state="loading", error=None, started_at=time.time(), finished_at=None)
+    background_tasks.add_task(reload_artifacts)
+    return get_reload_status()
+
+@app.get("/admin/reload", response_model=ReloadStatusResponse)
+def reload_state():
+    return get_reload_status()
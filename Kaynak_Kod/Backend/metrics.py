@@ -0,0 +1,189 @@
+import bisect
+import contextvars
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Upper bounds in seconds; requests served from the precomputed tables take well under a millisecond
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_current_timer: contextvars.ContextVar[Optional["StageTimer"]] = contextvars.ContextVar("stage_timer", default=None)
+
+
+class StageTimer:
+    """Splits one request into consecutive stages with one clock read per stage.
+
+    ``mark(stage)`` charges the time since the previous mark to ``stage``; the
+    samples are only aggregated when the request finishes, under a single lock.
+    """
+
+    __slots__ = ("last", "stages")
+
+    def __init__(self):
+        self.last = time.perf_counter()
+        self.stages: List[Tuple[str, float]] = []
+
+    def mark(self, stage: str):
+        now = time.perf_counter()
+        self.stages.append((stage, now - self.last))
+        self.last = now
+
+
+def mark(stage: str):
+    """End ``stage`` of the current request; a no-op outside an instrumented request."""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.mark(stage)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class EndpointMetrics:
+    __slots__ = ("statuses", "errors", "latency", "stages")
+
+    def __init__(self):
+        self.statuses: Dict[int, int] = {}
+        self.errors = 0
+        self.latency = Histogram()
+        self.stages: Dict[str, Histogram] = {}
+
+
+class MetricsRegistry:
+    """Per-endpoint request counts, error counts and latency histograms (request and stage)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.endpoints: Dict[Tuple[str, str], EndpointMetrics] = {}
+
+    def record(self, method: str, endpoint: str, status: int, duration: float, stages: Iterable[Tuple[str, float]]):
+        with self._lock:
+            entry = self.endpoints.get((method, endpoint))
+            if entry is None:
+                entry = self.endpoints[(method, endpoint)] = EndpointMetrics()
+            entry.statuses[status] = entry.statuses.get(status, 0) + 1
+            if status >= 400:
+                entry.errors += 1
+            entry.latency.observe(duration)
+
+            for stage, seconds in stages:
+                hist = entry.stages.get(stage)
+                if hist is None:
+                    hist = entry.stages[stage] = Histogram()
+                hist.observe(seconds)
+
+    def render(self, series: Dict[str, Tuple[str, str, List[Tuple[Dict[str, str], float]]]]) -> str:
+        """Prometheus text exposition; ``series`` adds name -> (type, help, [(labels, value)]) from elsewhere."""
+        lines = []
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            _counter(lines, "churn_requests_total", "HTTP requests by endpoint and status code",
+                     [({"method": m, "endpoint": e, "status": str(status)}, count)
+                      for (m, e), entry in endpoints for status, count in sorted(entry.statuses.items())])
+            _counter(lines, "churn_request_errors_total", "HTTP requests answered with status >= 400",
+                     [({"method": m, "endpoint": e}, entry.errors) for (m, e), entry in endpoints])
+            _histogram(lines, "churn_request_duration_seconds", "Time until the response headers are sent",
+                       [({"method": m, "endpoint": e}, entry.latency) for (m, e), entry in endpoints])
+            _histogram(lines, "churn_stage_duration_seconds", "Time per request stage",
+                       [({"method": m, "endpoint": e, "stage": stage}, hist)
+                        for (m, e), entry in endpoints for stage, hist in sorted(entry.stages.items())])
+
+        for name, (kind, help_text, samples) in series.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{_labels(labels)} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware: times every request and installs a ``StageTimer`` for handlers.
+
+    The time between the handler's last mark and the response start (response
+    model validation and JSON encoding) is recorded as the ``serialize`` stage.
+    Unmatched paths share one label to keep the series count bounded.
+    """
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = StageTimer()
+        start = timer.last
+        started = False
+        token = _current_timer.set(timer)
+
+        async def send_wrapper(message):
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+                if timer.stages:
+                    timer.mark("serialize")
+                self.registry.record(scope["method"], _endpoint(scope), message["status"],
+                                     time.perf_counter() - start, timer.stages)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            if not started:
+                self.registry.record(scope["method"], _endpoint(scope), 500, time.perf_counter() - start, timer.stages)
+            raise
+        finally:
+            _current_timer.reset(token)
+
+
+def _endpoint(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    escaped = (f'{k}="{_escape(str(v))}"' for k, v in labels.items())
+    return "{" + ",".join(escaped) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _counter(lines: List[str], name: str, help_text: str, samples):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} counter")
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(labels)} {value}")
+
+
+def _histogram(lines: List[str], name: str, help_text: str, samples):
+    lines.append(f"# HELP {name} {help_text}")
+    lines.append(f"# TYPE {name} histogram")
+    for labels, hist in samples:
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), hist.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f"{name}_bucket{_labels(dict(labels, le=le))} {cumulative}")
+        lines.append(f"{name}_sum{_labels(labels)} {hist.total!r}")
+        lines.append(f"{name}_count{_labels(labels)} {hist.count}")
@@ -0,0 +1,81 @@
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+class MicroBatcher:
+    """Coalesces concurrent single-row scoring calls into batched ``predict_proba`` calls.
+
+    The first request of a batch opens a window of ``max_wait_ms``; everything that
+    arrives before it closes (up to ``max_batch_size`` rows) is stacked into one
+    matrix and scored in a worker thread, then each waiting future gets its own
+    probability back. Rows are grouped by model, so a hot reload in the middle of a
+    window never scores a row with the wrong model.
+    """
+
+    def __init__(self, max_wait_ms: float = 2.0, max_batch_size: int = 64):
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max(1, max_batch_size)
+        self.batches = 0
+        self.rows = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_worker(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run())
+
+    async def submit(self, model, row: np.ndarray) -> float:
+        self._ensure_worker()
+        future = self._loop.create_future()
+        self._queue.put_nowait((model, row, future))
+        return await future
+
+    def _drain(self, batch: List[Tuple]):
+        while len(batch) < self.max_batch_size and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _run(self):
+        while True:
+            batch = [await self._queue.get()]
+            self._drain(batch)
+            if len(batch) < self.max_batch_size and self.max_wait > 0:
+                await asyncio.sleep(self.max_wait)
+                self._drain(batch)
+            await self._flush(batch)
+
+    async def _flush(self, batch: List[Tuple]):
+        groups: Dict[int, List[Tuple]] = {}
+        for item in batch:
+            groups.setdefault(id(item[0]), []).append(item)
+
+        for items in groups.values():
+            model = items[0][0]
+            X = np.stack([row for _, row, _ in items])
+            try:
+                probs = await self._loop.run_in_executor(None, lambda: model.predict_proba(X)[:, 1])
+            except Exception as e:
+                for _, _, future in items:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            self.batches += 1
+            self.rows += len(items)
+            for (_, _, future), prob in zip(items, probs.tolist()):
+                if not future.done():
+                    future.set_result(prob)
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": self.rows / self.batches if self.batches else 0.0,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "max_batch_size": self.max_batch_size,
+        }
@@ -0,0 +1,142 @@
+import numpy as np
+from typing import Iterable, Optional
+
+FNV_OFFSET = 0xCBF29CE484222325
+FNV_PRIME = 0x100000001B3
+MASK_64 = 0xFFFFFFFFFFFFFFFF
+MAX_LOAD_FACTOR = 0.7
+EMPTY = -1
+
+
+def _hash_words(words: np.ndarray) -> np.ndarray:
+    h = np.full(words.shape[0], FNV_OFFSET, dtype=np.uint64)
+    for col in range(words.shape[1]):
+        h ^= words[:, col]
+        h *= np.uint64(FNV_PRIME)
+    h ^= h >> np.uint64(29)
+    return h
+
+
+def _to_words(keys: np.ndarray, width: int) -> np.ndarray:
+    n_words = (width + 7) // 8
+    padded = np.zeros((len(keys), n_words * 8), dtype=np.uint8)
+    padded[:, :width] = keys.view(np.uint8).reshape(len(keys), width)
+    return padded.view('<u8')
+
+
+def _hash_one(key: bytes, width: int) -> int:
+    buf = key.ljust(((width + 7) // 8) * 8, b'\0')
+    h = FNV_OFFSET
+    for i in range(0, len(buf), 8):
+        h ^= int.from_bytes(buf[i:i + 8], 'little')
+        h = (h * FNV_PRIME) & MASK_64
+    return h ^ (h >> 29)
+
+
+class MsnoIndex:
+    """Open-addressing (linear probing) hash index from msno to row position.
+
+    Keys are kept as one fixed-width bytes array and the table only stores row
+    numbers, so memory stays around ``n * (width + 4 / load)`` bytes instead of a
+    Python dict of str. When a msno occurs more than once, the first row wins.
+    """
+
+    def __init__(self, msnos: Iterable[str]):
+        self.keys = np.asarray([m.encode('ascii') for m in msnos], dtype=np.bytes_)
+        if self.keys.size == 0:
+            self.keys = np.empty(0, dtype='S1')
+        self.width = self.keys.dtype.itemsize
+
+        n_rows = len(self.keys)
+        size = 8
+        while size * MAX_LOAD_FACTOR < n_rows:
+            size *= 2
+        self.mask = size - 1
+        row_dtype = np.int32 if n_rows < np.iinfo(np.int32).max else np.int64
+        self.table = np.full(size, EMPTY, dtype=row_dtype)
+        self._insert_all()
+
+    @classmethod
+    def from_arrays(cls, keys: np.ndarray, table: np.ndarray) -> "MsnoIndex":
+        """Wrap a previously built ``keys``/``table`` pair (e.g. memory-mapped) without rehashing."""
+        index = cls.__new__(cls)
+        index.keys = keys
+        index.width = keys.dtype.itemsize
+        index.mask = len(table) - 1
+        index.table = table
+        return index
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    @property
+    def nbytes(self) -> int:
+        return self.keys.nbytes + self.table.nbytes
+
+    def _insert_all(self):
+        if len(self.keys) == 0:
+            return
+
+        pos = (_hash_words(_to_words(self.keys, self.width)) & np.uint64(self.mask)).astype(np.int64)
+        pending = np.arange(len(self.keys), dtype=np.int64)
+        while pending.size:
+            slots = pos[pending]
+            occupant = self.table[slots]
+            empty = occupant == EMPTY
+
+            # A repeated msno finds its first row already in the chain and is dropped
+            duplicate = ~empty & (self.keys[occupant] == self.keys[pending])
+
+            claim_slots, first = np.unique(slots[empty], return_index=True)
+            winners = pending[empty][first]
+            self.table[claim_slots] = winners
+
+            placed = np.zeros(len(pending), dtype=bool)
+            placed[np.flatnonzero(empty)[first]] = True
+            pending = pending[~placed & ~duplicate]
+            pos[pending] = (pos[pending] + 1) & self.mask
+
+    def _encode(self, msno: str) -> Optional[bytes]:
+        try:
+            key = msno.encode('ascii')
+        except UnicodeEncodeError:
+            return None
+        return key if len(key) <= self.width else None
+
+    def lookup(self, msno: str) -> int:
+        key = self._encode(msno)
+        if key is None or len(self.keys) == 0:
+            return EMPTY
+
+        slot = _hash_one(key, self.width) & self.mask
+        while True:
+            row = int(self.table[slot])
+            if row == EMPTY or self.keys[row] == key:
+                return row
+            slot = (slot + 1) & self.mask
+
+    def lookup_many(self, msnos: Iterable[str]) -> np.ndarray:
+        msnos = list(msnos)
+        rows = np.full(len(msnos), EMPTY, dtype=np.int64)
+        if not msnos or len(self.keys) == 0:
+            return rows
+
+        encoded = [self._encode(m) for m in msnos]
+        valid = np.fromiter((k is not None for k in encoded), dtype=bool, count=len(encoded))
+        queries = np.asarray([k or b'' for k in encoded], dtype=f'S{self.width}')
+
+        pending = np.flatnonzero(valid)
+        pos = (_hash_words(_to_words(queries, self.width)) & np.uint64(self.mask)).astype(np.int64)
+        while pending.size:
+            row = self.table[pos[pending]].astype(np.int64)
+            miss = row == EMPTY
+            hit = ~miss & (self.keys[np.where(miss, 0, row)] == queries[pending])
+            rows[pending[hit]] = row[hit]
+            pending = pending[~miss & ~hit]
+            pos[pending] = (pos[pending] + 1) & self.mask
+        return rows
+
+    def key(self, row: int) -> Optional[str]:
+        if 0 <= row < len(self.keys):
+            return self.keys[row].decode('ascii')
+        return None
@@ -0,0 +1,130 @@
+import dataclasses
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+
+HIST_BINS = 100
+SEGMENT_CHUNK_SIZE = 500_000
+DAYS_TO_EXPIRE_EDGES = (0, 8, 31, 91, 181)
+MEMBERSHIP_DAYS_EDGES = (90, 365, 730, 1460)
+
+
+def _float32_ceil(values) -> np.ndarray:
+    # Smallest float32 >= each value, so bucketing float32 probabilities agrees with "prob >= edge"
+    values = np.asarray(values, dtype=np.float64)
+    v32 = values.astype(np.float32)
+    return np.where(v32 < values, np.nextafter(v32, np.float32(np.inf)), v32)
+
+
+BIN_EDGES = _float32_ceil(np.arange(HIST_BINS + 1) / HIST_BINS)
+
+
+def _range_labels(edges, unit: str) -> List[str]:
+    labels = [f"< {edges[0]} {unit}"]
+    labels += [f"{lo}-{hi - 1} {unit}" for lo, hi in zip(edges[:-1], edges[1:])]
+    labels.append(f">= {edges[-1]} {unit}")
+    return labels
+
+
+@dataclasses.dataclass(frozen=True)
+class SegmentDimension:
+    name: str
+    labels: List[str]
+    # (feature block, stats block) -> segment code per row, 0 <= code < len(labels)
+    codes: Callable[[np.ndarray, Dict[str, np.ndarray]], np.ndarray]
+
+
+def segment_dimensions(feature_names: List[str]) -> List[SegmentDimension]:
+    """Cohort definitions; they only depend on the feature list, so they are not stored."""
+    dims = []
+
+    via_columns = [i for i, name in enumerate(feature_names) if name.startswith("registered_via_")]
+    if via_columns:
+        via_labels = [feature_names[i][len("registered_via_"):].removesuffix(".0") for i in via_columns]
+
+        def via_codes(features, stats, via_columns=via_columns):
+            one_hot = features[:, via_columns] > 0
+            # Rows with none of the kept one-hot columns set fall into "other"
+            return np.where(one_hot.any(axis=1), one_hot.argmax(axis=1), len(via_columns))
+
+        dims.append(SegmentDimension("registered_via", via_labels + ["other"], via_codes))
+
+    if "is_auto_renew_max" in feature_names:
+        col = feature_names.index("is_auto_renew_max")
+        dims.append(SegmentDimension(
+            "is_auto_renew_max", ["0", "1"],
+            lambda features, stats: (features[:, col] > 0).astype(np.int64)
+        ))
+
+    dims.append(SegmentDimension(
+        "days_to_expire", _range_labels(DAYS_TO_EXPIRE_EDGES, "days"),
+        lambda features, stats: np.searchsorted(DAYS_TO_EXPIRE_EDGES, stats["days_to_expire"], side='right')
+    ))
+    dims.append(SegmentDimension(
+        "membership_days", _range_labels(MEMBERSHIP_DAYS_EDGES, "days"),
+        lambda features, stats: np.searchsorted(MEMBERSHIP_DAYS_EDGES, stats["membership_days"], side='right')
+    ))
+    return dims
+
+
+def build_segment_histograms(feature_matrix: np.ndarray, stats_columns: Dict[str, np.ndarray],
+                             feature_names: List[str], score_probs: np.ndarray):
+    """Per-segment probability histograms and probability sums, accumulated chunk by chunk.
+
+    Rows are the segments of all dimensions stacked in ``segment_dimensions`` order.
+    """
+    dims = segment_dimensions(feature_names)
+    offsets = np.cumsum([0] + [len(d.labels) for d in dims])
+    n_segments = int(offsets[-1])
+    hist = np.zeros((n_segments, HIST_BINS), dtype=np.int64)
+    prob_sum = np.zeros(n_segments, dtype=np.float64)
+
+    for start in range(0, len(score_probs), SEGMENT_CHUNK_SIZE):
+        stop = start + SEGMENT_CHUNK_SIZE
+        probs = score_probs[start:stop]
+        features = feature_matrix[start:stop]
+        stats = {name: values[start:stop] for name, values in stats_columns.items()}
+        bins = np.clip(np.searchsorted(BIN_EDGES, probs, side='right') - 1, 0, HIST_BINS - 1)
+
+        for dim, offset in zip(dims, offsets):
+            segment = offset + dim.codes(features, stats)
+            hist += np.bincount(segment * HIST_BINS + bins, minlength=n_segments * HIST_BINS).reshape(hist.shape)
+            prob_sum += np.bincount(segment, weights=probs, minlength=n_segments)
+
+    return hist, prob_sum
+
+
+def summarize_segments(feature_names: List[str], hist: np.ndarray, prob_sum: np.ndarray,
+                       threshold: float, risk_bands, risk_levels, dimension=None) -> Tuple[List[Dict], float]:
+    """Counts, mean probability, share at or above ``threshold`` and risk-level counts per segment.
+
+    Returns ``(dimensions, threshold_used)``: one summary per segment dimension (only
+    ``dimension`` if given) and the threshold the shares were computed at. The share is
+    read from the histogram, so ``threshold`` is rounded up to the next bin edge
+    (1 / HIST_BINS).
+    """
+    threshold_bin = int(np.ceil(round(threshold * HIST_BINS, 9)))
+    band_bins = [int(np.ceil(round(band * HIST_BINS, 9))) for band in risk_bands]
+    bounds = [0] + band_bins + [HIST_BINS]
+
+    dims = segment_dimensions(feature_names)
+    offsets = np.cumsum([0] + [len(d.labels) for d in dims])
+    result = []
+    for dim, offset in zip(dims, offsets):
+        if dimension is not None and dim.name != dimension:
+            continue
+        segments = []
+        for i, label in enumerate(dim.labels):
+            row = hist[offset + i]
+            count = int(row.sum())
+            segments.append({
+                "segment": label,
+                "count": count,
+                "mean_probability": float(prob_sum[offset + i] / count) if count else None,
+                "share_above_threshold": float(row[threshold_bin:].sum() / count) if count else None,
+                "risk_levels": {
+                    level: int(row[lo:hi].sum()) for level, lo, hi in zip(risk_levels, bounds[:-1], bounds[1:])
+                },
+            })
+        result.append({"dimension": dim.name, "segments": segments})
+    return result, threshold_bin / HIST_BINS
@@ -0,0 +1,435 @@
+import contextlib
+import dataclasses
+import hashlib
+import itertools
+import json
+import os
+import time
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from feature_store import (
+    build_feature_store, ensure_store, store_exists, store_lock, open_store, load_score_cache, save_score_cache
+)
+from msno_index import MsnoIndex
+from segments import HIST_BINS, build_segment_histograms, segment_dimensions
+from tree_engine import CompiledTreeModel
+
+try:
+    import xgboost as xgb
+except ImportError:
+    xgb = None
+
+# "xgboost": XGBClassifier, "numpy": tree_engine.CompiledTreeModel (no xgboost runtime needed)
+INFERENCE_ENGINE = os.environ.get("CHURN_INFERENCE_ENGINE", "xgboost" if xgb is not None else "numpy")
+
+CHURN_THRESHOLD = 0.9
+RISK_BANDS = (0.4, 0.7, 0.9)
+RISK_LEVELS = ("Low", "Moderate", "High", "Critical")
+# Sampling buckets: (actual label + 1) x predicted x risk level; label -1 means unknown
+N_SAMPLE_BUCKETS = 3 * 2 * len(RISK_LEVELS)
+SCORE_CHUNK_SIZE = 500_000
+CONTRIB_CHUNK_SIZE = 100_000
+EXPLAIN_TOP_K = int(os.environ.get("CHURN_EXPLAIN_TOP_K", "5"))
+# "exact": TreeSHAP (~3.5 ms/row/core for the lite model, default);
+# "approx": Saabas path attribution (~0.02 ms/row/core), opt in. Exact falls back to approx
+# for tables above CHURN_EXPLAIN_EXACT_MAX_ROWS rows (0 = no limit), where it would take hours
+EXPLAIN_METHOD = os.environ.get("CHURN_EXPLAIN_METHOD", "exact")
+EXPLAIN_EXACT_MAX_ROWS = int(os.environ.get("CHURN_EXPLAIN_EXACT_MAX_ROWS", "100000"))
+# Name the attributions are reported under in /metrics and /admin/reload
+EXPLAIN_LABELS = {"exact": "shap", "approx": "saabas"}
+
+_generations = itertools.count(1)
+
+
+@dataclasses.dataclass(frozen=True)
+class ServingBundle:
+    """Everything a request needs, loaded and validated together.
+
+    Handlers read the current bundle once and use only that reference, so a
+    reload that swaps in a new bundle is never observed half-applied. All arrays
+    are read-only. ``version`` identifies the model artifacts; ``generation`` is
+    unique per load, so a data-only reload still gets fresh cache keys.
+    """
+    version: str
+    generation: int
+    model: object
+    feature_names: List[str]
+    feature_importance_map: Dict[str, float]
+    feature_matrix: np.ndarray
+    churn_labels: np.ndarray
+    stats_columns: Dict[str, np.ndarray]
+    msno_index: MsnoIndex
+    score_probs: np.ndarray
+    score_risk: np.ndarray
+    sample_order: np.ndarray
+    sample_offsets: np.ndarray
+    risk_order: np.ndarray
+    sorted_probs: np.ndarray
+    cum_churn: np.ndarray
+    cum_labeled: np.ndarray
+    # Per-segment probability histograms (segments of all dimensions stacked) and probability sums
+    segment_hist: np.ndarray
+    segment_prob_sum: np.ndarray
+    loaded_at: float
+    # Set when the arrays are memory-mapped from a serving store; derived arrays are cached there
+    store_path: Optional[str] = None
+    # Per-feature contributions (log-odds, float16) and the top-k feature ids per row by
+    # contribution, largest risk-raising first; attached after load by compute_contributions.
+    # contribution_method is "exact" (TreeSHAP) or "approx" (Saabas)
+    contributions: Optional[np.ndarray] = None
+    top_features: Optional[np.ndarray] = None
+    contribution_method: Optional[str] = None
+
+    @property
+    def n_users(self) -> int:
+        return len(self.score_probs)
+
+
+def create_model():
+    if INFERENCE_ENGINE == "numpy":
+        return CompiledTreeModel()
+    if INFERENCE_ENGINE == "xgboost":
+        if xgb is None:
+            raise RuntimeError("CHURN_INFERENCE_ENGINE=xgboost but xgboost is not installed")
+        return xgb.XGBClassifier()
+    raise ValueError(f"Unknown CHURN_INFERENCE_ENGINE: {INFERENCE_ENGINE}")
+
+
+def compute_model_version(model_path: str, feature_list_path: str) -> str:
+    digest = hashlib.sha256()
+    for path in (model_path, feature_list_path):
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:12]
+
+
+def get_artifact_signature(*paths: str):
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            signature.append(None)
+    return tuple(signature)
+
+
+def get_model_feature_names(model) -> Optional[List[str]]:
+    if isinstance(model, CompiledTreeModel):
+        return model.feature_names or None
+    try:
+        return model.get_booster().feature_names
+    except Exception:
+        return None
+
+
+def build_score_table(model, feature_matrix: np.ndarray):
+    probs = np.empty(len(feature_matrix), dtype=np.float32)
+    for start in range(0, len(feature_matrix), SCORE_CHUNK_SIZE):
+        stop = start + SCORE_CHUNK_SIZE
+        probs[start:stop] = model.predict_proba(feature_matrix[start:stop])[:, 1]
+
+    score_risk = np.searchsorted(RISK_BANDS, probs, side='left').astype(np.int8)
+    return probs, score_risk
+
+
+def sample_bucket(actual, predicted, risk):
+    return (actual + 1) * 2 * len(RISK_LEVELS) + predicted * len(RISK_LEVELS) + risk
+
+
+def build_sample_index(churn_labels: np.ndarray, score_probs: np.ndarray, score_risk: np.ndarray):
+    """Group row ids by (actual, predicted, risk) so each bucket is a contiguous slice.
+
+    ``sample_order[sample_offsets[b]:sample_offsets[b + 1]]`` are the rows of bucket ``b``.
+    """
+    predicted = (score_probs >= CHURN_THRESHOLD).astype(np.int8)
+    buckets = sample_bucket(churn_labels.astype(np.int8), predicted, score_risk)
+    # Stable argsort on small integer keys is a radix/counting sort in NumPy
+    sample_order = np.argsort(buckets, kind='stable').astype(np.int32)
+    counts = np.bincount(buckets, minlength=N_SAMPLE_BUCKETS)
+    sample_offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return sample_order, sample_offsets
+
+
+def build_risk_order(score_probs: np.ndarray) -> np.ndarray:
+    # Row ids by descending probability; ties keep row order
+    return np.argsort(-score_probs, kind='stable').astype(np.int32)
+
+
+def build_threshold_index(churn_labels: np.ndarray, score_probs: np.ndarray, risk_order: np.ndarray):
+    """Probabilities in descending order plus prefix counts of churned and labeled users.
+
+    ``cum_churn[i]`` / ``cum_labeled[i]`` count the top ``i`` users, so any threshold
+    is answered with one binary search into ``sorted_probs``.
+    """
+    sorted_probs = score_probs[risk_order]
+    sorted_labels = churn_labels[risk_order]
+    cum_churn = np.concatenate([[0], np.cumsum(sorted_labels == 1, dtype=np.int64)])
+    cum_labeled = np.concatenate([[0], np.cumsum(sorted_labels >= 0, dtype=np.int64)])
+    return sorted_probs, cum_churn, cum_labeled
+
+
+def threshold_summary(bundle: ServingBundle, thresholds: np.ndarray) -> Dict[str, np.ndarray]:
+    """Flag counts and precision/recall/F1 against ``is_churn`` for each threshold (prob >= t)."""
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    # Smallest float32 >= t, so "float32 prob >= t" matches the per-user check exactly
+    # without promoting (and copying) the float32 score array in the search
+    t32 = thresholds.astype(np.float32)
+    t32 = np.where(t32 < thresholds, np.nextafter(t32, np.float32(np.inf)), t32)
+    # sorted_probs is descending: the first index whose probability is below t is the flag count
+    flagged = len(bundle.sorted_probs) - np.searchsorted(bundle.sorted_probs[::-1], t32, side='left')
+
+    tp = bundle.cum_churn[flagged]
+    labeled_flagged = bundle.cum_labeled[flagged]
+    positives = bundle.cum_churn[-1]
+    negatives = bundle.cum_labeled[-1] - positives
+    fp = labeled_flagged - tp
+    fn = positives - tp
+    with np.errstate(divide='ignore', invalid='ignore'):
+        precision = np.where(labeled_flagged > 0, tp / labeled_flagged, 0.0)
+        recall = np.where(positives > 0, tp / max(positives, 1), 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+    return {
+        "threshold": thresholds,
+        "flagged": flagged,
+        "flagged_rate": flagged / max(len(bundle.sorted_probs), 1),
+        "true_positives": tp,
+        "false_positives": fp,
+        "false_negatives": fn,
+        "true_negatives": negatives - fp,
+        "precision": precision,
+        "recall": recall,
+        "f1": f1,
+    }
+
+
+# Arrays computed from the model's scores; rebuilt on every (re)load and cached in the serving store
+DERIVED_ARRAYS = (
+    "score_probs", "score_risk", "sample_order", "sample_offsets", "risk_order",
+    "sorted_probs", "cum_churn", "cum_labeled", "segment_hist", "segment_prob_sum",
+)
+
+
+def build_derived_arrays(model, feature_matrix: np.ndarray, churn_labels: np.ndarray,
+                         stats_columns: Dict[str, np.ndarray], feature_names: List[str]) -> Dict[str, np.ndarray]:
+    # The full-table scoring pass doubles as the warm-up of the new model
+    score_probs, score_risk = build_score_table(model, feature_matrix)
+    if not np.isfinite(score_probs).all():
+        raise ValueError("Model produced non-finite probabilities")
+    sample_order, sample_offsets = build_sample_index(churn_labels, score_probs, score_risk)
+    risk_order = build_risk_order(score_probs)
+    sorted_probs, cum_churn, cum_labeled = build_threshold_index(churn_labels, score_probs, risk_order)
+    segment_hist, segment_prob_sum = build_segment_histograms(feature_matrix, stats_columns, feature_names, score_probs)
+    return {
+        "score_probs": score_probs,
+        "score_risk": score_risk,
+        "sample_order": sample_order,
+        "sample_offsets": sample_offsets,
+        "risk_order": risk_order,
+        "sorted_probs": sorted_probs,
+        "cum_churn": cum_churn,
+        "cum_labeled": cum_labeled,
+        "segment_hist": segment_hist,
+        "segment_prob_sum": segment_prob_sum,
+    }
+
+
+def _derived_complete(derived: Optional[Dict[str, np.ndarray]], n_rows: int, feature_names: List[str]) -> bool:
+    if derived is None or not all(name in derived for name in DERIVED_ARRAYS):
+        return False
+    # Segment definitions live in code, so a cache built with other buckets is stale
+    n_segments = sum(len(dim.labels) for dim in segment_dimensions(feature_names))
+    return len(derived["score_probs"]) == n_rows and derived["segment_hist"].shape == (n_segments, HIST_BINS)
+
+
+def _get_booster(bundle: ServingBundle, model_path: str, feature_list_path: str):
+    if xgb is None:
+        return None
+    if isinstance(bundle.model, xgb.XGBClassifier):
+        return bundle.model.get_booster()
+    # numpy engine: load the booster from disk only if the artifacts are still the ones this bundle serves
+    if os.path.exists(model_path) and compute_model_version(model_path, feature_list_path) == bundle.version:
+        return xgb.Booster(model_file=model_path)
+    return None
+
+
+def explain_method(n_rows: int) -> str:
+    """Contribution method used for a table of ``n_rows`` rows: ``"exact"`` or ``"approx"``."""
+    if EXPLAIN_METHOD not in EXPLAIN_LABELS:
+        raise ValueError(f"Unknown CHURN_EXPLAIN_METHOD: {EXPLAIN_METHOD}")
+    if EXPLAIN_METHOD == "exact" and 0 < EXPLAIN_EXACT_MAX_ROWS < n_rows:
+        return "approx"
+    return EXPLAIN_METHOD
+
+
+def _compute_contribution_arrays(booster, bundle: ServingBundle, k: int, method: str):
+    n_rows, n_features = bundle.feature_matrix.shape
+    contributions = np.empty((n_rows, n_features), dtype=np.float16)
+    top_features = np.empty((n_rows, k), dtype=np.uint8 if n_features <= 256 else np.int16)
+
+    for start in range(0, n_rows, CONTRIB_CHUNK_SIZE):
+        stop = start + CONTRIB_CHUNK_SIZE
+        dmatrix = xgb.DMatrix(bundle.feature_matrix[start:stop], feature_names=bundle.feature_names)
+        # Last column is the bias term
+        contrib = booster.predict(dmatrix, pred_contribs=True, approx_contribs=method == "approx")[:, :n_features]
+        # /explain lists the features that raise the score, so rank by signed contribution
+        top = np.argpartition(-contrib, k - 1, axis=1)[:, :k]
+        order = np.argsort(-np.take_along_axis(contrib, top, axis=1), axis=1, kind='stable')
+        top_features[start:stop] = np.take_along_axis(top, order, axis=1)
+        contributions[start:stop] = contrib
+
+    return {"contributions": contributions, "top_features": top_features}
+
+
+def compute_contributions(bundle: ServingBundle, model_path: str, feature_list_path: str,
+                          top_k: int = EXPLAIN_TOP_K) -> Optional[ServingBundle]:
+    """Per-feature contributions for every row in one batched ``pred_contribs`` pass.
+
+    Uses exact TreeSHAP unless CHURN_EXPLAIN_METHOD=approx or the table has more than
+    CHURN_EXPLAIN_EXACT_MAX_ROWS rows (see ``explain_method``); the method used is
+    recorded in ``contribution_method``.
+
+    Returns a copy of ``bundle`` with ``contributions`` and ``top_features`` attached
+    (and a new generation, so cached rule-based explanations are not reused), or None
+    when xgboost is unavailable. Slow on large tables; run it off the request path.
+    For a store-backed bundle the pass runs once per model across all workers and the
+    result is memory-mapped from the store's cache.
+    """
+    if bundle.n_users == 0 or top_k <= 0:
+        return None
+    k = min(top_k, len(bundle.feature_names))
+    method = explain_method(bundle.n_users)
+
+    if bundle.store_path is not None:
+        key = f"{bundle.version}-contribs-{method}-raising-{k}"
+        with store_lock(bundle.store_path, "contributions"):
+            arrays = load_score_cache(bundle.store_path, key)
+            if arrays is None or len(arrays["contributions"]) != bundle.n_users:
+                booster = _get_booster(bundle, model_path, feature_list_path)
+                if booster is None:
+                    return None
+                save_score_cache(bundle.store_path, key, _compute_contribution_arrays(booster, bundle, k, method))
+                arrays = load_score_cache(bundle.store_path, key)
+        if arrays is None:
+            # Store not writable: fall through and keep the result in process memory
+            booster = _get_booster(bundle, model_path, feature_list_path)
+            if booster is None:
+                return None
+            arrays = _compute_contribution_arrays(booster, bundle, k, method)
+    else:
+        booster = _get_booster(bundle, model_path, feature_list_path)
+        if booster is None:
+            return None
+        arrays = _compute_contribution_arrays(booster, bundle, k, method)
+
+    _freeze(arrays["contributions"], arrays["top_features"])
+    return dataclasses.replace(
+        bundle,
+        generation=next(_generations),
+        contributions=arrays["contributions"],
+        top_features=arrays["top_features"],
+        contribution_method=method,
+    )
+
+
+def _freeze(*arrays: np.ndarray):
+    for arr in arrays:
+        arr.flags.writeable = False
+
+
+def load_bundle(model_path: str, feature_list_path: str, data_path: str, strict: bool = True,
+                store_path: Optional[str] = None, shared: bool = False) -> ServingBundle:
+    """Load, validate and warm a serving bundle.
+
+    With ``strict=False`` (first startup) missing files leave an empty bundle
+    instead of raising, like the original startup hook. Reloads use ``strict=True``
+    so a bad artifact never replaces a working bundle. If ``store_path`` holds an
+    exported serving store it is memory-mapped instead of parsing ``data_path``,
+    and the score table is reused from (or saved to) its per-model cache. With
+    ``shared=True`` the store is (re)built from ``data_path`` first when missing or
+    stale, under a file lock, so concurrent workers parse and score only once.
+    """
+    feature_names: List[str] = []
+    if os.path.exists(feature_list_path):
+        with open(feature_list_path, 'r') as f:
+            feature_names = json.load(f)
+    elif strict:
+        raise FileNotFoundError(feature_list_path)
+
+    if not isinstance(feature_names, list) or not all(isinstance(name, str) for name in feature_names):
+        raise ValueError("feature_list.json must be a list of column names")
+
+    model = create_model()
+    feature_importance_map = {}
+    model_loaded = os.path.exists(model_path)
+    if model_loaded:
+        model.load_model(model_path)
+        try:
+            importances = model.feature_importances_
+            feature_importance_map = dict(zip(feature_names, importances))
+        except Exception:
+            pass
+    elif strict:
+        raise FileNotFoundError(model_path)
+
+    if model_loaded:
+        model_features = get_model_feature_names(model)
+        if model_features is not None and list(model_features) != feature_names:
+            raise ValueError("Model feature names do not match feature_list.json")
+
+    if shared and model_loaded and store_path is not None:
+        ensure_store(store_path, data_path, feature_names)
+
+    use_store = model_loaded and store_path is not None and store_exists(store_path)
+    if use_store:
+        feature_matrix, churn_labels, stats_columns, msno_index = open_store(store_path, feature_names)
+    else:
+        df_db = pd.DataFrame()
+        if os.path.exists(data_path):
+            df_db = pd.read_csv(data_path, dtype={'msno': str})
+        elif strict:
+            raise FileNotFoundError(data_path)
+
+        if not df_db.empty:
+            missing = [name for name in feature_names if name not in df_db.columns]
+            if missing:
+                raise ValueError(f"Data is missing model features: {missing}")
+        if not model_loaded:
+            df_db = pd.DataFrame()
+
+        feature_matrix, churn_labels, stats_columns, msno_index = build_feature_store(df_db, feature_names)
+        del df_db
+
+    version = compute_model_version(model_path, feature_list_path)
+    n_rows = len(feature_matrix)
+    with store_lock(store_path) if use_store else contextlib.nullcontext():
+        derived = load_score_cache(store_path, version) if use_store else None
+        if not _derived_complete(derived, n_rows, feature_names):
+            derived = build_derived_arrays(model, feature_matrix, churn_labels, stats_columns, feature_names)
+            if use_store:
+                # Re-map what was just written so this worker shares the pages with the others too
+                save_score_cache(store_path, version, derived)
+                mapped = load_score_cache(store_path, version)
+                if _derived_complete(mapped, n_rows, feature_names):
+                    derived = mapped
+
+    _freeze(feature_matrix, churn_labels, *derived.values(), *stats_columns.values())
+    return ServingBundle(
+        version=version,
+        generation=next(_generations),
+        model=model,
+        feature_names=feature_names,
+        feature_importance_map=feature_importance_map,
+        feature_matrix=feature_matrix,
+        churn_labels=churn_labels,
+        stats_columns=stats_columns,
+        msno_index=msno_index,
+        **{name: derived[name] for name in DERIVED_ARRAYS},
+        loaded_at=time.time(),
+        store_path=store_path if use_store else None,
+    )
@@ -0,0 +1,111 @@
+import dataclasses
+import math
+from typing import Callable, Dict, List
+
+import numpy as np
+
+SIMULATE_CHUNK_SIZE = 100_000
+OVERRIDE_OPS = ("+=", "-=", "*=", "=")
+
+
+@dataclasses.dataclass(frozen=True)
+class Override:
+    column: int
+    op: str
+    value: float
+
+
+def parse_scenario(text: str, feature_names: List[str]) -> List[Override]:
+    """``"is_auto_renew_max=1; discount_mean+=20"`` -> overrides applied together as one variant."""
+    overrides = []
+    for clause in text.split(";"):
+        clause = clause.strip()
+        if not clause:
+            continue
+        name, sep, raw_value = clause.partition("=")
+        op = "="
+        if name.endswith(("+", "-", "*")):
+            op = name[-1] + "="
+            name = name[:-1]
+        name = name.strip()
+        if not sep or name not in feature_names:
+            raise ValueError(f"Invalid override '{clause}', expected feature<op>value with op in {list(OVERRIDE_OPS)}")
+        try:
+            value = float(raw_value)
+        except ValueError:
+            raise ValueError(f"Invalid override value in '{clause}'")
+        if not math.isfinite(value):
+            raise ValueError(f"Invalid override value in '{clause}'")
+        overrides.append(Override(feature_names.index(name), op, value))
+
+    if not overrides:
+        raise ValueError("Empty scenario")
+    return overrides
+
+
+def apply_overrides(block: np.ndarray, overrides: List[Override]):
+    """Apply ``overrides`` in order to every row of ``block`` (in place)."""
+    for o in overrides:
+        if o.op == "=":
+            block[:, o.column] = o.value
+        elif o.op == "+=":
+            block[:, o.column] += o.value
+        elif o.op == "-=":
+            block[:, o.column] -= o.value
+        else:
+            block[:, o.column] *= o.value
+
+
+def simulate_row(model, row: np.ndarray, scenarios: List[List[Override]]) -> np.ndarray:
+    """Score every variant of ``row`` with one ``predict_proba`` call; returns one probability per scenario."""
+    variants = np.repeat(row.reshape(1, -1).astype(np.float32), len(scenarios), axis=0)
+    for i, overrides in enumerate(scenarios):
+        apply_overrides(variants[i:i + 1], overrides)
+    return model.predict_proba(variants)[:, 1]
+
+
+def simulate_population(model, feature_matrix: np.ndarray, score_probs: np.ndarray,
+                        select: Callable[[int, int], np.ndarray], overrides: List[Override],
+                        threshold: float, chunk_size: int = SIMULATE_CHUNK_SIZE) -> Dict:
+    """Apply ``overrides`` to the rows picked by ``select(start, stop)`` and aggregate the change.
+
+    Rows are copied, perturbed and scored ``chunk_size`` at a time, so memory stays
+    bounded by one chunk regardless of the segment size. Baseline probabilities come
+    from the score table.
+    """
+    n_users = 0
+    before_sum = after_sum = 0.0
+    flagged_before = flagged_after = 0
+    moved_up = moved_down = 0
+
+    for start in range(0, len(feature_matrix), chunk_size):
+        stop = min(start + chunk_size, len(feature_matrix))
+        rows = start + np.flatnonzero(select(start, stop))
+        if not len(rows):
+            continue
+
+        block = feature_matrix[rows]
+        apply_overrides(block, overrides)
+        after = model.predict_proba(block)[:, 1]
+        before = score_probs[rows]
+
+        n_users += len(rows)
+        before_sum += float(before.sum(dtype=np.float64))
+        after_sum += float(after.sum(dtype=np.float64))
+        flagged_before += int(np.count_nonzero(before >= threshold))
+        flagged_after += int(np.count_nonzero(after >= threshold))
+        moved_up += int(np.count_nonzero(after > before))
+        moved_down += int(np.count_nonzero(after < before))
+
+    return {
+        "n_users": n_users,
+        "expected_churners_before": before_sum,
+        "expected_churners_after": after_sum,
+        "expected_churners_change": after_sum - before_sum,
+        "mean_probability_before": before_sum / n_users if n_users else None,
+        "mean_probability_after": after_sum / n_users if n_users else None,
+        "flagged_before": flagged_before,
+        "flagged_after": flagged_after,
+        "users_risk_up": moved_up,
+        "users_risk_down": moved_down,
+    }
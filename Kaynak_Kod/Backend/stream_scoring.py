@@ -0,0 +1,192 @@
+import csv
+import json
+import math
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from starlette.responses import StreamingResponse
+
+from serving import CHURN_THRESHOLD, RISK_BANDS, RISK_LEVELS
+
+
+class StreamError(Exception):
+    """Fatal input problem; reported as the last NDJSON line since the status is already sent."""
+
+
+async def iter_lines(chunks: AsyncIterator[bytes], max_line_bytes: int) -> AsyncIterator[bytes]:
+    buffer = b""
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line
+        if len(buffer) > max_line_bytes:
+            raise StreamError(f"Line exceeds {max_line_bytes} bytes")
+    if buffer:
+        yield buffer
+
+
+FLOAT32_MAX = float(np.finfo(np.float32).max)
+
+
+def _to_float(value) -> float:
+    if value is None or value == "":
+        return math.nan
+    if isinstance(value, bool):
+        raise ValueError("boolean is not a number")
+    number = float(value)
+    # NaN/Infinity literals and values that overflow the float32 feature matrix are bad input,
+    # not missing values (missing is null / empty)
+    if not math.isfinite(number) or abs(number) > FLOAT32_MAX:
+        raise ValueError(f"number out of range: {value!r}")
+    return number
+
+
+class NdjsonRowParser:
+    """One JSON object per line: feature name -> number (null = missing), optional ``id``."""
+
+    def __init__(self, feature_names: List[str]):
+        self.feature_names = feature_names
+
+    def parse(self, line: str) -> Tuple[Optional[object], List[float]]:
+        record = json.loads(line)
+        if not isinstance(record, dict):
+            raise ValueError("line is not a JSON object")
+        missing = [name for name in self.feature_names if name not in record]
+        if missing:
+            raise ValueError(f"missing features: {missing}")
+        return record.get("id"), [_to_float(record[name]) for name in self.feature_names]
+
+
+class CsvRowParser:
+    """Header line first; columns are matched by name, an optional ``id`` column is echoed back."""
+
+    def __init__(self, feature_names: List[str]):
+        self.feature_names = feature_names
+        self.columns: Optional[List[int]] = None
+        self.id_column: Optional[int] = None
+
+    def parse(self, line: str) -> Optional[Tuple[Optional[object], List[float]]]:
+        fields = next(csv.reader([line]))
+        if self.columns is None:
+            missing = [name for name in self.feature_names if name not in fields]
+            if missing:
+                raise StreamError(f"CSV header is missing features: {missing}")
+            self.columns = [fields.index(name) for name in self.feature_names]
+            self.id_column = fields.index("id") if "id" in fields else None
+            return None
+
+        if len(fields) <= max(self.columns):
+            raise ValueError("row has fewer columns than the header")
+        row_id = fields[self.id_column] if self.id_column is not None and self.id_column < len(fields) else None
+        return row_id, [_to_float(fields[col]) for col in self.columns]
+
+
+class DuplexStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator is still reading the request.
+
+    On servers older than ASGI spec 2.4 Starlette runs a disconnect listener that
+    calls ``receive()`` concurrently and would swallow request body chunks. Here the
+    body iterator owns ``receive`` (``request.stream()`` raises ``ClientDisconnect``
+    itself), so only the 2.4 code path is used.
+    """
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await self.stream_response(send)
+        except OSError:
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+def _dump(record: Dict) -> bytes:
+    return (json.dumps(record) + "\n").encode()
+
+
+async def score_stream(
+    chunks: AsyncIterator[bytes],
+    model,
+    feature_names: List[str],
+    parser_factory: Callable,
+    chunk_rows: int,
+    max_rows: int,
+    max_line_bytes: int,
+) -> AsyncIterator[bytes]:
+    """Parse ``chunks`` incrementally and yield one NDJSON result line per input row.
+
+    At most ``chunk_rows`` parsed rows are held at a time and each batch is scored
+    with one ``predict_proba`` call, so memory does not depend on the upload size.
+    The next chunk is only read once the previous results were taken by the
+    response, which gives backpressure towards a slow client.
+    """
+    parser = parser_factory(feature_names)
+    matrix = np.empty((chunk_rows, len(feature_names)), dtype=np.float32)
+    pending: List[Tuple[int, Optional[object]]] = []
+    errors: List[Dict] = []
+    n_rows = 0
+
+    async def flush():
+        out = []
+        if pending:
+            probs = await run_in_threadpool(model.predict_proba, matrix[:len(pending)])
+            probs = probs[:, 1]
+            risks = np.searchsorted(RISK_BANDS, probs, side='left')
+            for (row, row_id), prob, risk in zip(pending, probs.tolist(), risks.tolist()):
+                out.append((row, {
+                    "row": row,
+                    "id": row_id,
+                    "churn_probability": round(prob, 4),
+                    "is_churn_prediction": bool(prob >= CHURN_THRESHOLD),
+                    "risk_level": RISK_LEVELS[risk],
+                }))
+        out.extend((e["row"], e) for e in errors)
+        out.sort(key=lambda item: item[0])
+        pending.clear()
+        errors.clear()
+        return b"".join(_dump(record) for _, record in out)
+
+    try:
+        async for raw in iter_lines(chunks, max_line_bytes):
+            line = raw.decode("utf-8").strip()
+            if not line:
+                continue
+            try:
+                parsed = parser.parse(line)
+            except StreamError:
+                raise
+            except (ValueError, TypeError, OverflowError, RecursionError) as e:
+                # OverflowError: float() of an integer literal too large for a double;
+                # RecursionError: json.loads of a too deeply nested line
+                parsed = e
+            if parsed is None:
+                continue
+
+            if n_rows >= max_rows:
+                results = await flush()
+                if results:
+                    yield results
+                yield _dump({"error": f"Row limit of {max_rows} exceeded; remaining input ignored"})
+                return
+
+            if isinstance(parsed, Exception):
+                errors.append({"row": n_rows, "error": str(parsed)})
+            else:
+                row_id, values = parsed
+                matrix[len(pending)] = values
+                pending.append((n_rows, row_id))
+            n_rows += 1
+
+            if len(pending) + len(errors) >= chunk_rows:
+                yield await flush()
+
+        results = await flush()
+        if results:
+            yield results
+    except (StreamError, UnicodeDecodeError) as e:
+        results = await flush()
+        if results:
+            yield results
+        yield _dump({"error": str(e)})
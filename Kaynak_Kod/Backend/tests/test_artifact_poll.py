@@ -0,0 +1,63 @@
+import threading
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def poll(monkeypatch):
+    """Drives main.poll_artifacts with a fake file signature and a recording reload."""
+    state = {"signature": ("v1",), "reloads": [], "fail": False}
+    done = threading.Event()
+
+    def fake_reload():
+        try:
+            state["reloads"].append(state["signature"])
+            if state["fail"]:
+                main.failed_reload = (state["signature"], main.time.monotonic())
+            else:
+                main.artifact_signature = state["signature"]
+        finally:
+            main.reload_lock.release()
+            done.set()
+
+    def run():
+        done.clear()
+        main.poll_artifacts()
+        return done.wait(0.2)
+
+    monkeypatch.setattr(main, "get_artifact_signature", lambda *paths: state["signature"])
+    monkeypatch.setattr(main, "reload_artifacts", fake_reload)
+    monkeypatch.setattr(main, "artifact_signature", ("v1",))
+    monkeypatch.setattr(main, "pending_signature", None)
+    monkeypatch.setattr(main, "failed_reload", (None, 0.0))
+    state["run"] = run
+    return state
+
+
+def test_reload_waits_for_a_stable_signature(poll):
+    assert not poll["run"]()
+    poll["signature"] = ("v2-partial",)
+    assert not poll["run"]()
+    poll["signature"] = ("v2",)
+    assert not poll["run"]()
+    assert poll["run"]()
+    assert poll["reloads"] == [("v2",)]
+    assert main.artifact_signature == ("v2",)
+    assert not poll["run"]()
+
+
+def test_failed_reload_keeps_signature_and_retries(poll, monkeypatch):
+    poll["signature"], poll["fail"] = ("v2",), True
+    poll["run"]()
+    assert poll["run"]()
+    assert main.artifact_signature == ("v1",)
+    # Within the retry interval the same files are not reloaded again
+    assert not poll["run"]()
+
+    monkeypatch.setattr(main, "RELOAD_RETRY_INTERVAL", 0.0)
+    poll["fail"] = False
+    assert poll["run"]()
+    assert poll["reloads"] == [("v2",), ("v2",)]
+    assert main.artifact_signature == ("v2",)
@@ -0,0 +1,61 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import serving
+from serving import compute_contributions, load_bundle
+
+xgb = pytest.importorskip("xgboost")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json")
+FEATURE_LIST_PATH = os.path.join(BACKEND_DIR, "feature_list.json")
+
+
+@pytest.fixture
+def bundle(tmp_path):
+    feature_names = pd.read_json(FEATURE_LIST_PATH, typ='series').tolist()
+    rng = np.random.default_rng(2)
+    df = pd.DataFrame(rng.normal(size=(50, len(feature_names))) * 10, columns=feature_names)
+    data_path = str(tmp_path / "users.csv")
+    df.to_csv(data_path, index=False)
+    return load_bundle(MODEL_PATH, FEATURE_LIST_PATH, data_path)
+
+
+def reference_contribs(bundle, approx):
+    booster = xgb.Booster(model_file=MODEL_PATH)
+    dmatrix = xgb.DMatrix(bundle.feature_matrix, feature_names=bundle.feature_names)
+    contrib = booster.predict(dmatrix, pred_contribs=True, approx_contribs=approx)[:, :-1]
+    return contrib.astype(np.float16)
+
+
+def test_exact_treeshap_by_default(bundle):
+    explained = compute_contributions(bundle, MODEL_PATH, FEATURE_LIST_PATH)
+
+    assert explained.contribution_method == "exact"
+    assert serving.EXPLAIN_LABELS[explained.contribution_method] == "shap"
+    np.testing.assert_array_equal(explained.contributions, reference_contribs(bundle, approx=False))
+
+
+def test_approx_above_row_limit(bundle, monkeypatch):
+    monkeypatch.setattr(serving, "EXPLAIN_EXACT_MAX_ROWS", bundle.n_users - 1)
+    explained = compute_contributions(bundle, MODEL_PATH, FEATURE_LIST_PATH)
+
+    assert explained.contribution_method == "approx"
+    assert serving.EXPLAIN_LABELS[explained.contribution_method] == "saabas"
+    np.testing.assert_array_equal(explained.contributions, reference_contribs(bundle, approx=True))
+
+
+def test_explain_method(monkeypatch):
+    monkeypatch.setattr(serving, "EXPLAIN_EXACT_MAX_ROWS", 100)
+    assert serving.explain_method(100) == "exact"
+    assert serving.explain_method(101) == "approx"
+    monkeypatch.setattr(serving, "EXPLAIN_EXACT_MAX_ROWS", 0)
+    assert serving.explain_method(10 ** 9) == "exact"
+    monkeypatch.setattr(serving, "EXPLAIN_METHOD", "approx")
+    assert serving.explain_method(1) == "approx"
+    monkeypatch.setattr(serving, "EXPLAIN_METHOD", "kernel")
+    with pytest.raises(ValueError):
+        serving.explain_method(1)
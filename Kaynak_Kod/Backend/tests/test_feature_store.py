@@ -0,0 +1,114 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from feature_store import build_feature_store, export_store, open_store
+from msno_index import EMPTY, MsnoIndex
+from serving import DERIVED_ARRAYS, load_bundle
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def random_msnos(rng, n):
+    alphabet = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"))
+    lengths = rng.integers(1, 45, n)
+    return ["".join(alphabet[rng.integers(0, 64, k)]) for k in lengths]
+
+
+@pytest.fixture
+def df_db():
+    rng = np.random.default_rng(0)
+    n_rows = 5000
+    msnos = random_msnos(rng, n_rows)
+    msnos[10] = msnos[3]  # duplicate: the first row wins
+    df = pd.DataFrame({
+        'msno': msnos,
+        'f0': rng.normal(size=n_rows),
+        'f1': rng.integers(0, 100, n_rows).astype(float),
+        'is_churn': rng.integers(0, 2, n_rows),
+        'membership_days': rng.integers(0, 1000, n_rows).astype(float),
+    })
+    df.loc[::13, 'f0'] = np.nan
+    df.loc[::17, 'membership_days'] = np.nan
+    return df
+
+
+def expected_rows(msnos):
+    first = {}
+    for row, msno in enumerate(msnos):
+        first.setdefault(msno, row)
+    return first
+
+
+def test_index_lookup_matches_first_row(df_db):
+    index = MsnoIndex(df_db['msno'])
+    first = expected_rows(df_db['msno'])
+    queries = list(first) + ["missing", "", "é" * 3, "x" * 100]
+    expected = [first.get(q, EMPTY) for q in queries]
+
+    assert [index.lookup(q) for q in queries] == expected
+    assert index.lookup_many(queries).tolist() == expected
+    assert all(index.key(row) == msno for msno, row in first.items())
+
+
+def test_empty_index_misses():
+    index = MsnoIndex([])
+    assert index.lookup("abc") == EMPTY
+    assert index.lookup_many(["abc", ""]).tolist() == [EMPTY, EMPTY]
+
+
+def test_store_roundtrip_matches_in_memory_build(df_db, tmp_path):
+    feature_names = ['f0', 'f1']
+    store_dir = str(tmp_path / "store")
+    export_store(df_db, feature_names, store_dir)
+
+    built = build_feature_store(df_db, feature_names)
+    mapped = open_store(store_dir, feature_names)
+
+    for expected, actual in zip(built[:2], mapped[:2]):
+        assert actual.dtype == expected.dtype
+        np.testing.assert_array_equal(actual, expected)
+    assert mapped[2].keys() == built[2].keys()
+    for col in built[2]:
+        np.testing.assert_array_equal(mapped[2][col], built[2][col])
+
+    index = mapped[3]
+    queries = list(df_db['msno']) + ["missing"]
+    assert index.lookup_many(queries).tolist() == built[3].lookup_many(queries).tolist()
+    assert index.lookup(df_db['msno'][10]) == 3
+
+
+def test_store_rejects_other_feature_list(df_db, tmp_path):
+    store_dir = str(tmp_path / "store")
+    export_store(df_db, ['f0', 'f1'], store_dir)
+    with pytest.raises(ValueError):
+        open_store(store_dir, ['f1', 'f0'])
+
+
+def test_load_bundle_from_store_matches_csv(tmp_path):
+    model_path = os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json")
+    feature_list_path = os.path.join(BACKEND_DIR, "feature_list.json")
+    feature_names = pd.read_json(feature_list_path, typ='series').tolist()
+
+    rng = np.random.default_rng(1)
+    n_rows = 400
+    df = pd.DataFrame(rng.normal(size=(n_rows, len(feature_names))) * 10, columns=feature_names)
+    df.insert(0, 'msno', random_msnos(rng, n_rows))
+    df['is_churn'] = rng.integers(0, 2, n_rows)
+    data_path = str(tmp_path / "users.csv")
+    df.to_csv(data_path, index=False)
+    store_path = str(tmp_path / "store")
+
+    from_csv = load_bundle(model_path, feature_list_path, data_path)
+    exported = load_bundle(model_path, feature_list_path, data_path, store_path=store_path, shared=True)
+    cached = load_bundle(model_path, feature_list_path, data_path, store_path=store_path)
+
+    assert from_csv.store_path is None and cached.store_path == store_path
+    for bundle in (exported, cached):
+        assert bundle.version == from_csv.version
+        for name in ("feature_matrix", "churn_labels", *DERIVED_ARRAYS):
+            np.testing.assert_array_equal(getattr(bundle, name), getattr(from_csv, name), err_msg=name)
+        for msno in df['msno'][:50]:
+            assert bundle.msno_index.lookup(msno) == from_csv.msno_index.lookup(msno)
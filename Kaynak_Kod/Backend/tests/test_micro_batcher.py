@@ -0,0 +1,68 @@
+import asyncio
+import os
+
+import numpy as np
+
+from micro_batcher import MicroBatcher
+from tree_engine import CompiledTreeModel
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json")
+
+
+class ScaledModel:
+    """Row-wise model whose output identifies which instance scored the row."""
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.calls = 0
+
+    def predict_proba(self, X):
+        self.calls += 1
+        positive = X.sum(axis=1, dtype=np.float64) * self.scale
+        return np.column_stack([1.0 - positive, positive])
+
+
+async def submit_all(batcher, model_rows):
+    return await asyncio.gather(*(batcher.submit(model, row) for model, row in model_rows))
+
+
+def test_batched_results_match_direct_scoring():
+    model = CompiledTreeModel().load_model(MODEL_PATH)
+    rows = (np.random.default_rng(0).normal(size=(200, len(model.feature_names))) * 10).astype(np.float32)
+    rows[::7, 3] = np.nan
+    batcher = MicroBatcher(max_wait_ms=5.0, max_batch_size=64)
+
+    probs = asyncio.run(submit_all(batcher, [(model, row) for row in rows]))
+
+    assert probs == model.predict_proba(rows)[:, 1].tolist()
+    assert batcher.rows == len(rows)
+    assert batcher.batches < len(rows)
+    assert batcher.stats()["mean_batch_size"] <= 64
+
+
+def test_rows_are_scored_by_their_own_model():
+    old, new = ScaledModel(1.0), ScaledModel(-1.0)
+    rows = np.arange(20, dtype=np.float32).reshape(10, 2)
+    model_rows = [(old if i % 2 else new, row) for i, row in enumerate(rows)]
+    batcher = MicroBatcher(max_wait_ms=5.0, max_batch_size=64)
+
+    probs = asyncio.run(submit_all(batcher, model_rows))
+
+    assert probs == [float(row.sum()) * model.scale for model, row in model_rows]
+    assert old.calls == new.calls == 1
+
+
+def test_model_error_is_raised_to_every_waiter():
+    class Failing:
+        def predict_proba(self, X):
+            raise RuntimeError("boom")
+
+    batcher = MicroBatcher(max_wait_ms=5.0)
+    rows = [(Failing(), np.zeros(2, dtype=np.float32))] * 3
+
+    async def run():
+        return await asyncio.gather(*(batcher.submit(m, r) for m, r in rows), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert all(isinstance(r, RuntimeError) for r in results)
@@ -0,0 +1,55 @@
+import asyncio
+import json
+
+import numpy as np
+
+from stream_scoring import CsvRowParser, NdjsonRowParser, score_stream
+
+FEATURES = ["a", "b"]
+
+
+class SumModel:
+    def predict_proba(self, X):
+        positive = 1.0 / (1.0 + np.exp(-np.nansum(X, axis=1, dtype=np.float64)))
+        return np.column_stack([1.0 - positive, positive])
+
+
+def run_stream(lines, parser_factory, chunk_rows=2):
+    async def chunks():
+        for line in lines:
+            yield line.encode() + b"\n"
+
+    async def collect():
+        stream = score_stream(chunks(), SumModel(), FEATURES, parser_factory,
+                              chunk_rows=chunk_rows, max_rows=100, max_line_bytes=1 << 20)
+        return b"".join([part async for part in stream])
+
+    return [json.loads(line) for line in asyncio.run(collect()).splitlines()]
+
+
+def test_bad_rows_become_per_row_errors():
+    lines = [
+        json.dumps({"id": "ok", "a": 1, "b": 2}),
+        '{"a": ' * 100_000,
+        '{"a": 1e400, "b": 0}',
+        '{"a": NaN, "b": 0}',
+        '{"a": ' + "9" * 400 + ', "b": 0}',
+        '{"a": true, "b": 0}',
+        '{"a": 1}',
+        '[1, 2]',
+        json.dumps({"id": "last", "a": None, "b": -1}),
+    ]
+    records = run_stream(lines, NdjsonRowParser)
+
+    assert [r["row"] for r in records] == list(range(len(lines)))
+    assert [("error" in r) for r in records] == [False] + [True] * 7 + [False]
+    assert records[0]["id"] == "ok" and records[-1]["id"] == "last"
+    assert records[-1]["churn_probability"] == round(1.0 / (1.0 + np.exp(1.0)), 4)
+
+
+def test_csv_rows():
+    records = run_stream(["id,b,a", "x,1,2", "y,inf,0", "z,,1"], CsvRowParser)
+
+    assert [r.get("id") for r in records] == ["x", None, "z"]
+    assert "error" in records[1]
+    assert records[0]["churn_probability"] == round(1.0 / (1.0 + np.exp(-3.0)), 4)
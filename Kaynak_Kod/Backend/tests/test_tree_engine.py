@@ -0,0 +1,59 @@
+import os
+
+import numpy as np
+import pytest
+
+from tree_engine import CompiledTreeModel
+
+xgb = pytest.importorskip("xgboost")
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_PATH = os.path.join(BACKEND_DIR, "xgboost_final_model_lite.json")
+
+
+@pytest.fixture(scope="module")
+def models():
+    reference = xgb.XGBClassifier()
+    reference.load_model(MODEL_PATH)
+    return reference, CompiledTreeModel().load_model(MODEL_PATH)
+
+
+@pytest.fixture(scope="module")
+def X(models):
+    # Values drawn around the split thresholds so both branches and the missing
+    # direction of every feature get exercised
+    compiled = models[1]
+    rng = np.random.default_rng(0)
+    n_rows = 3000
+    X = np.empty((n_rows, len(compiled.feature_names)), dtype=np.float32)
+    is_split = compiled.left != np.arange(len(compiled.left))
+    for j in range(X.shape[1]):
+        thresholds = compiled.threshold[is_split & (compiled.split_feature == j)]
+        if thresholds.size == 0:
+            thresholds = np.zeros(1, dtype=np.float32)
+        X[:, j] = rng.choice(thresholds, n_rows) + rng.normal(scale=0.5, size=n_rows).astype(np.float32)
+    X[rng.random(X.shape) < 0.05] = np.nan
+    # Exactly on a threshold goes right, as in xgboost
+    X[0] = compiled.threshold[compiled.roots[0]]
+    return X
+
+
+def test_leaves_match_xgboost(models, X):
+    reference, compiled = models
+    expected = reference.get_booster().predict(xgb.DMatrix(X, feature_names=compiled.feature_names), pred_leaf=True)
+    actual = compiled.predict_leaf(X) - compiled.roots[None, :]
+    np.testing.assert_array_equal(actual, expected)
+
+
+def test_proba_matches_xgboost(models, X):
+    reference, compiled = models
+    actual = compiled.predict_proba(X)
+    assert actual.shape == (len(X), 2)
+    np.testing.assert_allclose(actual, reference.predict_proba(X), rtol=0, atol=1e-6)
+
+
+def test_row_blocks_do_not_change_results(models, X):
+    compiled = models[1]
+    batch = compiled.predict_margin(X)
+    single = np.array([compiled.predict_margin(X[i:i + 1])[0] for i in range(0, len(X), 97)])
+    np.testing.assert_array_equal(single, batch[::97])
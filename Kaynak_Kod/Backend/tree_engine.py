@@ -0,0 +1,119 @@
+import json
+import numpy as np
+from typing import List
+
+LEAF = -1
+ROW_BLOCK = 1024
+
+
+def _parse_base_score(value) -> float:
+    # Newer xgboost versions store base_score as a vector string, e.g. "[5E-1]"
+    if isinstance(value, str):
+        value = value.strip("[]").split(",")[0]
+    return float(value)
+
+
+class CompiledTreeModel:
+    """Pure-NumPy evaluator for a binary:logistic gbtree model saved as JSON.
+
+    All trees are flattened into shared node arrays (feature index, threshold,
+    left/right child, default direction, leaf value). Leaves point to themselves,
+    so a batch is evaluated by stepping every (row, tree) cursor ``max_depth``
+    times with vectorized gathers. Exposes the same ``load_model`` /
+    ``predict_proba`` surface the backend uses on ``xgb.XGBClassifier``.
+    """
+
+    def __init__(self):
+        self.feature_names: List[str] = []
+        self.roots = np.empty(0, dtype=np.int32)
+        self.split_feature = np.empty(0, dtype=np.int32)
+        self.threshold = np.empty(0, dtype=np.float32)
+        self.left = np.empty(0, dtype=np.int32)
+        self.right = np.empty(0, dtype=np.int32)
+        self.default_left = np.empty(0, dtype=bool)
+        self.leaf_value = np.empty(0, dtype=np.float32)
+        self.max_depth = 0
+        self.base_margin = 0.0
+
+    def load_model(self, path: str):
+        with open(path, 'r') as f:
+            learner = json.load(f)['learner']
+
+        objective = learner['objective']['name']
+        if objective != 'binary:logistic':
+            raise ValueError(f"Unsupported objective: {objective}")
+        booster = learner['gradient_booster']
+        if booster['name'] != 'gbtree':
+            raise ValueError(f"Unsupported booster: {booster['name']}")
+
+        base_score = _parse_base_score(learner['learner_model_param']['base_score'])
+        self.base_margin = float(np.log(base_score / (1.0 - base_score)))
+        self.feature_names = learner.get('feature_names', [])
+
+        roots, split_feature, threshold, left, right, default_left, leaf_value = [], [], [], [], [], [], []
+        max_depth = 0
+        offset = 0
+        for tree in booster['model']['trees']:
+            if any(tree['split_type']):
+                raise ValueError("Categorical splits are not supported")
+
+            lc = np.asarray(tree['left_children'], dtype=np.int32)
+            rc = np.asarray(tree['right_children'], dtype=np.int32)
+            n_nodes = len(lc)
+            node_ids = np.arange(n_nodes, dtype=np.int32)
+            is_leaf = lc == LEAF
+
+            depth = np.zeros(n_nodes, dtype=np.int32)
+            for node in range(n_nodes):
+                if not is_leaf[node]:
+                    depth[lc[node]] = depth[rc[node]] = depth[node] + 1
+            max_depth = max(max_depth, int(depth.max()))
+
+            split_conditions = np.asarray(tree['split_conditions'], dtype=np.float32)
+            roots.append(offset)
+            split_feature.append(np.where(is_leaf, 0, tree['split_indices']).astype(np.int32))
+            threshold.append(np.where(is_leaf, 0.0, split_conditions).astype(np.float32))
+            left.append(np.where(is_leaf, node_ids, lc) + offset)
+            right.append(np.where(is_leaf, node_ids, rc) + offset)
+            default_left.append(np.asarray(tree['default_left'], dtype=bool))
+            leaf_value.append(np.where(is_leaf, split_conditions, 0.0).astype(np.float32))
+            offset += n_nodes
+
+        self.roots = np.asarray(roots, dtype=np.int32)
+        self.split_feature = np.concatenate(split_feature)
+        self.threshold = np.concatenate(threshold)
+        self.left = np.concatenate(left).astype(np.int32)
+        self.right = np.concatenate(right).astype(np.int32)
+        self.default_left = np.concatenate(default_left)
+        self.leaf_value = np.concatenate(leaf_value)
+        self.max_depth = max_depth
+        return self
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_leaf(self, X: np.ndarray) -> np.ndarray:
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        n_features = X.shape[1]
+        has_missing = bool(np.isnan(X).any())
+        nodes = np.empty((len(X), self.n_trees), dtype=np.int32)
+        for start in range(0, len(X), ROW_BLOCK):
+            block = X[start:start + ROW_BLOCK].ravel()
+            row_offset = (np.arange(len(block) // n_features, dtype=np.int32) * n_features)[:, None]
+            cursor = np.repeat(self.roots[None, :], len(row_offset), axis=0)
+            for _ in range(self.max_depth):
+                fvalue = block.take(row_offset + self.split_feature.take(cursor))
+                go_left = fvalue < self.threshold.take(cursor)
+                if has_missing:
+                    go_left |= np.isnan(fvalue) & self.default_left.take(cursor)
+                cursor = np.where(go_left, self.left.take(cursor), self.right.take(cursor))
+            nodes[start:start + ROW_BLOCK] = cursor
+        return nodes
+
+    def predict_margin(self, X: np.ndarray) -> np.ndarray:
+        return self.base_margin + self.leaf_value.take(self.predict_leaf(X)).sum(axis=1, dtype=np.float64)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        positive = (1.0 / (1.0 + np.exp(-self.predict_margin(X)))).astype(np.float32)
+        return np.column_stack([1.0 - positive, positive])
@@ -41,23 +41,15 @@ export default function App() {
     setError(null);
 
     try {
-      // 1. Tahmin (Prediction) Al
-      const predRes = await fetch(`${API_BASE}/predict/${userId}`);
-      if (!predRes.ok) {
-        if (predRes.status === 404) throw new Error("User ID not found in the database. Please check the ID and try again.");
+      // Tahmin, açıklama ve istatistikler tek istekte gelir
+      const res = await fetch(`${API_BASE}/dashboard/${userId}`);
+      if (!res.ok) {
+        if (res.status === 404) throw new Error("User ID not found in the database. Please check the ID and try again.");
         throw new Error("Failed to connect to the prediction engine.");
       }
-      const predData = await predRes.json();
+      const { prediction: predData, explanation: expData, stats: statsData } = await res.json();
 
-      // 2. Açıklama (Explanation) Al
-      const expRes = await fetch(`${API_BASE}/explain/${userId}`);
-      const expData = await expRes.json();
-
-      // 3. Kullanıcı İstatistiklerini (Stats) Al
-      const statsRes = await fetch(`${API_BASE}/user-stats/${userId}`);
-      const statsData = await statsRes.json();
-
-      // 4. Verileri Arayüze Uygun Formata Getir
+      // Verileri Arayüze Uygun Formata Getir
       const formattedData: DashboardData = {
         riskScore: Math.round(predData.churn_probability * 100),
         riskLevel: predData.risk_level,
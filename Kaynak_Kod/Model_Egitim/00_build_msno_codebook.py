@@ -0,0 +1,44 @@
+# 00_build_msno_codebook.py
+import pandas as pd
+import os
+import time
+
+from msno_codec import CODEBOOK_FILE, MsnoCodec
+
+print("--- msno sözlüğü (msno -> int32 kod) oluşturuluyor ---")
+
+# Dosya yollarını tanımla
+current_dir = os.getcwd()
+data_dir = os.path.join(current_dir, 'kkbox-churn-prediction-challenge')
+train_file_path = os.path.join(data_dir, 'train.csv')
+members_file_path = os.path.join(data_dir, 'members_v3.csv')
+output_file_path = os.path.join(current_dir, CODEBOOK_FILE)
+
+try:
+    start_time = time.time()
+
+    # Sadece msno sütunları okunur
+    print(f"'{train_file_path}' yükleniyor...")
+    train_msnos = pd.read_csv(train_file_path, usecols=['msno'])['msno']
+    print(f"- {len(train_msnos)} eğitim satırı")
+
+    print(f"'{members_file_path}' yükleniyor...")
+    member_msnos = pd.read_csv(members_file_path, usecols=['msno'])['msno']
+    print(f"- {len(member_msnos)} üye satırı")
+
+    # Birleşim sıralanır; kod = sıralı anahtar dizisindeki konum (alfabetik sırayı korur)
+    codec = MsnoCodec.build(train_msnos, member_msnos)
+    print(f"\nSözlükteki benzersiz msno sayısı: {len(codec)} (train: {int(codec.in_train.sum())})")
+    print(f"Anahtar genişliği: {codec.keys.dtype.itemsize} bayt, toplam {codec.keys.nbytes / 1e6:.1f} MB")
+
+    # Sözlüğü kaydet
+    print(f"\nSözlük '{output_file_path}' olarak kaydediliyor...")
+    codec.save(output_file_path)
+    print("Kaydetme tamamlandı.")
+
+    print(f"\nToplam İşlem Süresi: {time.time() - start_time:.2f} saniye")
+
+except FileNotFoundError as e:
+    print(f"Hata: Dosya bulunamadı - {e.filename}. Lütfen dosya yollarını kontrol edin.")
+except Exception as e:
+    print(f"Bir hata oluştu: {e}")
@@ -2,6 +2,8 @@
 import pandas as pd
 import os
 
+from pipeline_io import table_path, write_table
+
 print("--- train.csv ve members_v3.csv dosyaları birleştiriliyor ---")
 
 # Mevcut çalışma dizinini al
@@ -11,7 +13,7 @@ data_dir = os.path.join(current_dir, 'kkbox-churn-prediction-challenge')
 # Dosya yollarını tanımla
 train_file_path = os.path.join(data_dir, 'train.csv')
 members_file_path = os.path.join(data_dir, 'members_v3.csv')
-output_file_path = os.path.join(current_dir, 'train_member_merged.csv') # Birleştirilmiş dosyanın kaydedileceği yer
+output_file_path = table_path(current_dir, 'train_member_merged') # Birleştirilmiş dosyanın kaydedileceği yer
 
 try:
     # train.csv dosyasını yükle
@@ -39,9 +41,9 @@ try:
     merged_df.info()
     print("-" * 50)
 
-    # Birleştirilmiş DataFrame'i yeni bir CSV dosyasına kaydet
+    # Birleştirilmiş DataFrame'i ara tablo olarak kaydet (format: pipeline_io)
     print(f"\nBirleştirilmiş DataFrame '{output_file_path}' olarak kaydediliyor...")
-    merged_df.to_csv(output_file_path, index=False)
+    write_table(merged_df, output_file_path)
     print("Kaydetme tamamlandı.")
 
 except FileNotFoundError as e:
@@ -1,26 +1,31 @@
 # 02_aggregate_transactions.py
-import pandas as pd
 import os
 
+from msno_codec import CODE_COL, load_codebook
+from pipeline_io import table_path, write_table
+
 print("--- transactions.csv dosyası özetleniyor (aggregation) ---")
 
 # Dosya yollarını tanımla
 current_dir = os.getcwd()
 data_dir = os.path.join(current_dir, 'kkbox-churn-prediction-challenge')
 transactions_file_path = os.path.join(data_dir, 'transactions.csv')
-output_file_path = os.path.join(current_dir, 'transactions_aggregated.csv')
+output_file_path = table_path(current_dir, 'transactions_aggregated')
 
 try:
-    # transactions.csv dosyasını yükle
+    # transactions.csv dosyasını yükle; msno parça parça int32 koda çevrilir ve sözlükte
+    # olmayan kullanıcılar atılır (03 adımı zaten train kullanıcılarına sol birleştirme yapar)
+    print("msno sözlüğü yükleniyor...")
+    codec = load_codebook(current_dir)
     print(f"'{transactions_file_path}' yükleniyor...")
-    transactions_df = pd.read_csv(transactions_file_path)
+    transactions_df = codec.read_csv(transactions_file_path)
     print(f"transactions_df boyutu: {transactions_df.shape}")
 
     # Yeni özellik: indirim (discount)
     # Kullanıcının listedeki fiyattan ne kadar indirimli ödediğini gösterir.
     transactions_df['discount'] = transactions_df['plan_list_price'] - transactions_df['actual_amount_paid']
 
-    # msno'ya göre grupla ve özet istatistikleri hesapla
+    # msno koduna göre grupla ve özet istatistikleri hesapla
     # .agg() fonksiyonu, her bir sütun için farklı bir veya birden fazla işlem yapmamızı sağlar.
     print("Kullanıcı bazında özet istatistikler hesaplanıyor...")
     
@@ -32,16 +37,16 @@ try:
         'is_auto_renew': ['max'], # Kullanıcı hiç otomatik yenileme kullandı mı? (1 evet, 0 hayır)
         'is_cancel': ['sum'], # Toplam iptal edilen işlem sayısı
         'discount': ['mean', 'sum'],
-        'msno': ['count'] # Toplam işlem sayısı
+        CODE_COL: ['count'] # Toplam işlem sayısı
     }
 
     # Gruplama ve aggregation işlemini yap
-    transactions_agg_df = transactions_df.groupby('msno').agg(aggregations)
+    transactions_agg_df = transactions_df.groupby(CODE_COL).agg(aggregations)
 
     # Sütun isimlerini daha anlaşılır hale getir
     # Örn: ('payment_plan_days', 'mean') -> 'payment_plan_days_mean'
     transactions_agg_df.columns = ['_'.join(col).strip() for col in transactions_agg_df.columns.values]
-    transactions_agg_df.rename(columns={'msno_count': 'total_transactions'}, inplace=True)
+    transactions_agg_df.rename(columns={f'{CODE_COL}_count': 'total_transactions'}, inplace=True)
 
     print("\\nÖzetlenmiş DataFrame'in ilk 5 satırı (transactions_agg_df.head()):\\n")
     print(transactions_agg_df.head())
@@ -51,9 +56,9 @@ try:
     transactions_agg_df.info()
     print("-" * 50)
 
-    # Özetlenmiş DataFrame'i yeni bir CSV dosyasına kaydet
+    # Özetlenmiş DataFrame'i ara tablo olarak kaydet (format: pipeline_io)
     print(f"\\nÖzetlenmiş DataFrame '{output_file_path}' olarak kaydediliyor...")
-    transactions_agg_df.to_csv(output_file_path) # index=True çünkü index'te msno bilgisi var
+    write_table(transactions_agg_df, output_file_path, index=True) # index=True çünkü index'te msno kodu var
     print("Kaydetme tamamlandı.")
 
 except FileNotFoundError as e:
@@ -2,30 +2,35 @@
 import pandas as pd
 import os
 
+from msno_codec import CODE_COL, load_codebook
+from pipeline_io import read_table, table_path, write_table
+
 print("--- train_member_merged.csv ve transactions_aggregated.csv dosyaları birleştiriliyor ---")
 
 # Mevcut çalışma dizinini al
 current_dir = os.getcwd()
 
 # Dosya yollarını tanımla
-train_member_merged_path = os.path.join(current_dir, 'train_member_merged.csv')
-transactions_agg_path = os.path.join(current_dir, 'transactions_aggregated.csv')
-output_file_path = os.path.join(current_dir, 'train_members_transactions_merged.csv')
+train_member_merged_path = table_path(current_dir, 'train_member_merged')
+transactions_agg_path = table_path(current_dir, 'transactions_aggregated')
+output_file_path = table_path(current_dir, 'train_members_transactions_merged')
 
 try:
     # train_member_merged.csv dosyasını yükle
     print(f"'{train_member_merged_path}' yükleniyor...")
-    main_df = pd.read_csv(train_member_merged_path)
+    main_df = read_table(train_member_merged_path)
     print(f"main_df boyutu: {main_df.shape}")
 
     # transactions_aggregated.csv dosyasını yükle
     print(f"'{transactions_agg_path}' yükleniyor...")
-    transactions_agg_df = pd.read_csv(transactions_agg_path)
+    transactions_agg_df = read_table(transactions_agg_path)
     print(f"transactions_agg_df boyutu: {transactions_agg_df.shape}")
 
-    # msno sütunu üzerinden sol birleştirme (left merge) yap
+    # msno kodu üzerinden sol birleştirme (left merge) yap; özet tablo msno koduyla yazılır
     print("Ana DataFrame ve özetlenmiş işlemler birleştiriliyor...")
-    merged_df = pd.merge(main_df, transactions_agg_df, on='msno', how='left')
+    codec = load_codebook(current_dir)
+    main_df[CODE_COL] = codec.encode(main_df['msno'])
+    merged_df = pd.merge(main_df, transactions_agg_df, on=CODE_COL, how='left').drop(columns=CODE_COL)
     print(f"Birleştirilmiş DataFrame boyutu: {merged_df.shape}")
 
     print("\nBirleştirilmiş DataFrame'in ilk 5 satırı (merged_df.head()):\n")
@@ -36,9 +41,9 @@ try:
     merged_df.info()
     print("-" * 50)
 
-    # Birleştirilmiş DataFrame'i yeni bir CSV dosyasına kaydet
+    # Birleştirilmiş DataFrame'i ara tablo olarak kaydet (format: pipeline_io)
     print(f"\nBirleştirilmiş DataFrame '{output_file_path}' olarak kaydediliyor...")
-    merged_df.to_csv(output_file_path, index=False)
+    write_table(merged_df, output_file_path)
     print("Kaydetme tamamlandı.")
 
 except FileNotFoundError as e:
@@ -1,64 +1,97 @@
 # 04_aggregate_user_logs.py
+import argparse
 import pandas as pd
 import os
 import time
 
-print("--- user_logs.csv dosyası özetleniyor (aggregation) ---")
-
-# Dosya yollarını tanımla
-current_dir = os.getcwd()
-data_dir = os.path.join(current_dir, 'kkbox-churn-prediction-challenge')
-user_logs_file_path = os.path.join(data_dir, 'user_logs.csv')
-output_file_path = os.path.join(current_dir, 'user_logs_aggregated.csv')
-
-# Parça boyutu (her seferde okunacak satır sayısı)
-chunk_size = 10_000_000 # Bellek kullanımını dengede tutmak için 10 milyon satır
-final_agg_df = None
-
-start_time = time.time()
-
-try:
-    # user_logs.csv dosyasını parçalar halinde oku
-    print(f"'{user_logs_file_path}' parçalar halinde yükleniyor ve işleniyor...")
-    chunk_iterator = pd.read_csv(user_logs_file_path, chunksize=chunk_size)
-
-    for i, chunk in enumerate(chunk_iterator):
-        print(f"Parça {i+1} işleniyor...")
-        
-        # Her bir parça içinde msno'ya göre grupla ve sum (toplam) al
-        chunk_agg = chunk.groupby('msno').sum()
-        
-        # Eğer bu ilk parçaysa, final_agg_df'i başlat
-        if final_agg_df is None:
-            final_agg_df = chunk_agg
+from msno_codec import CODE_COL, CODEBOOK_FILE, load_codebook
+from pipeline_io import table_path, write_table
+from user_logs_agg import TreeReducer, map_partitions, merge_sums, sum_chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="user_logs.csv dosyasını msno bazında toplar.")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="0: tek süreçte parça döngüsü (varsayılan); N>=1: parçalar N işçi süreçte özetlenir (çıktı aynıdır)")
+    parser.add_argument('--chunk-size', type=int, default=10_000_000,
+                        help="parça başına satır sayısı")
+    args = parser.parse_args()
+
+    print("--- user_logs.csv dosyası özetleniyor (aggregation) ---")
+
+    # Dosya yollarını tanımla
+    current_dir = os.getcwd()
+    data_dir = os.path.join(current_dir, 'kkbox-churn-prediction-challenge')
+    user_logs_file_path = os.path.join(data_dir, 'user_logs.csv')
+    codebook_path = os.path.join(current_dir, CODEBOOK_FILE)
+    output_file_path = table_path(current_dir, 'user_logs_aggregated')
+
+    # Parça boyutu (her seferde okunacak satır sayısı)
+    chunk_size = args.chunk_size # Bellek kullanımını dengede tutmak için varsayılan 10 milyon satır
+
+    start_time = time.time()
+
+    try:
+        if args.workers > 0:
+            # Dosya seri parçalarla aynı satırları içeren byte aralıklarına bölünür; her
+            # aralık bir işçi süreçte msno koduna göre toplanır, özetler parça sırasıyla gelir
+            print(f"'{user_logs_file_path}' {args.workers} işçi süreç ile parçalar halinde işleniyor...")
+            chunk_aggs = map_partitions(user_logs_file_path, sum_chunk, args.workers, chunk_size,
+                                        codebook_path=codebook_path)
         else:
-            # Eğer değilse, yeni parçanın özetini final özetine ekle
-            # Aynı msno'lar için değerler toplanacak
-            final_agg_df = final_agg_df.add(chunk_agg, fill_value=0)
-
-    print("\nTüm parçalar işlendi. Son DataFrame oluşturuldu.")
-    
-    # 'date' sütunu anlamsız olduğu için (toplamı alındı) çıkar
-    if 'date' in final_agg_df.columns:
-        final_agg_df = final_agg_df.drop(columns=['date'])
-
-    print("\nÖzetlenmiş DataFrame'in ilk 5 satırı (final_agg_df.head()):\n")
-    print(final_agg_df.head())
-    print("-" * 50)
-
-    print("\nÖzetlenmiş DataFrame hakkında genel bilgi (final_agg_df.info()):\n")
-    final_agg_df.info()
-    print("-" * 50)
-
-    # Özetlenmiş DataFrame'i yeni bir CSV dosyasına kaydet
-    print(f"\nÖzetlenmiş DataFrame '{output_file_path}' olarak kaydediliyor...")
-    final_agg_df.to_csv(output_file_path)
-    print("Kaydetme tamamlandı.")
-
-    end_time = time.time()
-    print(f"\nToplam İşlem Süresi: {end_time - start_time:.2f} saniye")
-
-except FileNotFoundError as e:
-    print(f"Hata: Dosya bulunamadı - {e.filename}. Lütfen dosya yollarını kontrol edin.")
-except Exception as e:
-    print(f"Bir hata oluştu: {e}")
+            # msno'lar sözlükteki int32 kodlara çevrilir; gruplama string yerine kodlar üzerinden yapılır
+            print("msno sözlüğü yükleniyor...")
+            codec = load_codebook(current_dir)
+
+            # user_logs.csv dosyasını parçalar halinde oku
+            print(f"'{user_logs_file_path}' parçalar halinde yükleniyor ve işleniyor...")
+            chunk_iterator = pd.read_csv(user_logs_file_path, chunksize=chunk_size)
+
+            # Sözlükte olmayan kullanıcıları at, her bir parça içinde msno koduna göre grupla
+            # ve sum (toplam) al
+            chunk_aggs = (sum_chunk(chunk, codec) for chunk in chunk_iterator)
+
+        # Parça özetleri sabit şekilli ikili ağaçla birleştirilir (aynı msno'lar için değerler
+        # toplanır); büyüyen tek bir özete her parçayı eklemekten daha ucuzdur ve ağaç yalnızca
+        # parça sayısına bağlı olduğundan çıktı --workers değerinden bağımsızdır
+        reducer = TreeReducer(merge_sums)
+        for i, chunk_agg in enumerate(chunk_aggs):
+            print(f"Parça {i+1} işleniyor...")
+            reducer.push(chunk_agg)
+
+        final_agg_df = reducer.result()
+
+        print("\nTüm parçalar işlendi. Son DataFrame oluşturuldu.")
+
+        # 'date' sütunu anlamsız olduğu için (toplamı alındı) çıkar
+        if 'date' in final_agg_df.columns:
+            final_agg_df = final_agg_df.drop(columns=['date'])
+
+        # msno kodu index olarak yazılır; 05 adımları kod üzerinden birleştirir
+        final_agg_df.index.name = CODE_COL
+
+        print("\nÖzetlenmiş DataFrame'in ilk 5 satırı (final_agg_df.head()):\n")
+        print(final_agg_df.head())
+        print("-" * 50)
+
+        print("\nÖzetlenmiş DataFrame hakkında genel bilgi (final_agg_df.info()):\n")
+        final_agg_df.info()
+        print("-" * 50)
+
+        # Özetlenmiş DataFrame'i ara tablo olarak kaydet (format: pipeline_io)
+        print(f"\nÖzetlenmiş DataFrame '{output_file_path}' olarak kaydediliyor...")
+        write_table(final_agg_df, output_file_path, index=True)
+        print("Kaydetme tamamlandı.")
+
+        end_time = time.time()
+        print(f"\nToplam İşlem Süresi: {end_time - start_time:.2f} saniye")
+
+    except FileNotFoundError as e:
+        print(f"Hata: Dosya bulunamadı - {e.filename}. Lütfen dosya yollarını kontrol edin.")
+    except Exception as e:
+        print(f"Bir hata oluştu: {e}")
+
+
+# İşçi süreçler (Windows/macOS'ta spawn) bu dosyayı yeniden içe aktarır; koruma şart
+if __name__ == '__main__':
+    main()
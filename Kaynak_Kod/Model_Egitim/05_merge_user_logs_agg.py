@@ -2,30 +2,35 @@
 import pandas as pd
 import os
 
+from msno_codec import CODE_COL, load_codebook
+from pipeline_io import read_table, table_path, write_table
+
 print("--- train_members_transactions_merged.csv ve user_logs_aggregated.csv dosyaları birleştiriliyor ---")
 
 # Mevcut çalışma dizinini al
 current_dir = os.getcwd()
 
 # Dosya yollarını tanımla
-main_merged_path = os.path.join(current_dir, 'train_members_transactions_merged.csv')
-user_logs_agg_path = os.path.join(current_dir, 'user_logs_aggregated.csv')
-output_file_path = os.path.join(current_dir, 'final_train_dataset.csv')
+main_merged_path = table_path(current_dir, 'train_members_transactions_merged')
+user_logs_agg_path = table_path(current_dir, 'user_logs_aggregated')
+output_file_path = table_path(current_dir, 'final_train_dataset')
 
 try:
     # train_members_transactions_merged.csv dosyasını yükle
     print(f"'{main_merged_path}' yükleniyor...")
-    main_df = pd.read_csv(main_merged_path)
+    main_df = read_table(main_merged_path)
     print(f"main_df boyutu: {main_df.shape}")
 
     # user_logs_aggregated.csv dosyasını yükle
     print(f"'{user_logs_agg_path}' yükleniyor...")
-    user_logs_agg_df = pd.read_csv(user_logs_agg_path)
+    user_logs_agg_df = read_table(user_logs_agg_path)
     print(f"user_logs_agg_df boyutu: {user_logs_agg_df.shape}")
 
-    # msno sütunu üzerinden sol birleştirme (left merge) yap
+    # msno kodu üzerinden sol birleştirme (left merge) yap; özet tablo msno koduyla yazılır
     print("Ana DataFrame ve özetlenmiş kullanıcı logları birleştiriliyor...")
-    final_df = pd.merge(main_df, user_logs_agg_df, on='msno', how='left')
+    codec = load_codebook(current_dir)
+    main_df[CODE_COL] = codec.encode(main_df['msno'])
+    final_df = pd.merge(main_df, user_logs_agg_df, on=CODE_COL, how='left').drop(columns=CODE_COL)
     print(f"Birleştirilmiş DataFrame boyutu: {final_df.shape}")
 
     print("\nBirleştirilmiş DataFrame'in ilk 5 satırı (final_df.head()):\n")
@@ -38,7 +43,7 @@ try:
 
     # Birleştirilmiş DataFrame'i nihai eğitim veri seti olarak kaydet
     print(f"\nNihai eğitim veri seti '{output_file_path}' olarak kaydediliyor...")
-    final_df.to_csv(output_file_path, index=False)
+    write_table(final_df, output_file_path)
     print("Kaydetme tamamlandı.")
 
 except FileNotFoundError as e:
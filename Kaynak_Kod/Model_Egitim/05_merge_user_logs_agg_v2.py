@@ -3,28 +3,33 @@ import pandas as pd
 import os
 import numpy as np
 
+from msno_codec import CODE_COL, load_codebook
+from pipeline_io import read_table, table_path, write_table
+
 print("--- user_logs_aggregated_v2.csv ile ana veri seti birleştiriliyor ---")
 
 # Dosya yollarını tanımla
 current_dir = os.getcwd()
-train_members_transactions_merged_path = os.path.join(current_dir, 'train_members_transactions_merged.csv')
-user_logs_aggregated_v2_path = os.path.join(current_dir, 'user_logs_aggregated_v2.csv')
-output_file_path = os.path.join(current_dir, 'final_train_dataset.csv')
+train_members_transactions_merged_path = table_path(current_dir, 'train_members_transactions_merged')
+user_logs_aggregated_v2_path = table_path(current_dir, 'user_logs_aggregated_v2')
+output_file_path = table_path(current_dir, 'final_train_dataset')
 
 try:
     # train_members_transactions_merged.csv dosyasını yükle
     print("'{}' yükleniyor...".format(train_members_transactions_merged_path))
-    df_merged = pd.read_csv(train_members_transactions_merged_path)
+    df_merged = read_table(train_members_transactions_merged_path)
     print("Yüklenen DataFrame boyutu: {}".format(df_merged.shape))
 
     # user_logs_aggregated_v2.csv dosyasını yükle
     print("'{}' yükleniyor...".format(user_logs_aggregated_v2_path))
-    df_user_logs_agg = pd.read_csv(user_logs_aggregated_v2_path)
+    df_user_logs_agg = read_table(user_logs_aggregated_v2_path)
     print("Yüklenen user_logs_aggregated_v2 DataFrame boyutu: {}".format(df_user_logs_agg.shape))
 
-    # msno sütunu üzerinden sol birleştirme yap
-    print("\nmsno' sütunu üzerinden sol birleştirme yapılıyor...")
-    final_df = pd.merge(df_merged, df_user_logs_agg, on='msno', how='left')
+    # msno kodu üzerinden sol birleştirme yap; özet tablo msno koduyla yazılır
+    print("\nmsno kodu üzerinden sol birleştirme yapılıyor...")
+    codec = load_codebook(current_dir)
+    df_merged[CODE_COL] = codec.encode(df_merged['msno'])
+    final_df = pd.merge(df_merged, df_user_logs_agg, on=CODE_COL, how='left').drop(columns=CODE_COL)
     print("Birleştirme sonrası DataFrame boyutu: {}".format(final_df.shape))
 
     # Birleştirme sonrası oluşan NaN değerlerini doldur
@@ -42,7 +47,7 @@ try:
 
     # Nihai DataFrame'i kaydet
     print("\nNihai DataFrame '{}' olarak kaydediliyor...".format(output_file_path))
-    final_df.to_csv(output_file_path, index=False)
+    write_table(final_df, output_file_path)
     print("Kaydetme tamamlandı.")
 
 except FileNotFoundError as e:
@@ -3,17 +3,19 @@ import pandas as pd
 import os
 import numpy as np
 
+from pipeline_io import read_table, table_path, write_table
+
 print("--- Veri Temizliği ve Özellik Mühendisliği Başlatılıyor ---")
 
 # Dosya yollarını tanımla
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'final_train_dataset.csv')
-output_file_path = os.path.join(current_dir, 'model_ready_dataset.csv')
+input_file_path = table_path(current_dir, 'final_train_dataset')
+output_file_path = table_path(current_dir, 'model_ready_dataset')
 
 try:
     # Nihai birleştirilmiş veri setini yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     print(f"Orijinal DataFrame boyutu: {df.shape}")
 
     # 1. Eksik Değerleri Doldurma ve Veri Kalitesi Sorunlarını Düzeltme
@@ -67,9 +69,9 @@ try:
     print("\nSon DataFrame hakkında genel bilgi (df.info()):\n")
     df.info()
 
-    # Modellenmeye hazır DataFrame'i yeni bir CSV dosyasına kaydet
+    # Modellenmeye hazır DataFrame'i ara tablo olarak kaydet (format: pipeline_io)
     print(f"\nModellenmeye hazır DataFrame '{output_file_path}' olarak kaydediliyor...")
-    df.to_csv(output_file_path, index=False)
+    write_table(df, output_file_path)
     print("Kaydetme tamamlandı.")
 
 except FileNotFoundError as e:
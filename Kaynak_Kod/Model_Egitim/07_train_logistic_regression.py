@@ -1,5 +1,4 @@
 # 07_train_logistic_regression.py
-import pandas as pd
 import os
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
@@ -7,6 +6,8 @@ from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, confusion_matrix, accuracy_score
 import warnings
 
+from pipeline_io import read_table, table_path
+
 # Olası convergence uyarılarını bastır
 warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
 
@@ -14,12 +15,12 @@ print("--- Lojistik Regresyon Modeli Eğitimi ve Değerlendirmesi ---")
 
 # Dosya yolunu tanımla
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_dataset.csv')
+input_file_path = table_path(current_dir, 'model_ready_dataset')
 
 try:
     # Modellenmeye hazır veri setini yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     print(f"Veri seti boyutu: {df.shape}")
 
     # 1. Özellik (X) ve Hedef (y) Değişkenlerini Ayırma
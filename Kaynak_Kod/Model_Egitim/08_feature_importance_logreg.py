@@ -6,6 +6,8 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.linear_model import LogisticRegression
 import warnings
 
+from pipeline_io import read_table, table_path
+
 # Olası convergence uyarılarını bastır
 warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
 
@@ -13,12 +15,12 @@ print("--- Lojistik Regresyon ile Özellik Önemini Belirleme ---")
 
 # Dosya yolunu tanımla
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_dataset.csv')
+input_file_path = table_path(current_dir, 'model_ready_dataset')
 
 try:
     # Modellenmeye hazır veri setini yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
 
     # 1. Özellik (X) ve Hedef (y) Değişkenlerini Ayırma
     X = df.drop('is_churn', axis=1)
@@ -1,18 +1,19 @@
 # 09_create_reduced_dataset.py
-import pandas as pd
 import os
 
+from pipeline_io import read_table, table_path, write_table
+
 print("--- Özellik Seçimi Yapılmış Veri Seti Oluşturuluyor ---")
 
 # Dosya yollarını tanımla
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_dataset.csv')
-output_file_path = os.path.join(current_dir, 'model_ready_reduced_dataset.csv')
+input_file_path = table_path(current_dir, 'model_ready_dataset')
+output_file_path = table_path(current_dir, 'model_ready_reduced_dataset')
 
 try:
     # Modellenmeye hazır veri setini yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     print(f"Orijinal DataFrame boyutu: {df.shape}")
 
     # Kaldırılacak sütunları bul
@@ -25,7 +26,7 @@ try:
 
     # Yeni veri setini kaydet
     print(f"\nÖzellik seçimi yapılmış veri seti '{output_file_path}' olarak kaydediliyor...")
-    df_reduced.to_csv(output_file_path, index=False)
+    write_table(df_reduced, output_file_path)
     print("Kaydetme tamamlandı.")
 
 except FileNotFoundError as e:
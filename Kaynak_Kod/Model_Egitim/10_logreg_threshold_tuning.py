@@ -1,5 +1,4 @@
 # 10_logreg_threshold_tuning.py
-import pandas as pd
 import os
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
@@ -8,6 +7,8 @@ from sklearn.metrics import classification_report, confusion_matrix, accuracy_sc
 import warnings
 import numpy as np
 
+from pipeline_io import read_table, table_path
+
 # Olası convergence uyarılarını bastır
 warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
 
@@ -15,12 +16,12 @@ print("--- Lojistik Regresyon Karar Eşiği Ayarlaması ---")
 
 # Dosya yolunu tanımla
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_reduced_dataset.csv')
+input_file_path = table_path(current_dir, 'model_ready_reduced_dataset')
 
 try:
     # Azaltılmış veri setini yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     print(f"Veri seti boyutu: {df.shape}")
 
     # 1. Özellik (X) ve Hedef (y) Değişkenlerini Ayırma
@@ -1,36 +1,34 @@
 # 11_aggregate_user_logs_filtered.py
 import pandas as pd
 import os
-import numpy as np
 import time
 
+from msno_codec import CODE_COL, load_codebook
+from pipeline_io import table_path, write_table
+from user_logs_agg import LOG_COLS, UserLogAggregator, encode_chunk
+
 print("--- user_logs.csv dosyası filtrelenerek ve kapsamlı olarak özetleniyor ---")
 
 # Dosya yollarını tanımla
 current_dir = os.getcwd()
 data_dir = os.path.join(current_dir, 'kkbox-churn-prediction-challenge')
 user_logs_file_path = os.path.join(data_dir, 'user_logs.csv')
-train_file_path = os.path.join(data_dir, 'train.csv')
-output_file_path = os.path.join(current_dir, 'user_logs_aggregated_v2.csv')
+output_file_path = table_path(current_dir, 'user_logs_aggregated_v2')
 
 try:
-    # 1. Sadece eğitim setindeki kullanıcıları al
-    print("Eğitim setindeki kullanıcı kimlikleri (msno) alınıyor...")
-    train_df = pd.read_csv(train_file_path)
-    train_msnos = set(train_df['msno'])
-    print(f"- {len(train_msnos)} adet benzersiz kullanıcı bulundu.")
+    # 1. Sadece eğitim setindeki kullanıcıları al (msno sözlüğündeki train bayrağı)
+    print("msno sözlüğü yükleniyor...")
+    codec = load_codebook(current_dir)
+    print(f"- {int(codec.in_train.sum())} adet benzersiz eğitim kullanıcısı bulundu.")
 
     # Parça boyutu
     chunk_size = 10_000_000
 
     # Agregasyon için sütunlar
-    log_cols = ['num_25', 'num_50', 'num_75', 'num_985', 'num_100', 'num_unq', 'total_secs']
+    log_cols = LOG_COLS
 
-    # Her kullanıcı için biriktirilecek sözlükler
-    user_sums = {}
-    user_counts = {}
-    user_min_vals = {}
-    user_max_vals = {}
+    # Kullanıcı başına sum/count/min/max, msno kodu ile indekslenen NumPy dizilerinde biriktirilir
+    aggregator = UserLogAggregator(log_cols)
 
     start_time = time.time()
 
@@ -39,8 +37,9 @@ try:
     chunk_iterator = pd.read_csv(user_logs_file_path, chunksize=chunk_size)
 
     for i, chunk in enumerate(chunk_iterator):
-        # 3. Her parçayı, sadece eğitim setindeki kullanıcıları içerecek şekilde filtrele
-        chunk_filtered = chunk[chunk['msno'].isin(train_msnos)]
+        # 3. msno'ları int32 koda çevir ve sadece eğitim setindeki kullanıcıları tut;
+        # gruplama string yerine tamsayı kodlar üzerinden yapılır
+        chunk_filtered = encode_chunk(chunk, codec, only_train=True)
         
         if not chunk_filtered.empty:
             print(f"Parça {i+1} işleniyor... (Filtrelenmiş satır sayısı: {len(chunk_filtered)})")
@@ -48,48 +47,16 @@ try:
             # total_secs sütunundaki negatif değerleri 0 yap (temizlik)
             chunk_filtered.loc[chunk_filtered['total_secs'] < 0, 'total_secs'] = 0
 
-            # 4. Filtrelenmiş parça içinde msno'ya göre grupla ve istatistikleri hesapla
-            chunk_agg = chunk_filtered.groupby('msno')[log_cols].agg(['sum', 'count', 'min', 'max'])
-            
-            # Çok seviyeli sütun isimlerini düzleştir
-            chunk_agg.columns = ['_'.join(col).strip() for col in chunk_agg.columns.values]
-            
-            # 5. Her kullanıcı için istatistikleri biriktir
-            for msno, row in chunk_agg.iterrows():
-                if msno not in user_sums:
-                    user_sums[msno] = {col: 0 for col in log_cols}
-                    user_counts[msno] = {col: 0 for col in log_cols}
-                    user_min_vals[msno] = {col: np.inf for col in log_cols}
-                    user_max_vals[msno] = {col: -np.inf for col in log_cols}
-
-                for col in log_cols:
-                    user_sums[msno][col] += row[f'{col}_sum']
-                    user_counts[msno][col] += row[f'{col}_count']
-                    user_min_vals[msno][col] = min(user_min_vals[msno][col], row[f'{col}_min'])
-                    user_max_vals[msno][col] = max(user_max_vals[msno][col], row[f'{col}_max'])
+            # 4-5. Filtrelenmiş parçayı msno'ya göre özetle ve kullanıcı dizilerine vektörel olarak ekle
+            aggregator.add_chunk(chunk_filtered)
         else:
             print(f"Parça {i+1} işleniyor... (İlgili kullanıcı bulunamadı)")
 
     print("\n6. Tüm parçalar işlendi. Son DataFrame oluşturuluyor.")
 
-    # Nihai DataFrame'i oluştur
-    final_data = []
-    for msno in user_sums:
-        row_data = {'msno': msno}
-        for col in log_cols:
-            total_sum = user_sums[msno][col]
-            total_count = user_counts[msno][col]
-            
-            row_data[f'{col}_sum'] = total_sum
-            row_data[f'{col}_count'] = total_count # Aktif gün sayısı olarak kullanılabilir
-            row_data[f'{col}_mean'] = total_sum / total_count if total_count > 0 else 0
-            row_data[f'{col}_min'] = user_min_vals[msno][col] if user_min_vals[msno][col] != np.inf else 0
-            row_data[f'{col}_max'] = user_max_vals[msno][col] if user_max_vals[msno][col] != -np.inf else 0
-            
-        final_data.append(row_data)
-
-    final_agg_df = pd.DataFrame(final_data)
-    final_agg_df = final_agg_df.set_index('msno')
+    # Nihai DataFrame'i oluştur (msno kodu index; 05 adımları kod üzerinden birleştirir)
+    final_agg_df = aggregator.to_frame()
+    final_agg_df.index.name = CODE_COL
 
     print("\nÖzetlenmiş DataFrame'in ilk 5 satırı:\n")
     print(final_agg_df.head())
@@ -99,9 +66,9 @@ try:
     final_agg_df.info()
     print("-" * 50)
 
-    # 7. Özetlenmiş DataFrame'i yeni bir CSV dosyasına kaydet
+    # 7. Özetlenmiş DataFrame'i ara tablo olarak kaydet (format: pipeline_io)
     print(f"Özetlenmiş DataFrame '{output_file_path}' olarak kaydediliyor...")
-    final_agg_df.to_csv(output_file_path)
+    write_table(final_agg_df, output_file_path, index=True)
     print("Kaydetme tamamlandı.")
 
     end_time = time.time()
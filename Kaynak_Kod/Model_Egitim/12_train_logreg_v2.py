@@ -1,5 +1,4 @@
 # 12_train_logreg_v2.py
-import pandas as pd
 import os
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
@@ -8,20 +7,22 @@ from sklearn.metrics import classification_report, confusion_matrix
 import pickle
 import warnings
 
+from pipeline_io import read_table, table_path
+
 warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
 
 print("--- Yeni Özellik Setiyle Lojistik Regresyon Eğitimi (v2) ---")
 
 # Dosya yollarını tanımla
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_dataset.csv')
+input_file_path = table_path(current_dir, 'model_ready_dataset')
 model_output_path = os.path.join(current_dir, 'logreg_model_v2.pkl')
 scaler_output_path = os.path.join(current_dir, 'scaler_v2.pkl')
 
 try:
     # Modellenmeye hazır yeni veri setini yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     print(f"DataFrame boyutu: {df.shape}")
 
     # Özellik (X) ve Hedef (y) Değişkenlerini Ayırma
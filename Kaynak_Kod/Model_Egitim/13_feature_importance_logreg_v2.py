@@ -3,12 +3,14 @@ import pandas as pd
 import os
 import pickle
 
+from pipeline_io import table_columns, table_path
+
 print("--- Yeni Modelin Özellik Önemini Analiz Etme (v2) ---")
 
 # Dosya yollarını tanımla
 current_dir = os.getcwd()
 model_input_path = os.path.join(current_dir, 'logreg_model_v2.pkl')
-data_input_path = os.path.join(current_dir, 'model_ready_dataset.csv')
+data_input_path = table_path(current_dir, 'model_ready_dataset')
 
 try:
     # Eğitilmiş modeli yükle
@@ -19,8 +21,8 @@ try:
 
     # Özellik isimlerini almak için veri setini yükle (sadece sütunlar)
     print(f"Özellik isimleri için '{data_input_path}' okunuyor...")
-    df = pd.read_csv(data_input_path, nrows=0) # Sadece başlıkları oku
-    feature_names = df.drop('is_churn', axis=1).columns
+    columns = pd.Index(table_columns(data_input_path)) # Sadece başlıkları oku
+    feature_names = columns.drop('is_churn')
     print(f"- {len(feature_names)} adet özellik bulundu.")
 
     # Model katsayılarını al
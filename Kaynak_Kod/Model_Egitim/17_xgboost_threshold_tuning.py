@@ -1,23 +1,24 @@
 # 17_xgboost_threshold_tuning.py
-import pandas as pd
 import os
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 import warnings
 
+from pipeline_io import read_table, table_path
+
 warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
 
 print("--- XGBoost Karar Eşiği Ayarlaması ---")
 
 # Dosya yolunu tanımla
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_reduced_dataset_v2.csv')
+input_file_path = table_path(current_dir, 'model_ready_reduced_dataset_v2')
 
 try:
     # Veri setini yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     print(f"DataFrame boyutu: {df.shape}")
 
     # Özellik (X) ve Hedef (y) Değişkenlerini Ayırma
@@ -6,18 +6,20 @@ from sklearn.model_selection import train_test_split
 import matplotlib.pyplot as plt
 import warnings
 
+from pipeline_io import read_table, table_path
+
 warnings.filterwarnings('ignore', category=UserWarning, module='sklearn')
 
 print("--- XGBoost Modelinin Özellik Önemini Analiz Etme ---")
 
 # Dosya yolunu tanımla
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_reduced_dataset_v2.csv')
+input_file_path = table_path(current_dir, 'model_ready_reduced_dataset_v2')
 
 try:
     # Veri setini yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     print(f"DataFrame boyutu: {df.shape}")
 
     # Özellik (X) ve Hedef (y) Değişkenlerini Ayırma
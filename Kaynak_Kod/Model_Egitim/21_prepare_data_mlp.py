@@ -1,15 +1,16 @@
-import pandas as pd
 import numpy as np
 import os
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
 import joblib
 
+from pipeline_io import read_table, table_path
+
 print("--- MLP İçin Veri Hazırlığı Başlatılıyor ---")
 
 # Dosya yolları
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_reduced_dataset_v2.csv')
+input_file_path = table_path(current_dir, 'model_ready_reduced_dataset_v2')
 X_train_out = os.path.join(current_dir, 'mlp_X_train.npy')
 X_test_out = os.path.join(current_dir, 'mlp_X_test.npy')
 y_train_out = os.path.join(current_dir, 'mlp_y_train.npy')
@@ -19,7 +20,7 @@ scaler_out = os.path.join(current_dir, 'mlp_scaler.pkl')
 try:
     # Veriyi yükle
     print(f"'{input_file_path}' yükleniyor... (Bu işlem dosya boyutu nedeniyle biraz zaman alabilir)")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     print(f"Veri seti boyutu: {df.shape}")
 
     # X ve y ayırma
@@ -3,6 +3,8 @@ import numpy as np
 import os
 import time
 
+from msno_codec import CODE_COL, load_codebook
+
 print("--- RNN/LSTM İçin Zaman Serisi Veri Hazırlığı (V2 Verisiyle) ---")
 
 # Dosya yolları
@@ -19,34 +21,33 @@ FEATURES = ['num_25', 'num_50', 'num_75', 'num_985', 'num_100', 'num_unq', 'tota
 try:
     # 1. Kullanıcı Listesini Al
     print("Eğitim seti kullanıcıları alınıyor...")
+    codec = load_codebook(current_dir)
     train_df = pd.read_csv(train_path)
-    train_msnos = set(train_df['msno'])
-    y_mapping = dict(zip(train_df['msno'], train_df['is_churn']))
-    print(f"- {len(train_msnos)} kullanıcı hedef listesinde.")
+    # Hedef değişken msno kodu ile indekslenen bir dizide tutulur (sözlük yerine)
+    y_by_code = np.zeros(len(codec), dtype='int8')
+    y_by_code[codec.encode(train_df['msno'])] = train_df['is_churn'].to_numpy()
+    print(f"- {int(codec.in_train.sum())} kullanıcı hedef listesinde.")
 
     # 2. Logları Oku (V2 dosyası daha küçük olduğu için daha hızlı)
     print(f"\n'{user_logs_v2_path}' yükleniyor...")
     start_time = time.time()
     
-    # user_logs_v2.csv'yi yükle (Yaklaşık 1.3 GB, belleğe sığabilir)
-    logs_v2_df = pd.read_csv(user_logs_v2_path)
-    print(f"Log satır sayısı: {len(logs_v2_df)}")
-
-    # Sadece eğitim setindeki kullanıcıları filtrele
-    logs_v2_df = logs_v2_df[logs_v2_df['msno'].isin(train_msnos)]
+    # user_logs_v2.csv parça parça okunur; msno string'leri int32 koda çevrilip atılır ve
+    # sadece eğitim setindeki kullanıcılar tutulur (bellekte string sütunu birikmez)
+    logs_v2_df = codec.read_csv(user_logs_v2_path, only_train=True)
     print(f"Filtrelenmiş log satır sayısı: {len(logs_v2_df)}")
 
-    # Tarihe göre sırala (Önemli!)
+    # Tarihe göre sırala (Önemli!) - kod sırası msno'nun alfabetik sırasıyla aynıdır
     print("Tarihe göre sıralanıyor...")
-    logs_v2_df = logs_v2_df.sort_values(by=['msno', 'date'])
+    logs_v2_df = logs_v2_df.sort_values(by=[CODE_COL, 'date'])
 
     # 3. Sequence Oluşturma
     print("\nSekanslar oluşturuluyor...")
     X_list = []
     y_list = []
     
-    # msno'ya göre grupla ve her grup için son N günü al
-    for msno, group in logs_v2_df.groupby('msno'):
+    # msno koduna göre grupla ve her grup için son N günü al
+    for code, group in logs_v2_df.groupby(CODE_COL):
         seq = group[FEATURES].values
         
         # Son SEQUENCE_LENGTH günü al
@@ -59,7 +60,7 @@ try:
             seq = np.vstack([padding, seq])
         
         X_list.append(seq)
-        y_list.append(y_mapping[msno])
+        y_list.append(y_by_code[code])
 
     X_rnn = np.array(X_list, dtype='float32')
     y_rnn = np.array(y_list, dtype='int8')
@@ -3,17 +3,19 @@ import numpy as np
 import os
 import time
 
+from pipeline_io import read_table, table_path
+
 print("--- Hibrit Model İçin Veri Hizalama (Adım 24-V2) ---")
 
 current_dir = os.getcwd()
-tabular_data_path = os.path.join(current_dir, 'model_ready_reduced_dataset_v2.csv')
+tabular_data_path = table_path(current_dir, 'model_ready_reduced_dataset_v2')
 train_path = os.path.join(current_dir, 'kkbox-churn-prediction-challenge/train.csv')
 rnn_X_path = os.path.join(current_dir, 'rnn_X_sequences.npz')
 
 try:
     # 1. Tablolu veriyi yükle ve msno ile eşleştir
     print("Tablolu veriler ve kullanıcı listesi yükleniyor...")
-    df_tabular = pd.read_csv(tabular_data_path)
+    df_tabular = read_table(tabular_data_path)
     df_train = pd.read_csv(train_path)
     
     # msno'yu geri ekle (hizalama için şart)
@@ -3,10 +3,13 @@ import numpy as np
 import os
 import time
 
+from msno_codec import CODE_COL, load_codebook
+from pipeline_io import read_table, table_path
+
 print("--- Hibrit Model İçin Hızlı Veri Hizalama (Adım 24-V2) ---")
 
 current_dir = os.getcwd()
-tabular_data_path = os.path.join(current_dir, 'model_ready_reduced_dataset_v2.csv')
+tabular_data_path = table_path(current_dir, 'model_ready_reduced_dataset_v2')
 train_path = os.path.join(current_dir, 'kkbox-churn-prediction-challenge/train.csv')
 rnn_X_path = os.path.join(current_dir, 'rnn_X_sequences.npz')
 
@@ -15,28 +18,29 @@ try:
     
     # 1. Sadece msno'ları içeren listeleri yükle (Tüm dosyayı okumaktan kaçın)
     print("Kullanıcı listeleri yükleniyor...")
+    codec = load_codebook(current_dir)
     df_train = pd.read_csv(train_path, usecols=['msno'])
+    train_codes = codec.encode(df_train['msno'])
     
-    # user_logs_v2'deki msno'ları Adım 23'teki mantıkla belirle
+    # user_logs_v2'deki msno'ları Adım 23'teki mantıkla belirle (eğitim kullanıcılarının kodları)
     user_logs_v2_path = os.path.join(current_dir, 'kkbox-churn-prediction-challenge/data 4/churn_comp_refresh/user_logs_v2.csv')
-    logs_v2_msnos = pd.read_csv(user_logs_v2_path, usecols=['msno'])['msno'].unique()
+    logs_v2_codes = codec.read_csv(user_logs_v2_path, only_train=True, usecols=['msno'])[CODE_COL]
     
-    # train.csv'de de olan kullanıcıları bul ve alfabetik sırala (Adım 23'teki groupby sırası)
-    train_msnos_set = set(df_train['msno'])
-    common_msnos = sorted([m for m in logs_v2_msnos if m in train_msnos_set])
-    common_msnos_set = set(common_msnos)
-    print(f"Eşleşen kullanıcı sayısı: {len(common_msnos)}")
+    # Sekans verisinde olan kullanıcılar için kod başına bayrak
+    in_sequences = np.zeros(len(codec), dtype=bool)
+    in_sequences[logs_v2_codes.to_numpy()] = True
+    print(f"Eşleşen kullanıcı sayısı: {int(in_sequences.sum())}")
 
     # 2. Tablolu veriyi yükle
     print("Tablolu veriler yükleniyor...")
-    df_tabular = pd.read_csv(tabular_data_path)
-    df_tabular['msno'] = df_train['msno']
+    df_tabular = read_table(tabular_data_path)
+    df_tabular[CODE_COL] = train_codes
     
-    # Filtrele ve sırala
+    # Filtrele ve kod sırasına diz (kod sırası = alfabetik sıra = Adım 23'teki groupby sırası)
     print("Veriler hizalanıyor...")
-    df_tabular_filtered = df_tabular[df_tabular['msno'].isin(common_msnos_set)].sort_values('msno')
+    df_tabular_filtered = df_tabular[in_sequences[train_codes]].sort_values(CODE_COL)
     
-    X_tabular_hybrid = df_tabular_filtered.drop(['msno', 'is_churn'], axis=1).values
+    X_tabular_hybrid = df_tabular_filtered.drop([CODE_COL, 'is_churn'], axis=1).values
     y_hybrid = df_tabular_filtered['is_churn'].values
 
     # 3. Sekans verisini yükle
@@ -1,4 +1,3 @@
-import pandas as pd
 import numpy as np
 import os
 from sklearn.model_selection import train_test_split
@@ -9,17 +8,19 @@ import lightgbm as lgb
 from catboost import CatBoostClassifier
 import time
 
+from pipeline_io import read_table, table_path
+
 print("--- Ensemble Learning (Topluluk Öğrenmesi) Başlatılıyor (Adım 24-V3) ---")
 
 # Dosya yolları
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_reduced_dataset_v2.csv')
+input_file_path = table_path(current_dir, 'model_ready_reduced_dataset_v2')
 results_out = os.path.join(current_dir, 'ensemble_results.md')
 
 try:
     # 1. Veri Setini Yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     X = df.drop('is_churn', axis=1)
     y = df['is_churn']
 
@@ -3,42 +3,47 @@ import numpy as np
 import os
 import time
 
+from msno_codec import CODE_COL, load_codebook
+from pipeline_io import read_table, table_path, write_table
+
 print("--- İleri Seviye Özellik Mühendisliği (Adım 24-V4) ---")
 
 current_dir = os.getcwd()
 # Girdi dosyaları
-model_ready_path = os.path.join(current_dir, 'model_ready_reduced_dataset_v2.csv')
+model_ready_path = table_path(current_dir, 'model_ready_reduced_dataset_v2')
 transactions_path = os.path.join(current_dir, 'kkbox-churn-prediction-challenge/transactions.csv')
 user_logs_v2_path = os.path.join(current_dir, 'kkbox-churn-prediction-challenge/data 4/churn_comp_refresh/user_logs_v2.csv')
-output_path = os.path.join(current_dir, 'model_ready_v4_advanced.csv')
+output_path = table_path(current_dir, 'model_ready_v4_advanced')
 
 try:
     start_time = time.time()
     
     # 1. Mevcut Veri Setini Yükle
     print("Mevcut veri seti yükleniyor...")
-    df_main = pd.read_csv(model_ready_path)
+    df_main = read_table(model_ready_path)
     # msno sütunu model_ready dosyasında olmayabilir (eğitim için çıkarılmıştı).
     # Bu yüzden train.csv ile birleştirip msno'yu geri getirmemiz lazım.
+    # Birleştirmeler string yerine msno sözlüğündeki int32 kodlar üzerinden yapılır.
     train_path = os.path.join(current_dir, 'kkbox-churn-prediction-challenge/train.csv')
+    codec = load_codebook(current_dir)
     df_train = pd.read_csv(train_path, usecols=['msno'])
-    df_main['msno'] = df_train['msno'] # Sırası bozulmadıysa bu çalışır
+    df_main[CODE_COL] = codec.encode(df_train['msno']) # Sırası bozulmadıysa bu çalışır
     print(f"Ana veri boyutu: {df_main.shape}")
 
     # 2. Üyelik Bitiş Tarihi (Expire Date) Özelliği
     print("\nTransactions dosyasından 'membership_expire_date' işleniyor...")
-    # Sadece msno ve expire_date okuyalım
-    df_trans = pd.read_csv(transactions_path, usecols=['msno', 'membership_expire_date'])
+    # Sadece msno ve expire_date okuyalım (yalnızca eğitim kullanıcıları, msno kodlanmış)
+    df_trans = codec.read_csv(transactions_path, only_train=True, usecols=['msno', 'membership_expire_date'])
     
     # Her kullanıcının EN SON (maksimum) bitiş tarihini bul
     # Tarih formatını düzelt
     df_trans['membership_expire_date'] = pd.to_datetime(df_trans['membership_expire_date'], format='%Y%m%d', errors='coerce')
     
-    last_expire = df_trans.groupby('msno')['membership_expire_date'].max().reset_index()
-    last_expire.columns = ['msno', 'last_expire_date']
+    last_expire = df_trans.groupby(CODE_COL)['membership_expire_date'].max().reset_index()
+    last_expire.columns = [CODE_COL, 'last_expire_date']
     
     # Ana veriye birleştir
-    df_main = pd.merge(df_main, last_expire, on='msno', how='left')
+    df_main = pd.merge(df_main, last_expire, on=CODE_COL, how='left')
     
     # Gün farkını hesapla (Referans tarih: 2017-03-31 - Train setinin sonu varsayımı)
     ref_date = pd.to_datetime('2017-03-31')
@@ -53,11 +58,13 @@ try:
 
     # 3. Trend Özellikleri (User Logs V2'den)
     print("\nUser Logs V2 üzerinden Trend (Değişim) özellikleri hesaplanıyor...")
-    df_logs = pd.read_csv(user_logs_v2_path)
+    df_logs = codec.read_csv(user_logs_v2_path, only_train=True)
     df_logs['date'] = pd.to_datetime(df_logs['date'], format='%Y%m%d', errors='coerce')
     
-    # Referans tarih (V2 loglarının sonu)
-    max_log_date = df_logs['date'].max()
+    # Referans tarih (V2 loglarının sonu); eski davranıştaki gibi yalnızca eğitim
+    # kullanıcılarının değil, dosyadaki tüm satırların en son tarihi alınır
+    all_log_dates = pd.read_csv(user_logs_v2_path, usecols=['date'])['date'].drop_duplicates()
+    max_log_date = pd.to_datetime(all_log_dates, format='%Y%m%d', errors='coerce').max()
     print(f"En son log tarihi: {max_log_date}")
     
     # İki periyoda böl: Son 14 gün vs Önceki 14 gün
@@ -73,12 +80,12 @@ try:
     cols_to_sum = ['total_secs', 'num_unq', 'num_100']
     
     # Recent Stats
-    recent_stats = df_logs[mask_recent].groupby('msno')[cols_to_sum].sum().add_suffix('_recent')
+    recent_stats = df_logs[mask_recent].groupby(CODE_COL)[cols_to_sum].sum().add_suffix('_recent')
     # Previous Stats
-    prev_stats = df_logs[mask_previous].groupby('msno')[cols_to_sum].sum().add_suffix('_prev')
+    prev_stats = df_logs[mask_previous].groupby(CODE_COL)[cols_to_sum].sum().add_suffix('_prev')
     
     # Birleştir
-    trend_stats = pd.merge(recent_stats, prev_stats, on='msno', how='outer').fillna(0)
+    trend_stats = pd.merge(recent_stats, prev_stats, on=CODE_COL, how='outer').fillna(0)
     
     # Oranları Hesapla (Trend = Recent / Previous)
     # 0'a bölme hatasını önlemek için +1 ekliyoruz (Laplace Smoothing benzeri)
@@ -90,7 +97,7 @@ try:
     df_trends = trend_stats[trend_cols].reset_index()
     
     # Ana veriye birleştir
-    df_main = pd.merge(df_main, df_trends, on='msno', how='left')
+    df_main = pd.merge(df_main, df_trends, on=CODE_COL, how='left')
     
     # Log kaydı olmayanlar için trend 1 (değişim yok) varsayılabilir
     for col in trend_cols:
@@ -99,11 +106,11 @@ try:
     print(f"- {len(trend_cols)} adet trend özelliği eklendi: {trend_cols}")
 
     # 4. Temizlik ve Kayıt
-    # msno'yu tekrar çıkar (eğitim için)
-    df_final = df_main.drop('msno', axis=1)
+    # msno kodunu tekrar çıkar (eğitim için)
+    df_final = df_main.drop(CODE_COL, axis=1)
     
     print(f"\nFinal Veri Seti Boyutu: {df_final.shape}")
-    df_final.to_csv(output_path, index=False)
+    write_table(df_final, output_path)
     print(f"Veri seti kaydedildi: {output_path}")
     print(f"Toplam Süre: {time.time() - start_time:.2f}s")
 
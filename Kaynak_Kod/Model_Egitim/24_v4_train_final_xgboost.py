@@ -6,18 +6,20 @@ from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, confusion_matrix
 import time
 
+from pipeline_io import read_table, table_path
+
 print("--- Final XGBoost Eğitimi (Adım 24-V4: İleri Seviye Özellikler) ---")
 
 # Dosya yolları
 current_dir = os.getcwd()
-input_file_path = os.path.join(current_dir, 'model_ready_v4_advanced.csv')
+input_file_path = table_path(current_dir, 'model_ready_v4_advanced')
 results_out = os.path.join(current_dir, 'xgboost_final_v4_results.md')
 model_out = os.path.join(current_dir, 'xgboost_final_model.json')
 
 try:
     # 1. Veri Setini Yükle
     print(f"'{input_file_path}' yükleniyor...")
-    df = pd.read_csv(input_file_path)
+    df = read_table(input_file_path)
     X = df.drop('is_churn', axis=1)
     y = df['is_churn']
 
@@ -7,10 +7,12 @@ import matplotlib.pyplot as plt
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import classification_report, f1_score
 
+from pipeline_io import read_table, table_path
+
 print("--- Final Model Temizliği ve Sadeleştirme (Adım 25) ---")
 
 current_dir = os.getcwd()
-data_path = os.path.join(current_dir, 'model_ready_v4_advanced.csv')
+data_path = table_path(current_dir, 'model_ready_v4_advanced')
 model_path = os.path.join(current_dir, 'xgboost_final_model.json')
 output_model_path = os.path.join(current_dir, 'xgboost_final_model_lite.json')
 feature_list_path = os.path.join(current_dir, 'feature_list.json')
@@ -18,7 +20,7 @@ feature_list_path = os.path.join(current_dir, 'feature_list.json')
 try:
     # 1. Veriyi Yükle
     print(f"Veri yükleniyor: {data_path}")
-    df = pd.read_csv(data_path)
+    df = read_table(data_path)
     X = df.drop('is_churn', axis=1)
     y = df['is_churn']
     
@@ -122,6 +124,11 @@ try:
     # Ama analiz kolaylığı için test setinin bir kısmını kaydedelim.
     sample_data = X_reduced.copy()
     sample_data['is_churn'] = y # Hedefi geri koy
+    # Backend'in msno ile arama yapabilmesi için kullanıcı kimliğini ekle
+    # (24_v4 adımındaki gibi satır sırasının train.csv ile aynı olduğu varsayılır)
+    train_path = os.path.join(current_dir, 'kkbox-churn-prediction-challenge/train.csv')
+    if os.path.exists(train_path):
+        sample_data.insert(0, 'msno', pd.read_csv(train_path, usecols=['msno'])['msno'])
     sample_data.to_csv('model_ready_lite_sample.csv', index=False)
     print("Örnek sadeleştirilmiş veri seti (model_ready_lite_sample.csv) kaydedildi.")
 
@@ -2,6 +2,7 @@ import pandas as pd
 import numpy as np
 import os
 import random
+import base64
 
 print("--- Demo Verisi Zenginleştirme (Sadık Kullanıcı Ekleme) ---")
 
@@ -36,6 +37,10 @@ try:
         # Days to Expire: 30 gün ile 180 gün arası (Gelecek)
         new_user['days_to_expire'] = random.randint(30, 180)
         
+        # msno: Gerçek kimliklerle aynı formatta (44 karakter base64) rastgele kimlik
+        if 'msno' in new_user:
+            new_user['msno'] = base64.b64encode(random.getrandbits(256).to_bytes(32, 'big')).decode('ascii')
+
         # Hedef: Churn Değil
         new_user['is_churn'] = 0
         
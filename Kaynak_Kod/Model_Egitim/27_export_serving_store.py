@@ -0,0 +1,50 @@
+import pandas as pd
+import json
+import os
+import sys
+import time
+
+# Backend ile aynı dönüşüm kodunu kullanmak için feature_store modülünü içe aktar
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Backend'))
+from feature_store import export_store
+
+print("--- Serving Store Dışa Aktarma (Kolon Bazlı .npy + Manifest) ---")
+
+current_dir = os.getcwd()
+data_path = os.path.join(current_dir, 'model_ready_lite_sample.csv')
+feature_list_path = os.path.join(current_dir, 'feature_list.json')
+store_dir = os.path.join(current_dir, 'serving_store')
+
+try:
+    # 1. Özellik listesini ve demo veritabanını yükle
+    with open(feature_list_path, 'r') as f:
+        feature_names = json.load(f)
+    print(f"Özellik sayısı: {len(feature_names)}")
+
+    print("Demo verisi yükleniyor...")
+    start = time.time()
+    df_db = pd.read_csv(data_path, dtype={'msno': str})
+    print(f"Kayıt sayısı: {len(df_db)} ({time.time() - start:.1f} sn)")
+
+    missing = [name for name in feature_names if name not in df_db.columns]
+    if missing:
+        raise ValueError(f"Veride eksik özellikler var: {missing}")
+
+    # 2. Her dizi ayrı bir .npy dosyasına yazılır; Backend bunları memory-map ile açar.
+    # msno hash tablosu da hazır olarak yazılır, böylece açılışta satır başına iş yapılmaz.
+    print("Serving store yazılıyor...")
+    start = time.time()
+    manifest = export_store(df_db, feature_names, store_dir, source_path=data_path)
+    print(f"Yazma süresi: {time.time() - start:.1f} sn")
+
+    total_bytes = 0
+    for name, entry in manifest['arrays'].items():
+        size = os.path.getsize(os.path.join(store_dir, f"{name}.npy"))
+        total_bytes += size
+        print(f"  {name:<20} {entry['dtype']:<6} {str(tuple(entry['shape'])):<16} {size / 1e6:8.1f} MB")
+
+    print(f"Toplam: {total_bytes / 1e6:.1f} MB -> {store_dir}")
+    print("Backend bu klasörü bulduğunda CSV yerine store'u kullanır (CHURN_SERVING_STORE ile değiştirilebilir).")
+
+except Exception as e:
+    print(f"Hata: {e}")
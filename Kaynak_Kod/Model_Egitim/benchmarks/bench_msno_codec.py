@@ -0,0 +1,96 @@
+"""Time and peak RSS of the step 23 load -> filter to train users -> sort by
+(msno, date) path on a synthetic user_logs_v2.csv: msno kept as Python strings
+(isin(set), string sort) vs. int32 codes from MsnoCodec (chunked encode, code
+mask, integer sort). Each variant runs in its own process; the sorted feature
+matrices and key order are compared.
+
+Usage: python benchmarks/bench_msno_codec.py [n_rows] [n_users] [n_train]
+"""
+import hashlib
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MODEL_DIR)
+
+FEATURES = ['num_25', 'num_50', 'num_75', 'num_985', 'num_100', 'num_unq', 'total_secs']
+
+
+def run_strings(tmp):
+    import pandas as pd
+
+    train_msnos = set(pd.read_csv(os.path.join(tmp, "train.csv"))['msno'])
+    df = pd.read_csv(os.path.join(tmp, "user_logs_v2.csv"))
+    df = df[df['msno'].isin(train_msnos)]
+    df = df.sort_values(by=['msno', 'date'])
+    return df['msno'].to_numpy(), df[FEATURES].to_numpy(), None
+
+
+def run_codes(tmp):
+    from msno_codec import CODE_COL, MsnoCodec
+
+    codec = MsnoCodec.load(os.path.join(tmp, "msno_codebook.npz"))
+    df = codec.read_csv(os.path.join(tmp, "user_logs_v2.csv"), only_train=True)
+    df = df.sort_values(by=[CODE_COL, 'date'])
+    return df[CODE_COL].to_numpy(), df[FEATURES].to_numpy(), codec
+
+
+def child(mode, tmp):
+    start = time.perf_counter()
+    keys, values, codec = (run_strings if mode == "strings" else run_codes)(tmp)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    # Decoding is only for the comparison; step 23 never turns codes back into strings
+    if codec is not None:
+        keys = codec.decode(keys)
+    digest = hashlib.md5("\n".join(keys).encode() + values.tobytes()).hexdigest()
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_mb, "rows": len(keys), "digest": digest}))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3])
+        sys.exit(0)
+
+    import numpy as np
+    import pandas as pd
+
+    from msno_codec import MsnoCodec
+
+    N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000_000
+    N_USERS = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    N_TRAIN = int(sys.argv[3]) if len(sys.argv) > 3 else 250_000
+
+    rng = np.random.default_rng(42)
+    alphabet = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"))
+    msnos = np.array(["".join(chars) + "=" for chars in alphabet[rng.integers(0, 64, (N_USERS, 43))]], dtype=object)
+    df = pd.DataFrame({
+        'msno': msnos[rng.integers(0, N_USERS, N_ROWS)],
+        'date': 20170301 + rng.integers(0, 31, N_ROWS),
+    })
+    for col in FEATURES[:-1]:
+        df[col] = rng.poisson(5, N_ROWS)
+    df['total_secs'] = rng.gamma(2.0, 3000.0, N_ROWS)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        df.to_csv(os.path.join(tmp, "user_logs_v2.csv"), index=False)
+        del df
+        pd.DataFrame({'msno': msnos[:N_TRAIN]}).to_csv(os.path.join(tmp, "train.csv"), index=False)
+        MsnoCodec.build(msnos[:N_TRAIN], msnos).save(os.path.join(tmp, "msno_codebook.npz"))
+        print(f"{N_ROWS} rows, {N_USERS} users, {N_TRAIN} train users")
+
+        digests = {}
+        for mode in ("strings", "codes"):
+            result = subprocess.run([sys.executable, __file__, "--child", mode, tmp],
+                                    capture_output=True, text=True, check=True)
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            digests[mode] = stats["digest"]
+            print(f"{mode:>8}: {stats['seconds']:7.2f} s | {N_ROWS / stats['seconds']:10.0f} rows/s | "
+                  f"peak RSS {stats['peak_mb']:7.1f} MB | {stats['rows']} rows kept")
+
+        print(f"Outputs identical: {digests['strings'] == digests['codes']}")
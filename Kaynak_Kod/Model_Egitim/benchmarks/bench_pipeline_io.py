@@ -0,0 +1,130 @@
+"""End-to-end wall time of the data preparation stages (00 -> 24_v4) with the
+intermediate tables stored as CSV vs. the binary formats of pipeline_io, on a
+synthetic KKBox dataset. Every stage runs as its own process with
+CHURN_PIPELINE_FORMAT set, in a fresh working directory per format; the final
+model_ready_v4_advanced table is compared across formats.
+
+Parquet/Feather are included only when pyarrow is installed.
+
+Usage: python benchmarks/bench_pipeline_io.py [n_train] [n_log_rows]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MODEL_DIR)
+
+import numpy as np
+import pandas as pd
+
+STAGES = [
+    '00_build_msno_codebook.py',
+    '01_merge_train_members.py',
+    '02_aggregate_transactions.py',
+    '03_merge_transactions_agg.py',
+    '11_aggregate_user_logs_filtered.py',
+    '05_merge_user_logs_agg_v2.py',
+    '06_data_cleaning_feature_eng.py',
+    '14_create_reduced_dataset_v2.py',
+    '24_v4_advanced_features.py',
+]
+
+
+def make_dataset(data_dir, n_train, n_log_rows, rng):
+    alphabet = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"))
+    n_users = n_train * 3
+    msnos = np.array(["".join(chars) + "=" for chars in alphabet[rng.integers(0, 64, (n_users, 43))]], dtype=object)
+    dates = pd.date_range('2015-01-01', '2017-03-31')
+    ymd = dates.strftime('%Y%m%d').astype(int).to_numpy()
+    march = ymd[-31:]
+
+    pd.DataFrame({'msno': msnos[:n_train], 'is_churn': rng.integers(0, 2, n_train)}).to_csv(
+        os.path.join(data_dir, 'train.csv'), index=False)
+
+    members = msnos[n_train // 2:2 * n_train]
+    n = len(members)
+    pd.DataFrame({
+        'msno': members,
+        'city': rng.integers(1, 23, n),
+        'bd': np.where(rng.random(n) < 0.3, 0, rng.integers(15, 60, n)),
+        'gender': rng.choice(np.array(['male', 'female', None], dtype=object), n),
+        'registered_via': rng.choice([3, 4, 7, 9, 13], n),
+        'registration_init_time': rng.choice(ymd, n),
+    }).to_csv(os.path.join(data_dir, 'members_v3.csv'), index=False)
+
+    n = n_log_rows // 2
+    price = rng.choice([99, 129, 149, 180], n)
+    pd.DataFrame({
+        'msno': msnos[rng.integers(0, n_users, n)],
+        'payment_method_id': rng.integers(20, 42, n),
+        'payment_plan_days': rng.choice([30, 7, 90], n),
+        'plan_list_price': price,
+        'actual_amount_paid': price - rng.choice([0, 0, 0, 20], n),
+        'is_auto_renew': rng.integers(0, 2, n),
+        'transaction_date': rng.choice(ymd, n),
+        'membership_expire_date': rng.choice(ymd, n) + 10000,
+        'is_cancel': (rng.random(n) < 0.05).astype(int),
+    }).to_csv(os.path.join(data_dir, 'transactions.csv'), index=False)
+
+    def user_logs(n_rows, log_dates):
+        df = pd.DataFrame({'msno': msnos[rng.integers(0, n_users, n_rows)], 'date': rng.choice(log_dates, n_rows)})
+        for col in ['num_25', 'num_50', 'num_75', 'num_985', 'num_100', 'num_unq']:
+            df[col] = rng.poisson(5, n_rows)
+        df['total_secs'] = rng.gamma(2.0, 3000.0, n_rows)
+        return df
+
+    user_logs(n_log_rows, ymd[-400:]).to_csv(os.path.join(data_dir, 'user_logs.csv'), index=False)
+    v2_dir = os.path.join(data_dir, 'data 4', 'churn_comp_refresh')
+    os.makedirs(v2_dir)
+    user_logs(n_log_rows // 2, march).to_csv(os.path.join(v2_dir, 'user_logs_v2.csv'), index=False)
+
+
+def run_pipeline(work_dir, data_dir, fmt):
+    os.makedirs(work_dir)
+    os.symlink(data_dir, os.path.join(work_dir, 'kkbox-churn-prediction-challenge'))
+    env = dict(os.environ, CHURN_PIPELINE_FORMAT=fmt)
+    timings = []
+    for stage in STAGES:
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, os.path.join(MODEL_DIR, stage)], cwd=work_dir, env=env,
+                                capture_output=True, text=True, check=True)
+        timings.append(time.perf_counter() - start)
+        if 'Hata' in result.stdout or 'hata oluştu' in result.stdout:
+            raise RuntimeError(f"{stage} ({fmt}) başarısız:\n{result.stdout[-2000:]}")
+    return timings
+
+
+if __name__ == "__main__":
+    import pipeline_io
+
+    N_TRAIN = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    N_LOG_ROWS = int(sys.argv[2]) if len(sys.argv) > 2 else 4_000_000
+    formats = ['csv', 'npy'] + (['parquet', 'feather'] if pipeline_io.pyarrow is not None else [])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, 'data')
+        os.makedirs(data_dir)
+        make_dataset(data_dir, N_TRAIN, N_LOG_ROWS, np.random.default_rng(42))
+        print(f"{N_TRAIN} train users, {N_LOG_ROWS} user_logs rows; formats: {', '.join(formats)}")
+
+        results, finals = {}, {}
+        for fmt in formats:
+            work_dir = os.path.join(tmp, fmt)
+            results[fmt] = run_pipeline(work_dir, data_dir, fmt)
+            finals[fmt] = pipeline_io.read_table(pipeline_io.table_path(work_dir, 'model_ready_v4_advanced', fmt))
+
+        print(f"\n{'stage':<38}" + "".join(f"{fmt:>10}" for fmt in formats))
+        for i, stage in enumerate(STAGES):
+            print(f"{stage:<38}" + "".join(f"{results[fmt][i]:9.2f}s" for fmt in formats))
+        print(f"{'total':<38}" + "".join(f"{sum(results[fmt]):9.2f}s" for fmt in formats))
+
+        base = finals['csv']
+        for fmt in formats[1:]:
+            other = finals[fmt]
+            same_columns = list(other.columns) == list(base.columns)
+            max_diff = float(np.nanmax(np.abs(other.to_numpy(dtype=float) - base.to_numpy(dtype=float))))
+            print(f"{fmt} vs csv: same columns {same_columns}, dtypes {dict(other.dtypes.value_counts())}, "
+                  f"max abs diff {max_diff:.3g}")
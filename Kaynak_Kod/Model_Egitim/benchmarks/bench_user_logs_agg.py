@@ -0,0 +1,117 @@
+"""Rows/s and peak RSS of the user_logs aggregation: the old iterrows + nested dict
+accumulator vs. UserLogAggregator, on a synthetic user_logs.csv. Each variant runs
+in its own process; the two output CSVs are compared byte for byte.
+
+Usage: python benchmarks/bench_user_logs_agg.py [n_rows] [n_users] [chunk_size]
+"""
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MODEL_DIR)
+
+
+def run_legacy(logs_path, output_path, chunk_size):
+    # 11_aggregate_user_logs_v2.py before the vectorized engine
+    import numpy as np
+    import pandas as pd
+
+    log_cols = ['num_25', 'num_50', 'num_75', 'num_985', 'num_100', 'num_unq', 'total_secs']
+    user_sums, user_counts, user_min_vals, user_max_vals = {}, {}, {}, {}
+    for chunk in pd.read_csv(logs_path, chunksize=chunk_size):
+        chunk.loc[chunk['total_secs'] < 0, 'total_secs'] = 0
+        chunk_agg = chunk.groupby('msno')[log_cols].agg(['sum', 'count', 'min', 'max'])
+        chunk_agg.columns = ['_'.join(col).strip() for col in chunk_agg.columns.values]
+        for msno, row in chunk_agg.iterrows():
+            if msno not in user_sums:
+                user_sums[msno] = {col: 0 for col in log_cols}
+                user_counts[msno] = {col: 0 for col in log_cols}
+                user_min_vals[msno] = {col: np.inf for col in log_cols}
+                user_max_vals[msno] = {col: -np.inf for col in log_cols}
+            for col in log_cols:
+                user_sums[msno][col] += row[f'{col}_sum']
+                user_counts[msno][col] += row[f'{col}_count']
+                user_min_vals[msno][col] = min(user_min_vals[msno][col], row[f'{col}_min'])
+                user_max_vals[msno][col] = max(user_max_vals[msno][col], row[f'{col}_max'])
+
+    final_data = []
+    for msno in user_sums:
+        row_data = {'msno': msno}
+        for col in log_cols:
+            total_sum = user_sums[msno][col]
+            total_count = user_counts[msno][col]
+            row_data[f'{col}_sum'] = total_sum
+            row_data[f'{col}_count'] = total_count
+            row_data[f'{col}_mean'] = total_sum / total_count if total_count > 0 else 0
+            row_data[f'{col}_min'] = user_min_vals[msno][col] if user_min_vals[msno][col] != np.inf else 0
+            row_data[f'{col}_max'] = user_max_vals[msno][col] if user_max_vals[msno][col] != -np.inf else 0
+        final_data.append(row_data)
+    pd.DataFrame(final_data).set_index('msno').to_csv(output_path)
+
+
+def run_vectorized(logs_path, output_path, chunk_size):
+    import pandas as pd
+    from user_logs_agg import UserLogAggregator
+
+    aggregator = UserLogAggregator()
+    for chunk in pd.read_csv(logs_path, chunksize=chunk_size):
+        chunk.loc[chunk['total_secs'] < 0, 'total_secs'] = 0
+        aggregator.add_chunk(chunk)
+    aggregator.to_frame().to_csv(output_path)
+
+
+def child(mode, logs_path, output_path, chunk_size):
+    start = time.perf_counter()
+    (run_legacy if mode == "legacy" else run_vectorized)(logs_path, output_path, chunk_size)
+    elapsed = time.perf_counter() - start
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(json.dumps({"seconds": elapsed, "peak_mb": peak_mb}))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(sys.argv[2], sys.argv[3], sys.argv[4], int(sys.argv[5]))
+        sys.exit(0)
+
+    import numpy as np
+    import pandas as pd
+
+    N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000_000
+    N_USERS = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    CHUNK_SIZE = int(sys.argv[3]) if len(sys.argv) > 3 else 500_000
+
+    rng = np.random.default_rng(42)
+    alphabet = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"))
+    msnos = np.array(["".join(chars) + "=" for chars in alphabet[rng.integers(0, 64, (N_USERS, 43))]], dtype=object)
+    df = pd.DataFrame({
+        'msno': msnos[rng.integers(0, N_USERS, N_ROWS)],
+        'date': 20170301 + rng.integers(0, 28, N_ROWS),
+    })
+    for col in ['num_25', 'num_50', 'num_75', 'num_985', 'num_100', 'num_unq']:
+        df[col] = rng.poisson(5, N_ROWS)
+    # Occasional negative total_secs like in the real data (clipped to 0 by the scripts)
+    df['total_secs'] = rng.gamma(2.0, 3000.0, N_ROWS) * np.where(rng.random(N_ROWS) < 0.001, -1e12, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        logs_path = os.path.join(tmp, "user_logs.csv")
+        df.to_csv(logs_path, index=False)
+        del df
+        print(f"{N_ROWS} rows, {N_USERS} users, chunk size {CHUNK_SIZE}")
+
+        outputs = {}
+        for mode in ("legacy", "vectorized"):
+            outputs[mode] = os.path.join(tmp, f"{mode}.csv")
+            result = subprocess.run([sys.executable, __file__, "--child", mode, logs_path, outputs[mode], str(CHUNK_SIZE)],
+                                    capture_output=True, text=True, check=True)
+            stats = json.loads(result.stdout.strip().splitlines()[-1])
+            print(f"{mode:>10}: {stats['seconds']:7.2f} s | {N_ROWS / stats['seconds']:10.0f} rows/s | "
+                  f"peak RSS {stats['peak_mb']:7.1f} MB")
+
+        with open(outputs["legacy"], 'rb') as f_old, open(outputs["vectorized"], 'rb') as f_new:
+            identical = f_old.read() == f_new.read()
+        print(f"Outputs identical: {identical}")
@@ -0,0 +1,87 @@
+"""Wall time of 04_aggregate_user_logs.py and 11_aggregate_user_logs_v2.py with
+--workers 0 (serial chunk loop) vs. --workers N (map_partitions) on a synthetic
+user_logs.csv, plus a byte-for-byte comparison of every parallel output with the
+serial one. The msno codebook covers 80% of the users, so rows of unknown users
+are dropped as in the real data. Each run is a separate process with
+CHURN_PIPELINE_FORMAT=csv; the benchmark exits with an error if any output differs.
+
+Usage: python benchmarks/bench_user_logs_mapreduce.py [n_rows] [n_users] [chunk_size] [workers,...]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MODEL_DIR)
+
+import numpy as np
+import pandas as pd
+
+SCRIPTS = {
+    '04_aggregate_user_logs.py': 'user_logs_aggregated.csv',
+    '11_aggregate_user_logs_v2.py': 'user_logs_aggregated_v2.csv',
+}
+
+
+def run_script(work_dir, script, output_name, workers, chunk_size):
+    env = dict(os.environ, CHURN_PIPELINE_FORMAT='csv')
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, os.path.join(MODEL_DIR, script),
+                             '--workers', str(workers), '--chunk-size', str(chunk_size)],
+                            cwd=work_dir, env=env, capture_output=True, text=True, check=True)
+    elapsed = time.perf_counter() - start
+    if 'Hata' in result.stdout or 'hata oluştu' in result.stdout:
+        raise RuntimeError(f"{script} --workers {workers} başarısız:\n{result.stdout[-2000:]}")
+    with open(os.path.join(work_dir, output_name), 'rb') as f:
+        return elapsed, f.read()
+
+
+if __name__ == "__main__":
+    from msno_codec import CODEBOOK_FILE, MsnoCodec
+    from user_logs_agg import plan_partitions
+
+    N_ROWS = int(sys.argv[1]) if len(sys.argv) > 1 else 4_000_000
+    N_USERS = int(sys.argv[2]) if len(sys.argv) > 2 else 200_000
+    CHUNK_SIZE = int(sys.argv[3]) if len(sys.argv) > 3 else 500_000
+    WORKERS = [int(w) for w in sys.argv[4].split(",")] if len(sys.argv) > 4 else [1, 2, 4]
+
+    rng = np.random.default_rng(42)
+    alphabet = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"))
+    msnos = np.array(["".join(chars) + "=" for chars in alphabet[rng.integers(0, 64, (N_USERS, 43))]], dtype=object)
+    df = pd.DataFrame({
+        'msno': msnos[rng.integers(0, N_USERS, N_ROWS)],
+        'date': 20170301 + rng.integers(0, 28, N_ROWS),
+    })
+    for col in ['num_25', 'num_50', 'num_75', 'num_985', 'num_100', 'num_unq']:
+        df[col] = rng.poisson(5, N_ROWS)
+    df['total_secs'] = rng.gamma(2.0, 3000.0, N_ROWS) * np.where(rng.random(N_ROWS) < 0.001, -1e12, 1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = os.path.join(tmp, 'kkbox-churn-prediction-challenge')
+        os.makedirs(data_dir)
+        logs_path = os.path.join(data_dir, 'user_logs.csv')
+        df.to_csv(logs_path, index=False)
+        del df
+        known = msnos[:N_USERS * 4 // 5]
+        MsnoCodec.build(known[:len(known) // 2], known).save(os.path.join(tmp, CODEBOOK_FILE))
+        _, partitions = plan_partitions(logs_path, CHUNK_SIZE)
+        print(f"{N_ROWS} rows, {N_USERS} users, {len(partitions)} chunks of {CHUNK_SIZE} rows, "
+              f"{os.cpu_count()} CPUs")
+
+        mismatches = []
+        for script, output_name in SCRIPTS.items():
+            print(f"\n{script}")
+            base_seconds, reference = run_script(tmp, script, output_name, 0, CHUNK_SIZE)
+            print(f"workers=  0: {base_seconds:7.2f} s | {N_ROWS / base_seconds:10.0f} rows/s | serial reference")
+            for workers in WORKERS:
+                elapsed, output = run_script(tmp, script, output_name, workers, CHUNK_SIZE)
+                identical = output == reference
+                if not identical:
+                    mismatches.append((script, workers))
+                print(f"workers={workers:>3}: {elapsed:7.2f} s | {N_ROWS / elapsed:10.0f} rows/s | "
+                      f"speedup {base_seconds / elapsed:5.2f}x | identical to --workers 0: {identical}")
+
+        if mismatches:
+            sys.exit(f"Outputs differ from --workers 0: {mismatches}")
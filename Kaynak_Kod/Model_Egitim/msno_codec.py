@@ -0,0 +1,93 @@
+# msno_codec.py
+# Tüm adımların ortak msno -> int32 kod sözlüğü (00_build_msno_codebook.py üretir).
+# Anahtarlar sıralı tutulur; böylece kod sırası msno'nun alfabetik sırasıyla aynıdır ve
+# kodlara göre sıralama/gruplama eski string tabanlı çıktıların satır sırasını korur.
+# Sözlükte olmayan msno'lar (train/members dışındaki kullanıcılar) UNKNOWN kodunu alır.
+import os
+
+import numpy as np
+import pandas as pd
+
+CODEBOOK_FILE = 'msno_codebook.npz'
+CODE_COL = 'msno_code'
+UNKNOWN = -1
+READ_CHUNK_SIZE = 1_000_000
+
+
+class MsnoCodec:
+    """Sıralı msno anahtarları ve kod başına "train.csv'de var mı" bayrağı.
+
+    ``encode`` bir kez kurulan pandas hash indeksini (get_indexer) kullanır; büyük
+    dosyalarda ``read_csv`` msno sütununu parça parça int32 koda çevirir, böylece
+    bellekte 44 karakterlik Python string'leri hiç birikmez.
+    """
+
+    def __init__(self, keys, in_train):
+        if len(keys) >= np.iinfo(np.int32).max:
+            raise ValueError(f"msno sayısı int32 kod aralığını aşıyor: {len(keys)}")
+        self.keys = keys
+        self.in_train = in_train
+        self._index = None
+
+    @classmethod
+    def build(cls, train_msnos, member_msnos):
+        """train ve members msno'larının birleşiminden sözlüğü kurar."""
+        train_msnos = pd.Series(train_msnos).dropna().astype(str).to_numpy()
+        member_msnos = pd.Series(member_msnos).dropna().astype(str).to_numpy()
+        keys = np.unique(np.concatenate([train_msnos, member_msnos]).astype('S'))
+        in_train = np.zeros(len(keys), dtype=bool)
+        in_train[np.searchsorted(keys, np.unique(train_msnos.astype('S')))] = True
+        return cls(keys, in_train)
+
+    @classmethod
+    def load(cls, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(2, "msno sözlüğü yok; önce 00_build_msno_codebook.py çalıştırın", path)
+        with np.load(path) as data:
+            return cls(data['keys'], data['in_train'])
+
+    def save(self, path):
+        np.savez(path, keys=self.keys, in_train=self.in_train)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def index(self):
+        # Hash tablosu ilk kullanımda bir kez kurulur ve tüm encode çağrılarında paylaşılır
+        if self._index is None:
+            self._index = pd.Index(self.keys.astype(str).astype(object))
+        return self._index
+
+    def encode(self, msnos):
+        """msno değerlerini int32 kodlara çevirir; bilinmeyenler UNKNOWN olur."""
+        return self.index.get_indexer(msnos).astype(np.int32)
+
+    def decode(self, codes):
+        """Kodları msno string'lerine (object dizisi) geri çevirir."""
+        return self.keys[np.asarray(codes)].astype(str).astype(object)
+
+    def train_mask(self, codes):
+        """Kodu train.csv'deki bir kullanıcıya ait olan satırlar için True."""
+        codes = np.asarray(codes)
+        return (codes != UNKNOWN) & self.in_train[np.where(codes == UNKNOWN, 0, codes)]
+
+    def read_csv(self, path, only_train=False, chunksize=READ_CHUNK_SIZE, **kwargs):
+        """CSV'yi parça parça okur; msno sütunu yerine int32 ``msno_code`` sütunu döner.
+
+        Sözlükte olmayan satırlar atılır; ``only_train`` ile yalnızca train.csv
+        kullanıcıları tutulur. Sütun sırası korunur (msno'nun yerinde msno_code).
+        """
+        parts = []
+        for chunk in pd.read_csv(path, chunksize=chunksize, **kwargs):
+            codes = self.encode(chunk['msno'])
+            keep = self.train_mask(codes) if only_train else codes != UNKNOWN
+            chunk = chunk[keep]
+            chunk.insert(chunk.columns.get_loc('msno'), CODE_COL, codes[keep])
+            parts.append(chunk.drop(columns='msno'))
+        return pd.concat(parts, ignore_index=True)
+
+
+def load_codebook(current_dir):
+    """Çalışma dizinindeki msno sözlüğünü yükler."""
+    return MsnoCodec.load(os.path.join(current_dir, CODEBOOK_FILE))
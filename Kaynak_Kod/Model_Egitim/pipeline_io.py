@@ -0,0 +1,205 @@
+# pipeline_io.py
+# Adımlar arasında aktarılan ara tabloların (train_member_merged, model_ready_dataset, ...)
+# ortak okuma/yazma katmanı. Tablolar CSV yerine tür bilgisini koruyan ikili kolon
+# formatlarında yazılır ve okunurken yalnızca istenen sütunlar yüklenebilir.
+#
+# Formatlar (CHURN_PIPELINE_FORMAT):
+#   parquet : varsayılan; pyarrow gerekir (Model_Egitim/requirements.txt içinde)
+#   feather : pyarrow ile; okuması daha hızlı, sıkıştırması parquet'ten zayıf
+#   npy     : isteğe bağlı, pyarrow'suz ortamlar için; sütun başına bir .npy + schema.json içeren klasör
+#   csv     : isteğe bağlı, eski davranış
+# CHURN_PIPELINE_EXPORT_CSV=1 ise her tablonun bir CSV kopyası da yazılır.
+# Ham KKBox dosyaları ve Backend'in okuduğu model_ready_lite_sample.csv CSV olarak kalır.
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+EXTENSIONS = {'parquet': '.parquet', 'feather': '.feather', 'npy': '.cols', 'csv': '.csv'}
+SCHEMA_NAME = 'schema.json'
+SCHEMA_VERSION = 1
+
+# Varsayılan, kurulu paketlerden bağımsızdır (pyarrow yoksa sessizce başka formata geçilmez, hata
+# verilir); aynı ortam değişkenleriyle her makinede aynı dosyalar yazılır
+PIPELINE_FORMAT = os.environ.get('CHURN_PIPELINE_FORMAT', 'parquet')
+EXPORT_CSV = os.environ.get('CHURN_PIPELINE_EXPORT_CSV', '0') == '1'
+
+if PIPELINE_FORMAT not in EXTENSIONS:
+    raise ValueError(f"CHURN_PIPELINE_FORMAT geçersiz: {PIPELINE_FORMAT!r} (seçenekler: {', '.join(EXTENSIONS)})")
+if PIPELINE_FORMAT in ('parquet', 'feather') and pyarrow is None:
+    raise ImportError(f"CHURN_PIPELINE_FORMAT={PIPELINE_FORMAT} için pyarrow gerekli "
+                      f"(pip install -r requirements.txt) ya da CHURN_PIPELINE_FORMAT=npy/csv seçin")
+
+
+def table_path(current_dir, name, fmt=None):
+    """``name`` tablosunun seçili (ya da verilen) formattaki dosya yolu."""
+    return os.path.join(current_dir, name + EXTENSIONS[fmt or PIPELINE_FORMAT])
+
+
+def _format_of(path):
+    ext = os.path.splitext(path)[1]
+    for fmt, fmt_ext in EXTENSIONS.items():
+        if ext == fmt_ext:
+            return fmt
+    raise ValueError(f"Tanınmayan tablo uzantısı: {path}")
+
+
+def _resolve(path):
+    # Yalnızca istenen formattaki tablo okunur; başka formatta aynı adlı bir tablo (örn. eski
+    # bir çalıştırmadan kalan CSV) sessizce yüklenmez, hata mesajında belirtilir
+    if os.path.exists(path):
+        return path
+    stem = os.path.splitext(path)[0]
+    others = [stem + ext for ext in EXTENSIONS.values() if stem + ext != path and os.path.exists(stem + ext)]
+    message = "Tablo bulunamadı"
+    if others:
+        formats = ', '.join(_format_of(other) for other in others)
+        message += f" (başka formatta var: {formats}; CHURN_PIPELINE_FORMAT ile seçin ya da adımı yeniden çalıştırın)"
+    raise FileNotFoundError(2, message, path)
+
+
+def _write_npy(df, path):
+    # Sayısal, bool ve datetime sütunları olduğu gibi; metin/kategori sütunları
+    # (kodlar int32, -1 = NaN) + kategori dizisi olarak saklanır
+    os.makedirs(path)
+    schema = {'version': SCHEMA_VERSION, 'n_rows': len(df), 'columns': []}
+    for i, (name, col) in enumerate(df.items()):
+        entry = {'name': name, 'file': f'{i}.npy', 'dtype': str(col.dtype)}
+        if isinstance(col.dtype, pd.CategoricalDtype):
+            codes, categories = col.cat.codes.to_numpy(), col.cat.categories
+            entry['kind'] = 'category'
+        elif col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            codes, categories = pd.factorize(col, use_na_sentinel=True)
+            entry['kind'] = 'str'
+        elif isinstance(col.dtype, np.dtype):
+            np.save(os.path.join(path, entry['file']), col.to_numpy())
+            entry['kind'] = 'array'
+            schema['columns'].append(entry)
+            continue
+        else:
+            raise TypeError(f"npy formatında desteklenmeyen sütun türü: {name} ({col.dtype})")
+
+        if not all(isinstance(v, str) for v in categories):
+            raise TypeError(f"npy formatında metin sütunu yalnızca str içerebilir: {name}")
+        entry['categories'] = f'{i}.categories.npy'
+        np.save(os.path.join(path, entry['file']), codes.astype(np.int32))
+        np.save(os.path.join(path, entry['categories']), np.asarray(categories, dtype=str))
+        schema['columns'].append(entry)
+
+    with open(os.path.join(path, SCHEMA_NAME), 'w') as f:
+        json.dump(schema, f, indent=1)
+
+
+def _read_schema(path):
+    with open(os.path.join(path, SCHEMA_NAME)) as f:
+        schema = json.load(f)
+    if schema.get('version') != SCHEMA_VERSION:
+        raise ValueError(f"Desteklenmeyen tablo şema sürümü: {schema.get('version')} ({path})")
+    return schema
+
+
+def _read_npy(path, columns):
+    schema = _read_schema(path)
+    entries = {entry['name']: entry for entry in schema['columns']}
+    names = list(entries) if columns is None else list(columns)
+    missing = [name for name in names if name not in entries]
+    if missing:
+        raise KeyError(f"Tabloda olmayan sütunlar: {missing} ({path})")
+
+    data = {}
+    for name in names:
+        entry = entries[name]
+        values = np.load(os.path.join(path, entry['file']))
+        if entry['kind'] == 'array':
+            data[name] = values
+            continue
+        categories = np.load(os.path.join(path, entry['categories'])).astype(object)
+        if entry['kind'] == 'category':
+            data[name] = pd.Categorical.from_codes(values, categories=categories)
+        else:
+            column = categories[np.where(values < 0, 0, values)] if len(categories) else np.empty(len(values), object)
+            column[values < 0] = np.nan
+            data[name] = column
+    return pd.DataFrame(data, index=pd.RangeIndex(schema['n_rows']))
+
+
+def _arrow_schema(df):
+    # Şema pandas türlerinden açıkça kurulur; metin (object) sütunları, değerleri tümüyle
+    # NaN olsa bile her çalıştırmada string olarak yazılır (pyarrow'un çıkarımına bırakılmaz)
+    schema = pyarrow.Schema.from_pandas(df, preserve_index=False)
+    for i, (name, col) in enumerate(df.items()):
+        if col.dtype == object or pd.api.types.is_string_dtype(col.dtype):
+            schema = schema.set(i, pyarrow.field(name, pyarrow.string()))
+    return schema
+
+
+def write_table(df, path, index=False):
+    """``df``'yi yolun uzantısındaki formatta atomik olarak yazar; yazılan yolu döndürür.
+
+    ``index=True`` ise indeks (örn. msno) sıradan bir sütun olarak yazılır; okunurken de
+    sütun olarak gelir (indeksli yazılıp index_col'suz okunan eski CSV'lerle aynı).
+    """
+    fmt = _format_of(path)
+    df = df.reset_index() if index else df.reset_index(drop=True)
+    tmp_path = path + '.tmp'
+    if os.path.isdir(tmp_path):
+        shutil.rmtree(tmp_path)
+
+    if fmt in ('parquet', 'feather'):
+        table = pyarrow.Table.from_pandas(df, schema=_arrow_schema(df), preserve_index=False)
+        if fmt == 'parquet':
+            import pyarrow.parquet as pq
+            pq.write_table(table, tmp_path)
+        else:
+            import pyarrow.feather as pf
+            pf.write_feather(table, tmp_path)
+    elif fmt == 'npy':
+        _write_npy(df, tmp_path)
+    else:
+        df.to_csv(tmp_path, index=False)
+
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    os.replace(tmp_path, path)
+
+    if EXPORT_CSV and fmt != 'csv':
+        write_table(df, os.path.splitext(path)[0] + EXTENSIONS['csv'])
+    return path
+
+
+def read_table(path, columns=None):
+    """Tabloyu okur; ``columns`` verilirse yalnızca o sütunlar (bu sırayla) yüklenir."""
+    path = _resolve(path)
+    fmt = _format_of(path)
+    columns = None if columns is None else list(columns)
+
+    if fmt == 'parquet':
+        return pd.read_parquet(path, engine='pyarrow', columns=columns)
+    if fmt == 'feather':
+        return pd.read_feather(path, columns=columns)
+    if fmt == 'npy':
+        return _read_npy(path, columns)
+    df = pd.read_csv(path, usecols=columns)
+    return df if columns is None else df[columns]
+
+
+def table_columns(path):
+    """Veriyi okumadan tablonun sütun adlarını döndürür."""
+    path = _resolve(path)
+    fmt = _format_of(path)
+    if fmt == 'parquet':
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(path).names)
+    if fmt == 'feather':
+        import pyarrow.feather as pf
+        return list(pf.read_table(path, memory_map=True).schema.names)
+    if fmt == 'npy':
+        return [entry['name'] for entry in _read_schema(path)['columns']]
+    return list(pd.read_csv(path, nrows=0).columns)
@@ -0,0 +1,416 @@
+# run_pipeline.py
+# Numaralı betikleri bağımlılık grafiğine (DAG) göre çalıştıran artımlı çalıştırıcı.
+# Her adımın girdileri, çıktıları ve parametreleri aşağıda tanımlıdır; adımın parmak izi
+# betik + içe aktardığı yerel modüller + girdi dosyalarının içerik özetinden (sha256)
+# oluşur. Parmak izi değişmemiş ve çıktıları yerinde olan adımlar atlanır; birbirinden
+# bağımsız dallar (örn. transactions ve user_logs özetleri) paralel çalışır.
+#
+# Kullanım (veri klasöründe, yani kkbox-churn-prediction-challenge'ın bulunduğu dizinde):
+#   python run_pipeline.py                     # değişen adımları çalıştır
+#   python run_pipeline.py --from 24_v4_train  # yalnızca bu adım ve sonrası
+#   python run_pipeline.py --until 06 --dry-run
+import argparse
+import ast
+import concurrent.futures
+import dataclasses
+import hashlib
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+
+from pipeline_io import table_path
+
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+BACKEND_DIR = os.path.join(MODEL_DIR, '..', 'Backend')
+STATE_FILE = '.pipeline_state.json'
+LOG_DIR = 'pipeline_logs'
+STATE_VERSION = 1
+HASH_BLOCK = 8 << 20
+# Tüm adımların çıktısını etkileyen ortam değişkenleri (parmak izine girer)
+FINGERPRINT_ENV = ('CHURN_PIPELINE_FORMAT', 'CHURN_PIPELINE_EXPORT_CSV')
+DEFAULT_JOBS = 2
+
+
+@dataclasses.dataclass(frozen=True)
+class Stage:
+    """Bir DAG düğümü: sırayla çalışan betik(ler), girdi/çıktı yolları ve parametreler.
+
+    Birden fazla betik yalnızca bir betiğin önceki betiğin çıktısını yerinde değiştirdiği
+    durumda kullanılır (25 -> 26); böylece her dosyanın tek bir üreticisi olur.
+    ``output_exclude``, çıktı klasörlerinde adımın yazmadığı (örn. çalışma anında Backend'in
+    doldurduğu) alt klasörlerdir; çıktı özetine ve "yazıldı mı" kontrolüne girmez.
+    """
+    name: str
+    scripts: tuple
+    inputs: tuple
+    outputs: tuple
+    args: tuple = ()
+    module_dirs: tuple = ()
+    output_exclude: tuple = ()
+
+
+def build_stages(current_dir):
+    """Üretim zinciri (00 -> 27). Yollar ``current_dir``'e göredir."""
+    def raw(name):
+        return os.path.join('kkbox-churn-prediction-challenge', name)
+
+    def table(name):
+        return os.path.relpath(table_path(current_dir, name), current_dir)
+
+    train = raw('train.csv')
+    members = raw('members_v3.csv')
+    transactions = raw('transactions.csv')
+    user_logs = raw('user_logs.csv')
+    user_logs_v2 = raw(os.path.join('data 4', 'churn_comp_refresh', 'user_logs_v2.csv'))
+    codebook = 'msno_codebook.npz'
+
+    return [
+        Stage('00_build_msno_codebook', ('00_build_msno_codebook.py',),
+              (train, members), (codebook,)),
+        Stage('01_merge_train_members', ('01_merge_train_members.py',),
+              (train, members), (table('train_member_merged'),)),
+        Stage('02_aggregate_transactions', ('02_aggregate_transactions.py',),
+              (transactions, codebook), (table('transactions_aggregated'),)),
+        Stage('03_merge_transactions_agg', ('03_merge_transactions_agg.py',),
+              (table('train_member_merged'), table('transactions_aggregated'), codebook),
+              (table('train_members_transactions_merged'),)),
+        Stage('11_aggregate_user_logs_filtered', ('11_aggregate_user_logs_filtered.py',),
+              (user_logs, codebook), (table('user_logs_aggregated_v2'),)),
+        Stage('05_merge_user_logs_agg_v2', ('05_merge_user_logs_agg_v2.py',),
+              (table('train_members_transactions_merged'), table('user_logs_aggregated_v2'), codebook),
+              (table('final_train_dataset'),)),
+        Stage('06_data_cleaning_feature_eng', ('06_data_cleaning_feature_eng.py',),
+              (table('final_train_dataset'),), (table('model_ready_dataset'),)),
+        Stage('14_create_reduced_dataset_v2', ('14_create_reduced_dataset_v2.py',),
+              (table('model_ready_dataset'),), (table('model_ready_reduced_dataset_v2'),)),
+        Stage('24_v4_advanced_features', ('24_v4_advanced_features.py',),
+              (table('model_ready_reduced_dataset_v2'), train, transactions, user_logs_v2, codebook),
+              (table('model_ready_v4_advanced'),)),
+        Stage('24_v4_train_final_xgboost', ('24_v4_train_final_xgboost.py',),
+              (table('model_ready_v4_advanced'),),
+              ('xgboost_final_model.json', 'xgboost_final_v4_results.md')),
+        Stage('25_feature_selection_final', ('25_feature_selection_final.py', '26_enrich_demo_data.py'),
+              (table('model_ready_v4_advanced'), 'xgboost_final_model.json', train),
+              ('xgboost_final_model_lite.json', 'feature_list.json', 'model_ready_lite_sample.csv')),
+        Stage('27_export_serving_store', ('27_export_serving_store.py',),
+              ('model_ready_lite_sample.csv', 'feature_list.json'), ('serving_store',),
+              # scores/: Backend'in skor önbelleği (feature_store.SCORES_DIR), 27 yazmaz
+              module_dirs=(BACKEND_DIR,), output_exclude=('scores',)),
+    ]
+
+
+def local_modules(path, search_dirs, found=None):
+    """Betiğin (dolaylı olarak) içe aktardığı, ``search_dirs`` içindeki .py dosyaları."""
+    found = set() if found is None else found
+    with open(path, encoding='utf-8') as f:
+        tree = ast.parse(f.read(), filename=path)
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name.split('.')[0] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            names.add(node.module.split('.')[0])
+    for name in sorted(names):
+        for directory in search_dirs:
+            module_path = os.path.normpath(os.path.join(directory, name + '.py'))
+            if os.path.exists(module_path) and module_path not in found:
+                found.add(module_path)
+                local_modules(module_path, search_dirs, found)
+                break
+    return found
+
+
+class ContentHasher:
+    """Dosya/klasör içerik özeti; (boyut, mtime) değişmedikçe önceki özet yeniden kullanılır.
+
+    Ham KKBox dosyaları onlarca GB olduğundan her çalıştırmada yeniden okunmaz.
+    """
+
+    def __init__(self, cache):
+        self.cache = cache
+        self.lock = threading.Lock()
+
+    def _file(self, path):
+        st = os.stat(path)
+        key = os.path.abspath(path)
+        with self.lock:
+            entry = self.cache.get(key)
+        if entry and entry['size'] == st.st_size and entry['mtime_ns'] == st.st_mtime_ns:
+            return entry['hash']
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK), b''):
+                digest.update(block)
+        with self.lock:
+            self.cache[key] = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'hash': digest.hexdigest()}
+        return digest.hexdigest()
+
+    def hash(self, path, exclude=()):
+        """Dosya için içerik özeti; klasör için (göreli yol, özet) listesinin özeti. Yoksa None.
+
+        ``exclude`` içindeki (``path``'e göre göreli) alt klasörler özete girmez.
+        """
+        if os.path.isfile(path):
+            return self._file(path)
+        if not os.path.isdir(path):
+            return None
+        digest = hashlib.sha256()
+        for root, files in walk_files(path, exclude):
+            for name in files:
+                file_path = os.path.join(root, name)
+                digest.update(f"{os.path.relpath(file_path, path)}\0{self._file(file_path)}\n".encode())
+        return digest.hexdigest()
+
+
+def walk_files(path, exclude=()):
+    """Klasördeki (kök, sıralı dosya adları) çiftleri; ``exclude`` alt klasörlerine inilmez."""
+    for root, dirs, files in os.walk(path):
+        dirs[:] = sorted(d for d in dirs if os.path.relpath(os.path.join(root, d), path) not in exclude)
+        yield root, sorted(files)
+
+
+def latest_mtime_ns(path, exclude=()):
+    if os.path.isfile(path):
+        return os.stat(path).st_mtime_ns
+    latest = os.stat(path).st_mtime_ns
+    for root, files in walk_files(path, exclude):
+        for name in files:
+            latest = max(latest, os.stat(os.path.join(root, name)).st_mtime_ns)
+    return latest
+
+
+class PipelineRunner:
+    def __init__(self, current_dir, stages, jobs=DEFAULT_JOBS, force=False):
+        self.current_dir = current_dir
+        self.stages = stages
+        self.jobs = max(1, jobs)
+        self.force = force
+        self.state_path = os.path.join(current_dir, STATE_FILE)
+        self.state = self._load_state()
+        self.hasher = ContentHasher(self.state['hashes'])
+        self.lock = threading.Lock()
+
+        self.producers = {}
+        for stage in stages:
+            for output in stage.outputs:
+                if output in self.producers:
+                    raise ValueError(f"'{output}' iki adım tarafından üretiliyor: {self.producers[output]}, {stage.name}")
+                self.producers[output] = stage.name
+        # Zamanlayıcı adımları tanım sırasıyla ele alır; bu sıra bağımlılıklarla tutarlı olmalı
+        order = {stage.name: i for i, stage in enumerate(stages)}
+        for stage in stages:
+            for rel_path in stage.inputs:
+                producer = self.producers.get(rel_path)
+                if producer is not None and order[producer] >= order[stage.name]:
+                    raise ValueError(f"{stage.name}, kendisinden sonra tanımlı {producer} adımının çıktısını kullanıyor")
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if state.get('version') == STATE_VERSION:
+                return state
+        return {'version': STATE_VERSION, 'stages': {}, 'hashes': {}}
+
+    def save_state(self):
+        # Yazma ve yer değiştirme de kilit altında: aynı anda biten iki aşama aynı
+        # .tmp dosyasına yazıp durum dosyasını bozmasın
+        with self.lock:
+            payload = json.dumps(self.state, indent=1, sort_keys=True)
+            tmp_path = self.state_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, self.state_path)
+
+    def _path(self, rel_path):
+        return os.path.join(self.current_dir, rel_path)
+
+    def fingerprint(self, stage):
+        """Betikler, yerel modüller, girdiler, argümanlar ve ortamın özeti; eksik girdi varsa None."""
+        scripts = [os.path.join(MODEL_DIR, script) for script in stage.scripts]
+        modules = set()
+        for script in scripts:
+            local_modules(script, (MODEL_DIR,) + stage.module_dirs, modules)
+
+        inputs = {}
+        for rel_path in stage.inputs:
+            inputs[rel_path] = self.hasher.hash(self._path(rel_path))
+            if inputs[rel_path] is None:
+                return None
+        payload = {
+            'scripts': {os.path.basename(path): self.hasher.hash(path) for path in scripts},
+            'modules': {os.path.relpath(path, MODEL_DIR): self.hasher.hash(path) for path in sorted(modules)},
+            'inputs': inputs,
+            'args': list(stage.args),
+            'env': {name: os.environ.get(name) for name in FINGERPRINT_ENV},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+    def up_to_date(self, stage, fingerprint):
+        with self.lock:
+            record = self.state['stages'].get(stage.name)
+        if self.force or record is None or record['fingerprint'] != fingerprint:
+            return False
+        # Çıktılar silinmiş ya da elle değiştirilmişse adım yeniden çalışır
+        return all(self.hasher.hash(self._path(rel_path), stage.output_exclude) == record['outputs'].get(rel_path)
+                   for rel_path in stage.outputs)
+
+    def run_stage(self, stage):
+        """Adımı gerekiyorsa çalıştırır; 'skipped', 'done' ya da hata mesajıyla 'failed' döner."""
+        fingerprint = self.fingerprint(stage)
+        if fingerprint is None:
+            missing = [p for p in stage.inputs if self.hasher.hash(self._path(p)) is None]
+            return 'failed', f"eksik girdi: {', '.join(missing)}"
+        if self.up_to_date(stage, fingerprint):
+            return 'skipped', None
+
+        log_dir = self._path(LOG_DIR)
+        os.makedirs(log_dir, exist_ok=True)
+        log_path = os.path.join(log_dir, f'{stage.name}.log')
+        start = time.time()
+        start_ns = time.time_ns()
+        with open(log_path, 'w') as log:
+            for script in stage.scripts:
+                result = subprocess.run([sys.executable, os.path.join(MODEL_DIR, script), *stage.args],
+                                        cwd=self.current_dir, stdout=log, stderr=subprocess.STDOUT)
+                if result.returncode != 0:
+                    return 'failed', f"{script} çıkış kodu {result.returncode} (log: {log_path})"
+
+        # Betikler hataları yakalayıp 0 ile çıktığı için başarı, tüm çıktıların bu
+        # çalıştırmada yazılmış olmasıyla anlaşılır
+        stale = [p for p in stage.outputs
+                 if not os.path.exists(self._path(p))
+                 or latest_mtime_ns(self._path(p), stage.output_exclude) < start_ns]
+        if stale:
+            return 'failed', f"çıktı yazılmadı: {', '.join(stale)} (log: {log_path})"
+
+        record = {
+            'fingerprint': fingerprint,
+            'outputs': {p: self.hasher.hash(self._path(p), stage.output_exclude) for p in stage.outputs},
+            'seconds': round(time.time() - start, 2),
+            'finished': time.strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        with self.lock:
+            self.state['stages'][stage.name] = record
+        self.save_state()
+        return 'done', None
+
+    def dependencies(self, stage, selected):
+        """Seçili adımlar içinde ``stage``'in girdilerini üreten adımlar."""
+        return {self.producers[p] for p in stage.inputs if self.producers.get(p) in selected}
+
+    def run(self, selected):
+        """Seçili adımları bağımlılık sırasıyla, en fazla ``jobs`` tanesi aynı anda çalıştırır."""
+        names = {stage.name for stage in selected}
+        deps = {stage.name: self.dependencies(stage, names) for stage in selected}
+        status = {}
+        pending = list(selected)
+        running = {}
+
+        with concurrent.futures.ThreadPoolExecutor(self.jobs) as pool:
+            while pending or running:
+                for stage in list(pending):
+                    if any(status.get(dep) in ('failed', 'blocked') for dep in deps[stage.name]):
+                        status[stage.name] = 'blocked'
+                        pending.remove(stage)
+                        print(f"[engellendi] {stage.name} (önceki adım başarısız)")
+                    elif len(running) < self.jobs and all(status.get(dep) in ('done', 'skipped') for dep in deps[stage.name]):
+                        pending.remove(stage)
+                        running[pool.submit(self.run_stage, stage)] = (stage, time.time())
+                if not running:
+                    continue
+
+                finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in finished:
+                    stage, started = running.pop(future)
+                    result, message = future.result()
+                    status[stage.name] = result
+                    if result == 'skipped':
+                        print(f"[atlandı] {stage.name} (girdiler ve kod değişmedi)")
+                    elif result == 'done':
+                        print(f"[tamam] {stage.name} ({time.time() - started:.1f} sn)")
+                    else:
+                        print(f"[HATA] {stage.name}: {message}")
+        return status
+
+    def plan(self, selected):
+        """Çalıştırmadan, hangi adımların yeniden çalışacağını tahmin eder (--dry-run)."""
+        will_run = set()
+        names = {stage.name for stage in selected}
+        for stage in selected:
+            fingerprint = self.fingerprint(stage)
+            upstream = self.dependencies(stage, names) & will_run
+            if fingerprint is None and not upstream:
+                print(f"[eksik girdi] {stage.name}")
+            elif upstream or fingerprint is None or not self.up_to_date(stage, fingerprint):
+                will_run.add(stage.name)
+                print(f"[çalışacak] {stage.name}" + (f" (önceki adımlar: {', '.join(sorted(upstream))})" if upstream else ""))
+            else:
+                print(f"[atlanacak] {stage.name}")
+        return will_run
+
+
+def find_stage(stages, key):
+    """Ad, betik adı ya da tekil önek (örn. '05', '24_v4_train') ile adım indeksini bulur."""
+    for i, stage in enumerate(stages):
+        if key == stage.name or key in stage.scripts or key in [os.path.splitext(s)[0] for s in stage.scripts]:
+            return i
+    matches = [i for i, stage in enumerate(stages)
+               if any(os.path.splitext(s)[0].startswith(key) for s in stage.scripts)]
+    if len(matches) != 1:
+        names = ', '.join(stages[i].name for i in matches) or 'yok'
+        raise ValueError(f"'{key}' tek bir adımı belirtmiyor (eşleşenler: {names})")
+    return matches[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Numaralı betikleri içerik özetiyle önbellekleyerek DAG sırasıyla çalıştırır.")
+    parser.add_argument('--from', dest='from_stage', help="bu adımdan başla (öncekiler çalıştırılmaz, çıktıları mevcut olmalı)")
+    parser.add_argument('--until', dest='until_stage', help="bu adımda dur (dahil)")
+    parser.add_argument('--jobs', type=int, default=DEFAULT_JOBS, help="aynı anda çalışacak en fazla adım sayısı")
+    parser.add_argument('--force', action='store_true', help="seçili adımları önbelleğe bakmadan yeniden çalıştır")
+    parser.add_argument('--dry-run', action='store_true', help="çalıştırmadan hangi adımların çalışacağını göster")
+    parser.add_argument('--list', action='store_true', help="adımları, girdi ve çıktılarıyla listele")
+    args = parser.parse_args()
+
+    current_dir = os.getcwd()
+    stages = build_stages(current_dir)
+
+    if args.list:
+        for stage in stages:
+            print(f"{stage.name}  [{', '.join(stage.scripts)}]")
+            print(f"    girdiler: {', '.join(stage.inputs)}")
+            print(f"    çıktılar: {', '.join(stage.outputs)}")
+        return 0
+
+    try:
+        first = find_stage(stages, args.from_stage) if args.from_stage else 0
+        last = find_stage(stages, args.until_stage) if args.until_stage else len(stages) - 1
+    except ValueError as e:
+        parser.error(str(e))
+    selected = stages[first:last + 1]
+    if not selected:
+        print("Seçili adım yok (--from, --until'den sonra geliyor).")
+        return 1
+
+    runner = PipelineRunner(current_dir, stages, jobs=args.jobs, force=args.force)
+    print(f"--- Pipeline: {len(selected)} adım ({selected[0].name} -> {selected[-1].name}), en fazla {runner.jobs} paralel ---")
+    if args.dry_run:
+        # Kuru çalıştırma durum dosyasına (özet önbelleği dahil) hiçbir şey yazmaz
+        runner.plan(selected)
+        return 0
+
+    start_time = time.time()
+    status = runner.run(selected)
+    counts = {key: list(status.values()).count(key) for key in ('done', 'skipped', 'failed', 'blocked')}
+    print(f"\nÇalışan: {counts['done']}, atlanan: {counts['skipped']}, başarısız: {counts['failed']}, "
+          f"engellenen: {counts['blocked']} | Toplam süre: {time.time() - start_time:.1f} sn")
+    return 1 if counts['failed'] or counts['blocked'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
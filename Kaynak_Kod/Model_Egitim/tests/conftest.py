@@ -0,0 +1,35 @@
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+MODEL_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, MODEL_DIR)
+
+from user_logs_agg import LOG_COLS
+
+
+def make_user_logs(n_rows, n_users, seed=0):
+    """Sentetik user_logs tablosu: negatif total_secs ve eksik değerler de içerir."""
+    rng = np.random.default_rng(seed)
+    alphabet = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/"))
+    msnos = np.array(["".join(chars) + "=" for chars in alphabet[rng.integers(0, 64, (n_users, 43))]], dtype=object)
+    df = pd.DataFrame({
+        'msno': msnos[rng.integers(0, n_users, n_rows)],
+        'date': 20170301 + rng.integers(0, 28, n_rows),
+    })
+    for col in LOG_COLS[:-1]:
+        df[col] = rng.poisson(5, n_rows)
+    df['total_secs'] = rng.gamma(2.0, 3000.0, n_rows) * np.where(rng.random(n_rows) < 0.05, -1, 1)
+    df.loc[rng.random(n_rows) < 0.02, 'total_secs'] = np.nan
+    return df, msnos
+
+
+@pytest.fixture
+def user_logs(tmp_path):
+    df, msnos = make_user_logs(5000, 300)
+    path = str(tmp_path / 'user_logs.csv')
+    df.to_csv(path, index=False)
+    return path, msnos
@@ -0,0 +1,121 @@
+import io
+
+import pandas as pd
+import pytest
+
+from msno_codec import MsnoCodec
+from user_logs_agg import (PartialState, TreeReducer, UserLogAggregator, map_partitions, merge_states,
+                           merge_sums, plan_partitions, state_to_frame, sum_chunk, summarize_chunk)
+
+
+def read_partitions(path, chunk_size, block_bytes):
+    columns, partitions = plan_partitions(path, chunk_size, block_bytes)
+    with open(path, 'rb') as f:
+        data = f.read()
+    return [pd.read_csv(io.BytesIO(data[start:end]), header=None, names=columns) for start, end in partitions]
+
+
+@pytest.mark.parametrize('trailing_newline', [True, False])
+@pytest.mark.parametrize('block_bytes', [7, 1000, 1 << 20])
+@pytest.mark.parametrize('chunk_size', [333, 1000, 4999, 5000, 6000])
+def test_partitions_match_read_csv_chunks(user_logs, chunk_size, block_bytes, trailing_newline):
+    path, _ = user_logs
+    if not trailing_newline:
+        with open(path, 'rb+') as f:
+            f.truncate(f.seek(0, 2) - 1)
+
+    expected = list(pd.read_csv(path, chunksize=chunk_size))
+    actual = read_partitions(path, chunk_size, block_bytes)
+
+    assert len(actual) == len(expected)
+    for got, want in zip(actual, expected):
+        pd.testing.assert_frame_equal(got, want.reset_index(drop=True), check_exact=True)
+
+
+@pytest.fixture
+def codebook_path(user_logs, tmp_path):
+    # Sözlük kullanıcıların %80'ini kapsar; geri kalanların satırları atılmalı
+    _, msnos = user_logs
+    known = msnos[:len(msnos) * 4 // 5]
+    path = str(tmp_path / 'msno_codebook.npz')
+    MsnoCodec.build(known[:len(known) // 2], known).save(path)
+    return path
+
+
+def fold_04(chunk_aggs):
+    # 04_aggregate_user_logs.py'deki birleştirme
+    reducer = TreeReducer(merge_sums)
+    for chunk_agg in chunk_aggs:
+        reducer.push(chunk_agg)
+    return reducer.result()
+
+
+def fold_11(chunk_aggs):
+    # 11_aggregate_user_logs_v2.py'deki birleştirme
+    reducer = TreeReducer(merge_states)
+    for i, chunk_agg in enumerate(chunk_aggs):
+        reducer.push(PartialState.from_summary(chunk_agg, i))
+    return state_to_frame(reducer.result())
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+@pytest.mark.parametrize('chunk_size', [700, 5000])
+@pytest.mark.parametrize('func, fold', [(sum_chunk, fold_04), (summarize_chunk, fold_11)])
+def test_map_partitions_matches_serial_loop(user_logs, codebook_path, func, fold, chunk_size, workers):
+    path, _ = user_logs
+    codec = MsnoCodec.load(codebook_path)
+    expected = fold(func(chunk, codec=codec) for chunk in pd.read_csv(path, chunksize=chunk_size))
+    actual = fold(map_partitions(path, func, workers, chunk_size, codebook_path=codebook_path))
+
+    # Satır sırası, dtype'lar ve float bitleri dahil birebir aynı
+    pd.testing.assert_frame_equal(actual, expected, check_exact=True)
+    assert actual.to_csv() == expected.to_csv()
+    assert len(expected) <= len(codec)
+
+
+def test_map_partitions_requires_msno(tmp_path):
+    path = str(tmp_path / 'no_msno.csv')
+    pd.DataFrame({'date': [1, 2]}).to_csv(path, index=False)
+    with pytest.raises(ValueError):
+        list(map_partitions(path, sum_chunk, 1, 10))
+
+
+def test_tree_reducer_shape_is_fixed():
+    # Birleştirme sırası yalnızca parça sayısına bağlı: ((0+1)+(2+3))+4
+    reducer = TreeReducer(lambda left, right: f"({left}+{right})")
+    for i in range(5):
+        reducer.push(str(i))
+    assert reducer.result() == "(((0+1)+(2+3))+4)"
+    assert len(reducer.stack) == 0
+
+    with pytest.raises(ValueError):
+        TreeReducer(merge_sums).result()
+
+
+@pytest.mark.parametrize('chunk_size', [300, 1000, 5000])
+def test_tree_merge_matches_aggregator(user_logs, chunk_size):
+    # Toplamlar dışında (toplama sırası farklı) vektörel biriktiriciyle birebir aynı;
+    # satır sırası da aynı "ilk görüldüğü parça" kuralına uyar
+    path, _ = user_logs
+    aggregator = UserLogAggregator()
+    chunk_aggs = []
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        chunk_aggs.append(summarize_chunk(chunk))
+        aggregator.add_summary(chunk_aggs[-1])
+    expected = aggregator.to_frame()
+    actual = fold_11(chunk_aggs)
+
+    pd.testing.assert_index_equal(actual.index, expected.index)
+    exact = [c for c in expected.columns if not c.endswith(('_sum', '_mean'))]
+    pd.testing.assert_frame_equal(actual[exact], expected[exact], check_exact=True)
+    pd.testing.assert_frame_equal(actual, expected, check_exact=False, rtol=1e-12)
+
+
+def test_tree_merge_04_matches_single_groupby(user_logs):
+    path, _ = user_logs
+    expected = pd.read_csv(path).groupby('msno').sum().astype('float64')
+    actual = fold_04(sum_chunk(chunk) for chunk in pd.read_csv(path, chunksize=600))
+
+    ints = [c for c in expected.columns if c != 'total_secs']
+    pd.testing.assert_frame_equal(actual[ints], expected[ints], check_exact=True)
+    pd.testing.assert_series_equal(actual['total_secs'], expected['total_secs'], check_exact=False, rtol=1e-12)
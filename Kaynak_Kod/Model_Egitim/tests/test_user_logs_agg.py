@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from user_logs_agg import LOG_COLS, UserLogAggregator
+
+
+def legacy_aggregate(path, chunk_size):
+    # 11_aggregate_user_logs_v2.py'nin vektörel motordan önceki iterrows döngüsü
+    log_cols = LOG_COLS
+    user_sums, user_counts, user_min_vals, user_max_vals = {}, {}, {}, {}
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        chunk.loc[chunk['total_secs'] < 0, 'total_secs'] = 0
+        chunk_agg = chunk.groupby('msno')[log_cols].agg(['sum', 'count', 'min', 'max'])
+        chunk_agg.columns = ['_'.join(col).strip() for col in chunk_agg.columns.values]
+        for msno, row in chunk_agg.iterrows():
+            if msno not in user_sums:
+                user_sums[msno] = {col: 0 for col in log_cols}
+                user_counts[msno] = {col: 0 for col in log_cols}
+                user_min_vals[msno] = {col: np.inf for col in log_cols}
+                user_max_vals[msno] = {col: -np.inf for col in log_cols}
+            for col in log_cols:
+                user_sums[msno][col] += row[f'{col}_sum']
+                user_counts[msno][col] += row[f'{col}_count']
+                user_min_vals[msno][col] = min(user_min_vals[msno][col], row[f'{col}_min'])
+                user_max_vals[msno][col] = max(user_max_vals[msno][col], row[f'{col}_max'])
+
+    final_data = []
+    for msno in user_sums:
+        row_data = {'msno': msno}
+        for col in log_cols:
+            total_sum = user_sums[msno][col]
+            total_count = user_counts[msno][col]
+            row_data[f'{col}_sum'] = total_sum
+            row_data[f'{col}_count'] = total_count
+            row_data[f'{col}_mean'] = total_sum / total_count if total_count > 0 else 0
+            row_data[f'{col}_min'] = user_min_vals[msno][col] if user_min_vals[msno][col] != np.inf else 0
+            row_data[f'{col}_max'] = user_max_vals[msno][col] if user_max_vals[msno][col] != -np.inf else 0
+        final_data.append(row_data)
+    return pd.DataFrame(final_data).set_index('msno')
+
+
+def vectorized_aggregate(path, chunk_size, capacity):
+    aggregator = UserLogAggregator(capacity=capacity)
+    for chunk in pd.read_csv(path, chunksize=chunk_size):
+        chunk.loc[chunk['total_secs'] < 0, 'total_secs'] = 0
+        aggregator.add_chunk(chunk)
+    return aggregator.to_frame()
+
+
+@pytest.mark.parametrize('chunk_size', [700, 5000])
+def test_matches_legacy_loop(user_logs, chunk_size):
+    path, _ = user_logs
+    expected = legacy_aggregate(path, chunk_size)
+    # Küçük başlangıç kapasitesi dizi büyütmeyi de sınar
+    actual = vectorized_aggregate(path, chunk_size, capacity=16)
+
+    assert actual.to_csv() == expected.to_csv()
+    pd.testing.assert_frame_equal(actual, expected.astype(np.float64), check_exact=True)
+
+
+def test_empty_chunks_are_ignored(user_logs):
+    path, _ = user_logs
+    chunk = pd.read_csv(path, nrows=100)
+    aggregator = UserLogAggregator()
+    aggregator.add_chunk(chunk.iloc[:0])
+    aggregator.add_chunk(chunk)
+    aggregator.add_chunk(chunk.iloc[:0])
+
+    reference = UserLogAggregator()
+    reference.add_chunk(chunk)
+    pd.testing.assert_frame_equal(aggregator.to_frame(), reference.to_frame(), check_exact=True)
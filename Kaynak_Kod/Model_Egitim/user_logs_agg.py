@@ -0,0 +1,324 @@
+# user_logs_agg.py
+# 11_aggregate_user_logs_* betiklerinin ortak agregasyon motoru.
+# Kullanıcı başına iç içe sözlükler yerine msno -> yoğun tamsayı kodu eşlemesi ve
+# (n_users, 7) boyutlu NumPy dizileri kullanılır; her parça vektörel olarak birleştirilir.
+# Çok çekirdekli mod (map_partitions): dosya, seri betiklerin chunksize parçalarıyla
+# aynı satırları içeren byte aralıklarına bölünür; her aralık bir işçi süreçte seri
+# yoldaki aynı fonksiyonla özetlenir. Parça özetleri hem seri hem paralel modda aynı
+# sabit şekilli ikili ağaçla (TreeReducer) birleştirilir; ağacın şekli yalnızca parça
+# sayısına bağlı olduğundan çıktı işçi sayısından bağımsız olarak bayt bayt aynıdır.
+import dataclasses
+import io
+import multiprocessing
+import os
+
+import numpy as np
+import pandas as pd
+
+from msno_codec import UNKNOWN, MsnoCodec
+
+LOG_COLS = ['num_25', 'num_50', 'num_75', 'num_985', 'num_100', 'num_unq', 'total_secs']
+INITIAL_CAPACITY = 1 << 20
+# Bölüm planında satır sonları bu boyutta bloklar halinde taranır
+SCAN_BLOCK_BYTES = 64 << 20
+
+
+class UserLogAggregator:
+    """Parça parça gelen user_logs verisini msno bazında sum/count/min/max olarak biriktirir.
+
+    Her parça önce pandas groupby ile özetlenir, ardından parça özetleri kullanıcı
+    kodlarına göre dizilere saçılır (scatter). Toplamlar eski iterrows döngüsüyle aynı
+    sırada (0 + parça1 + parça2 ...) eklendiği ve kullanıcılar aynı sırada (ilk
+    görüldükleri parça, parça içinde sıralı msno) kod aldığı için çıktı birebir aynıdır.
+    """
+
+    def __init__(self, log_cols=LOG_COLS, capacity=INITIAL_CAPACITY):
+        self.log_cols = list(log_cols)
+        self.msnos = pd.Index([], dtype=object)
+        self.n_users = 0
+        n_cols = len(self.log_cols)
+        self.sums = np.zeros((capacity, n_cols))
+        self.counts = np.zeros((capacity, n_cols))
+        self.mins = np.full((capacity, n_cols), np.inf)
+        self.maxs = np.full((capacity, n_cols), -np.inf)
+
+    def _grow(self, n_needed):
+        capacity = len(self.sums)
+        if n_needed <= capacity:
+            return
+        while capacity < n_needed:
+            capacity *= 2
+        for name, fill in (('sums', 0.0), ('counts', 0.0), ('mins', np.inf), ('maxs', -np.inf)):
+            old = getattr(self, name)
+            new = np.full((capacity, old.shape[1]), fill)
+            new[:self.n_users] = old[:self.n_users]
+            setattr(self, name, new)
+
+    def _codes(self, keys):
+        # Parçadaki msno'ları yoğun kodlara çevir; yeni kullanıcılar sırayla sona eklenir
+        codes = self.msnos.get_indexer(keys) if self.n_users else np.full(len(keys), -1, dtype=np.intp)
+        new = codes < 0
+        n_new = int(new.sum())
+        if n_new:
+            codes[new] = np.arange(self.n_users, self.n_users + n_new)
+            # Anahtarın türü korunur: msno string'leri ya da msno_codec int32 kodları
+            new_keys = pd.Index(keys[new])
+            self.msnos = self.msnos.append(new_keys) if self.n_users else new_keys
+            self._grow(self.n_users + n_new)
+            self.n_users += n_new
+        return codes
+
+    def add_chunk(self, chunk):
+        """Temizlenmiş (ve gerekiyorsa filtrelenmiş) bir user_logs parçasını ekler."""
+        if chunk.empty:
+            return
+        self.add_summary(chunk.groupby('msno')[self.log_cols].agg(['sum', 'count', 'min', 'max']))
+
+    def add_summary(self, chunk_agg):
+        """Bir parçanın msno bazında sum/count/min/max özetini (``summarize_chunk``) ekler."""
+        if chunk_agg.empty:
+            return
+        codes = self._codes(chunk_agg.index)
+
+        def stat(name):
+            return chunk_agg.xs(name, axis=1, level=1)[self.log_cols].to_numpy(dtype=np.float64)
+
+        # Bir parçada her msno tek satır olduğundan kodlar tekrarsızdır; np.add.at gerekmez
+        self.sums[codes] += stat('sum')
+        self.counts[codes] += stat('count')
+        # fmin/fmax NaN'ı yok sayar (eski min()/max() karşılaştırmaları gibi)
+        self.mins[codes] = np.fmin(self.mins[codes], stat('min'))
+        self.maxs[codes] = np.fmax(self.maxs[codes], stat('max'))
+
+    def to_frame(self):
+        """Eski betiklerin çıktısıyla aynı sütunlara sahip, msno indeksli DataFrame."""
+        n = self.n_users
+        return stats_frame(self.msnos, self.log_cols, self.sums[:n], self.counts[:n], self.mins[:n], self.maxs[:n])
+
+
+def stats_frame(msnos, log_cols, sums, counts, mins, maxs):
+    # Sütun sırası: her log sütunu için sum, count, mean, min, max
+    with np.errstate(divide='ignore', invalid='ignore'):
+        means = np.where(counts > 0, sums / counts, 0.0)
+
+    columns = {}
+    for j, col in enumerate(log_cols):
+        columns[f'{col}_sum'] = sums[:, j]
+        columns[f'{col}_count'] = counts[:, j]
+        columns[f'{col}_mean'] = means[:, j]
+        columns[f'{col}_min'] = np.where(mins[:, j] != np.inf, mins[:, j], 0.0)
+        columns[f'{col}_max'] = np.where(maxs[:, j] != -np.inf, maxs[:, j], 0.0)
+
+    return pd.DataFrame(columns, index=pd.Index(msnos, name='msno'))
+
+
+@dataclasses.dataclass
+class PartialState:
+    """Birleştirilebilir kısmi özet: sıralı msno anahtarları ve anahtar başına sum/count/min/max.
+
+    ``order`` kullanıcının ilk görüldüğü yeri (parça no << 32 | parça içi sıra) tutar;
+    ``state_to_frame`` satırları buna göre sıralar, böylece satır sırası
+    ``UserLogAggregator``'daki "ilk görüldüğü parça" kuralıyla aynıdır.
+    """
+    keys: np.ndarray
+    order: np.ndarray
+    sums: np.ndarray
+    counts: np.ndarray
+    mins: np.ndarray
+    maxs: np.ndarray
+
+    @classmethod
+    def from_summary(cls, chunk_agg, index, log_cols=LOG_COLS):
+        """``summarize_chunk`` çıktısından (``index``. parça) kısmi özet oluşturur."""
+        log_cols = list(log_cols)
+
+        def stat(name):
+            return chunk_agg.xs(name, axis=1, level=1)[log_cols].to_numpy(dtype=np.float64)
+
+        return cls(
+            keys=chunk_agg.index.to_numpy(),
+            order=(np.int64(index) << 32) + np.arange(len(chunk_agg), dtype=np.int64),
+            sums=stat('sum'), counts=stat('count'), mins=stat('min'), maxs=stat('max'),
+        )
+
+
+def merge_states(left, right):
+    """İki kısmi özeti birleştirir; toplamlar her zaman (0 + sol) + sağ sırasıyla eklenir."""
+    # İki taraf da sıralı ve tekrarsız: birleştirip sıralamak (np.union1d'nin hash'li
+    # unique'inden hızlı) ve komşu tekrarları atmak yeterli
+    keys = np.concatenate([left.keys, right.keys])
+    keys.sort(kind='stable')
+    keys = keys[np.concatenate([[True], keys[1:] != keys[:-1]])]
+    il = np.searchsorted(keys, left.keys)
+    ir = np.searchsorted(keys, right.keys)
+    n, k = len(keys), left.sums.shape[1]
+
+    sums = np.zeros((n, k))
+    counts = np.zeros((n, k))
+    mins = np.full((n, k), np.inf)
+    maxs = np.full((n, k), -np.inf)
+    order = np.full(n, np.iinfo(np.int64).max, dtype=np.int64)
+    for idx, part in ((il, left), (ir, right)):
+        # Her özette anahtarlar tekrarsızdır; np.add.at gerekmez
+        sums[idx] += part.sums
+        counts[idx] += part.counts
+        mins[idx] = np.fmin(mins[idx], part.mins)
+        maxs[idx] = np.fmax(maxs[idx], part.maxs)
+        order[idx] = np.minimum(order[idx], part.order)
+    return PartialState(keys, order, sums, counts, mins, maxs)
+
+
+def state_to_frame(state, log_cols=LOG_COLS):
+    """11_* betiklerinin sütunları; satırlar kullanıcının ilk görüldüğü parçaya göre sıralı."""
+    idx = np.argsort(state.order, kind='stable')
+    return stats_frame(state.keys[idx], list(log_cols), state.sums[idx], state.counts[idx],
+                       state.mins[idx], state.maxs[idx])
+
+
+def merge_sums(left, right):
+    """04 betiğinin iki parça toplamını birleştirir (aynı msno'ların değerleri toplanır)."""
+    return left.add(right, fill_value=0)
+
+
+class TreeReducer:
+    """Parça özetlerini sabit şekilli ikili ağaçla birleştirir.
+
+    Özetler parça sırasıyla eklenir; aynı seviyedeki iki düğüm hemen ``merge`` ile
+    birleştirilir (ikili sayaç). Ağacın şekli yalnızca parça sayısına bağlıdır, bu
+    yüzden seri ve paralel çalıştırma aynı toplama sırasını kullanır. Her birleştirme
+    iki benzer boyutlu özet üzerinde çalışır (büyüyen tek bir özete parça eklemek
+    yerine) ve yığında en fazla log2(P) özet tutulur.
+    """
+
+    def __init__(self, merge):
+        self.merge = merge
+        self.stack = []
+
+    def push(self, partial):
+        level = 0
+        while self.stack and self.stack[-1][0] == level:
+            _, left = self.stack.pop()
+            partial = self.merge(left, partial)
+            level += 1
+        self.stack.append((level, partial))
+
+    def result(self):
+        if not self.stack:
+            raise ValueError("Birleştirilecek parça yok")
+        partial = self.stack.pop()[1]
+        while self.stack:
+            partial = self.merge(self.stack.pop()[1], partial)
+        return partial
+
+
+def encode_chunk(chunk, codec, only_train=False):
+    """msno sütununu int32 kodlarla değiştirir.
+
+    Sözlükte olmayan (``only_train`` ile train.csv dışındaki) kullanıcıların satırları
+    gruplamadan önce atılır; sonraki adımlar zaten train kullanıcılarına sol birleştirme yapar.
+    """
+    codes = codec.encode(chunk['msno'])
+    keep = codec.train_mask(codes) if only_train else codes != UNKNOWN
+    return chunk[keep].assign(msno=codes[keep])
+
+
+def sum_chunk(chunk, codec=None):
+    """04 betiğinin parça özeti: msno (``codec`` verilirse msno kodu) bazında tüm sütunların toplamı."""
+    if codec is not None:
+        chunk = encode_chunk(chunk, codec)
+    return chunk.groupby('msno').sum()
+
+
+def summarize_chunk(chunk, log_cols=LOG_COLS, clip_negative_secs=True, codec=None, only_train=False):
+    """11_* betiklerinin parça özeti; ``PartialState.from_summary`` veya ``UserLogAggregator.add_summary`` ile birleştirilir."""
+    if codec is not None:
+        chunk = encode_chunk(chunk, codec, only_train)
+    if clip_negative_secs:
+        # total_secs sütunundaki negatif değerleri 0 yap (temizlik)
+        chunk.loc[chunk['total_secs'] < 0, 'total_secs'] = 0
+    return chunk.groupby('msno')[list(log_cols)].agg(['sum', 'count', 'min', 'max'])
+
+
+def plan_partitions(path, chunk_size, block_bytes=SCAN_BLOCK_BYTES):
+    """Başlık sütunlarını ve her biri ``chunk_size`` veri satırı içeren byte aralıklarını döndürür.
+
+    Aralıklar ``pd.read_csv(path, chunksize=chunk_size)`` parçalarıyla aynı satırları
+    kapsar (son aralık kalan satırlar). Dosyada boş satır ve tırnak içinde satır sonu
+    olmadığı varsayılır; KKBox user_logs dosyaları bu biçimdedir.
+    """
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        columns = f.readline().decode('utf-8').strip().split(',')
+        bounds = [f.tell()]
+        pos = f.tell()
+        # Bir sonraki sınıra kadar okunması gereken satır sayısı
+        rows_left = chunk_size
+        while True:
+            block = f.read(block_bytes)
+            if not block:
+                break
+            newlines = np.flatnonzero(np.frombuffer(block, dtype=np.uint8) == ord('\n'))
+            for k in range(rows_left - 1, len(newlines), chunk_size):
+                bounds.append(pos + int(newlines[k]) + 1)
+            if len(newlines) < rows_left:
+                rows_left -= len(newlines)
+            else:
+                rows_left = chunk_size - (len(newlines) - rows_left) % chunk_size
+            pos += len(block)
+    bounds.append(size)
+    # Dosya tam bir parça sınırında bitiyorsa sondaki boş aralık atılır
+    return columns, [(start, end) for start, end in zip(bounds[:-1], bounds[1:]) if end > start]
+
+
+_CODECS = {}
+
+
+def _partition_codec(codebook_path):
+    # Her süreç sözlüğü (ve hash indeksini) bir kez yükler; görev başına aktarılmaz
+    if codebook_path not in _CODECS:
+        _CODECS[codebook_path] = MsnoCodec.load(codebook_path)
+    return _CODECS[codebook_path]
+
+
+def _run_partition(path, columns, start, end, func, func_args, codebook_path):
+    # İşçi süreçte çalışır: byte aralığını seri parçayla aynı şekilde ayrıştırıp özetler
+    with open(path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(data), header=None, names=columns)
+    del data
+    if codebook_path is None:
+        return func(chunk, *func_args)
+    return func(chunk, *func_args, codec=_partition_codec(codebook_path))
+
+
+def map_partitions(path, func, workers, chunk_size, func_args=(), codebook_path=None):
+    """``func(parça, *func_args)`` sonuçlarını seri parça sırasıyla üreten generator.
+
+    Her bölüm ``pd.read_csv(path, chunksize=chunk_size)`` parçasıyla aynı satırları
+    içerdiği ve aynı ``func`` ile özetlendiği için sonuçlar seri döngüdekiyle aynıdır;
+    çağıran bunları seri yoldaki gibi ``TreeReducer``'a sırayla ekler. ``workers=1`` aynı
+    planı tek süreçte çalıştırır. Aynı anda en fazla ``workers`` bölüm işlenir/bekler;
+    ana süreçte birikmiş sonuç sayısı (bellek) işçi sayısıyla sınırlıdır.
+    ``codebook_path`` verilirse msno sözlüğü her süreçte bir kez yüklenip ``func``'a
+    ``codec=`` olarak geçirilir.
+    """
+    columns, partitions = plan_partitions(path, chunk_size)
+    if 'msno' not in columns:
+        raise ValueError(f"Dosyada msno sütunu yok: {path}")
+    tasks = [(path, columns, start, end, func, tuple(func_args), codebook_path) for start, end in partitions]
+
+    if workers <= 1:
+        for task in tasks:
+            yield _run_partition(*task)
+        return
+
+    with multiprocessing.Pool(workers) as pool:
+        pending = []
+        next_task = 0
+        while next_task < len(tasks) or pending:
+            while next_task < len(tasks) and len(pending) < workers:
+                pending.append(pool.apply_async(_run_partition, tasks[next_task]))
+                next_task += 1
+            # Sonuçlar bölüm sırasıyla alınır; birleştirme sırası tamamlanma sırasından etkilenmez
+            yield pending.pop(0).get()